@@ -9,10 +9,10 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 
 from config import Config, get_config
-from services.transcription_service import TranscriptionService
-from services.emotion_service import EmotionService
 from utils.logger import setup_logger
 from utils.error_handlers import register_error_handlers
+from utils.inference_runtime import suggest_thread_split
+from utils.model_loader import model_loader
 from routes.api import api_bp
 
 # Load environment variables
@@ -79,6 +79,15 @@ def create_app(config_class=None):
             'version': '1.0.0'
         })
     
+    # Readiness endpoint: 503 until every model has loaded and warmed up
+    @app.route('/ready')
+    def readiness_check():
+        status = model_loader.get_status()
+        return jsonify({
+            'status': 'ready' if status['ready'] else 'loading',
+            **status
+        }), 200 if status['ready'] else 503
+    
     # Root endpoint
     @app.route('/')
     def root():
@@ -86,11 +95,22 @@ def create_app(config_class=None):
             'message': 'ToneBridge Backend API',
             'endpoints': {
                 'health': '/health',
+                'ready': '/ready',
                 'transcribe': '/api/transcribe',
                 'emotion': '/api/emotion'
             }
         })
     
+    # Measure how this host's cores are best split between workers and threads; results are logged
+    if config_class.THREAD_BENCHMARK_ON_STARTUP:
+        try:
+            suggest_thread_split()
+        except Exception as e:
+            logger.warning(f"Thread split benchmark failed: {str(e)}")
+    
+    # Models load and warm up in the background; the server binds meanwhile
+    model_loader.start()
+    
     logger.info("ToneBridge Backend initialized successfully")
     logger.info(f"CORS allowed origins: {allowed_origins}")
     return app
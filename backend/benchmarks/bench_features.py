@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark emotion feature extraction: per-feature librosa calls vs. the single-STFT feature engine
+
+Usage:
+    python benchmarks/bench_features.py [--durations 5 60 600] [--runs 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import librosa
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.feature_engine import FeatureEngine, FEATURE_STAT_KEYS
+
+
+def make_clip(duration: float, sample_rate: int = 16000) -> np.ndarray:
+    """Synthesize a speech-like clip: a gliding, amplitude-modulated harmonic tone plus noise"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(duration * sample_rate), dtype=np.float32) / sample_rate
+    f0 = 140 + 40 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6)) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    clip = 0.3 * voiced + 0.02 * rng.standard_normal(len(t))
+    return librosa.util.normalize(clip.astype(np.float32))
+
+
+def legacy_features(audio_array: np.ndarray, sample_rate: int) -> dict:
+    """The previous extract_audio_features: one librosa call (and framing/STFT) per feature"""
+    mfcc = librosa.feature.mfcc(y=audio_array, sr=sample_rate, n_mfcc=13)
+    centroid = librosa.feature.spectral_centroid(y=audio_array, sr=sample_rate)[0]
+    librosa.piptrack(y=audio_array, sr=sample_rate)
+    rms = librosa.feature.rms(y=audio_array)[0]
+    zcr = librosa.feature.zero_crossing_rate(audio_array)[0]
+    return {
+        'mfcc_mean': np.mean(np.mean(mfcc, axis=1)),
+        'mfcc_std': np.mean(np.std(mfcc, axis=1)),
+        'spectral_centroid_mean': np.mean(centroid),
+        'spectral_centroid_std': np.std(centroid),
+        'energy_mean': np.mean(rms),
+        'energy_std': np.std(rms),
+        'zcr_mean': np.mean(zcr)
+    }
+
+
+def engine_features(engine: FeatureEngine, audio_array: np.ndarray, sample_rate: int) -> dict:
+    """The feature engine path used by extract_audio_features"""
+    return engine.analyze(audio_array, sample_rate)
+
+
+def time_runs(func, runs: int) -> np.ndarray:
+    """Time repeated calls, returning per-run durations in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--durations', type=float, nargs='+', default=[5.0, 60.0, 600.0],
+                        help='clip lengths in seconds')
+    parser.add_argument('--runs', type=int, default=3, help='extractions per path and clip')
+    parser.add_argument('--sample-rate', type=int, default=16000)
+    args = parser.parse_args()
+
+    engine = FeatureEngine()
+    sr = args.sample_rate
+
+    for duration in args.durations:
+        clip = make_clip(duration, sr)
+        # Warm up filter bank caches outside the timed region
+        legacy = legacy_features(clip, sr)
+        current = engine_features(engine, clip, sr)
+
+        before = time_runs(lambda: legacy_features(clip, sr), args.runs)
+        after = time_runs(lambda: engine_features(engine, clip, sr), args.runs)
+
+        worst = max(abs(current[key] - legacy[key]) / max(abs(legacy[key]), 1e-9) for key in FEATURE_STAT_KEYS)
+        print(f"⏱️  {duration:6.0f}s clip | librosa median {np.median(before):9.1f} ms | "
+              f"engine median {np.median(after):9.1f} ms | "
+              f"speedup {np.median(before) / np.median(after):4.2f}x | max rel diff {worst:.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory of emotion feature extraction: piptrack matrices vs. the compact f0 track
+
+Each variant runs in a fresh process, and the kernel's RSS high-water mark
+(VmHWM) is reset after the clip is synthesized, so the peak reflects only
+the extraction. Linux only.
+
+Usage:
+    python benchmarks/bench_pitch_memory.py [--durations 5 60 600]
+"""
+
+import os
+import sys
+import argparse
+import multiprocessing
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def read_hwm() -> int:
+    """Read the process's RSS high-water mark (VmHWM) in bytes"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError('VmHWM not available')
+
+
+def run_variant(variant: str, duration: float, results):
+    """Extract features for one clip and report peak RSS above the pre-extraction baseline"""
+    import librosa
+    from utils.memory_stats import current_rss, MB
+    from utils.feature_engine import FeatureEngine
+    from benchmarks.bench_features import make_clip
+
+    sample_rate = 16000
+    clip = make_clip(duration, sample_rate)
+    engine = FeatureEngine()
+    # Warm up imports and filter banks so the baseline includes them
+    engine.analyze(clip[:sample_rate], sample_rate)
+    librosa.piptrack(y=clip[:sample_rate], sr=sample_rate)
+    baseline = current_rss()
+    # Writing 5 to clear_refs resets VmHWM to the current RSS
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')
+
+    if variant == 'piptrack':
+        features = {
+            'mfcc': librosa.feature.mfcc(y=clip, sr=sample_rate, n_mfcc=13),
+            'spectral_centroid': librosa.feature.spectral_centroid(y=clip, sr=sample_rate)[0],
+            'rms_energy': librosa.feature.rms(y=clip)[0],
+            'zero_crossing_rate': librosa.feature.zero_crossing_rate(clip)[0]
+        }
+        features['pitch'], features['pitch_magnitude'] = librosa.piptrack(y=clip, sr=sample_rate)
+        kept = features['pitch'].nbytes + features['pitch_magnitude'].nbytes
+    else:
+        features = engine.analyze(clip, sample_rate)
+        features['pitch'] = engine.pitch(clip, sample_rate)
+        kept = features['pitch']['f0'].nbytes
+
+    results.put((variant, duration, (read_hwm() - baseline) / MB, kept))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--durations', type=float, nargs='+', default=[5.0, 60.0, 600.0],
+                        help='clip lengths in seconds')
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    for duration in args.durations:
+        for variant in ('piptrack', 'f0_track'):
+            process = context.Process(target=run_variant, args=(variant, duration, results))
+            process.start()
+            process.join()
+            name, clip_duration, peak_mb, kept = results.get()
+            print(f"🧠 {clip_duration:6.0f}s clip | {name:<8} | peak RSS +{peak_mb:8.1f} MB | "
+                  f"pitch data kept {kept / 1024:10.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
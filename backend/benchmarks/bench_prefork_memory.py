@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Measure how much memory prefork workers share: starts serve.py, waits for /ready, reads each worker's smaps
+
+Usage:
+    python benchmarks/bench_prefork_memory.py [--workers 4] [--port 5099]
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import urllib.request
+import urllib.error
+
+# Add the backend directory to Python path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from utils.memory_stats import memory_breakdown
+
+
+def wait_ready(port: int, timeout: float) -> float:
+    """Poll /ready until it returns 200; returns the seconds it took"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/ready', timeout=2) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.25)
+    raise TimeoutError(f"server on port {port} not ready after {timeout:.0f}s")
+
+
+def child_pids(pid: int) -> list:
+    """Direct children of a process"""
+    with open(f'/proc/{pid}/task/{pid}/children') as children:
+        return [int(child) for child in children.read().split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4, help='server worker processes')
+    parser.add_argument('--port', type=int, default=5099, help='port to bind')
+    parser.add_argument('--timeout', type=float, default=600, help='seconds to wait for readiness')
+    args = parser.parse_args()
+
+    env = dict(os.environ, SERVER_WORKERS=str(args.workers), PORT=str(args.port), HOST='127.0.0.1')
+    master = subprocess.Popen([sys.executable, 'serve.py'], cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        ready_s = wait_ready(args.port, args.timeout)
+        # /ready answered from one worker; give the others the same time to warm up
+        time.sleep(2.0)
+        workers = child_pids(master.pid)
+        print(f"📦 {len(workers)} workers ready in {ready_s:.1f}s")
+
+        totals = {'rss_mb': 0.0, 'unique_mb': 0.0, 'pss_mb': 0.0}
+        for pid in workers:
+            sharing = memory_breakdown(pid)
+            for key in totals:
+                totals[key] += sharing[key]
+            print(f"⏱️  pid {pid:>7} | RSS {sharing['rss_mb']:8.1f} MB | unique {sharing['unique_mb']:8.1f} MB | "
+                  f"shared {sharing['shared_mb']:8.1f} MB | PSS {sharing['pss_mb']:8.1f} MB")
+        master_sharing = memory_breakdown(master.pid)
+        print(f"📊 master RSS {master_sharing['rss_mb']:.1f} MB; workers sum RSS {totals['rss_mb']:.1f} MB, "
+              f"sum unique {totals['unique_mb']:.1f} MB, sum PSS {totals['pss_mb']:.1f} MB")
+        print(f"🚀 each extra worker costs ~{totals['unique_mb'] / max(1, len(workers)):.1f} MB "
+              f"instead of ~{totals['rss_mb'] / max(1, len(workers)):.1f} MB")
+    finally:
+        master.terminate()
+        master.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Compare fp32 and int8 dynamic-quantized Whisper on CPU: accuracy (WER), latency and model size
+
+Evaluation clips come from --data, a directory of audio files (wav/flac)
+each with a same-named .txt reference transcript, or by default from the
+small LibriSpeech sample on the Hugging Face hub (needs the `datasets`
+package and network access on first run).
+
+Usage:
+    python benchmarks/bench_quantization.py [--models tiny base small] [--data DIR] [--limit 20]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import statistics
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+from transformers import pipeline
+from utils.quantization import quantize_dynamic_int8, model_size_mb
+
+SAMPLE_RATE = 16000
+
+
+def normalize(text: str) -> list:
+    """Lowercase, strip punctuation and split into words"""
+    return re.sub(r"[^\w' ]+", ' ', text.lower()).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> tuple:
+    """Word-level edit distance and reference length"""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    distance = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        previous_diagonal, distance[0] = distance[0], i
+        for j, hyp_word in enumerate(hyp, start=1):
+            substitution = previous_diagonal + (ref_word != hyp_word)
+            previous_diagonal = distance[j]
+            distance[j] = min(distance[j] + 1, distance[j - 1] + 1, substitution)
+    return distance[len(hyp)], len(ref)
+
+
+def load_clips(data_dir: str, limit: int) -> list:
+    """Load (audio, reference) pairs at 16 kHz"""
+    if data_dir:
+        from utils.audio_utils import AudioProcessor
+        processor = AudioProcessor(noise_reduction=False)
+        clips = []
+        for name in sorted(os.listdir(data_dir)):
+            stem, extension = os.path.splitext(name)
+            reference_path = os.path.join(data_dir, stem + '.txt')
+            if extension.lower() not in ('.wav', '.flac') or not os.path.exists(reference_path):
+                continue
+            audio, _ = processor.load_audio(os.path.join(data_dir, name))
+            with open(reference_path) as reference:
+                clips.append((audio, reference.read().strip()))
+        return clips[:limit]
+
+    from datasets import load_dataset
+    dataset = load_dataset('hf-internal-testing/librispeech_asr_dummy', 'clean', split='validation')
+    rows = dataset.select(range(min(limit, len(dataset))))
+    return [(np.asarray(row['audio']['array'], dtype=np.float32), row['text']) for row in rows]
+
+
+def evaluate(model_name: str, precision: str, clips: list) -> dict:
+    """Load one model variant and transcribe every clip"""
+    start = time.perf_counter()
+    asr = pipeline('automatic-speech-recognition', model=model_name, device='cpu')
+    if precision == 'int8':
+        asr.model = quantize_dynamic_int8(asr.model)
+    load_time = time.perf_counter() - start
+
+    # Warm up kernels so the first clip is not an outlier
+    asr({'array': clips[0][0], 'sampling_rate': SAMPLE_RATE})
+
+    latencies, errors, words = [], 0, 0
+    audio_seconds = 0.0
+    with torch.inference_mode():
+        for audio, reference in clips:
+            start = time.perf_counter()
+            text = asr({'array': audio, 'sampling_rate': SAMPLE_RATE})['text']
+            latencies.append(time.perf_counter() - start)
+            clip_errors, clip_words = word_errors(reference, text)
+            errors += clip_errors
+            words += clip_words
+            audio_seconds += len(audio) / SAMPLE_RATE
+
+    return {
+        'size_mb': model_size_mb(asr.model),
+        'load_s': load_time,
+        'median_ms': statistics.median(latencies) * 1000,
+        'rtf': sum(latencies) / audio_seconds,
+        'wer': errors / max(1, words)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--models', nargs='+', default=['tiny', 'base', 'small'],
+                        help='Whisper sizes (or full model ids)')
+    parser.add_argument('--data', default=None, help='directory of audio files with .txt references')
+    parser.add_argument('--limit', type=int, default=20, help='clips to evaluate')
+    parser.add_argument('--threads', type=int, default=None, help='torch intra-op threads')
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    clips = load_clips(args.data, args.limit)
+    print(f"📦 {len(clips)} clips, {sum(len(a) for a, _ in clips) / SAMPLE_RATE:.0f}s of audio, "
+          f"{torch.get_num_threads()} torch threads")
+
+    for size in args.models:
+        model_name = size if '/' in size else f'openai/whisper-{size}'
+        results = {precision: evaluate(model_name, precision, clips) for precision in ('fp32', 'int8')}
+        for precision, result in results.items():
+            print(f"⏱️  {model_name:<22} {precision:<5} | {result['size_mb']:7.1f} MB | "
+                  f"load {result['load_s']:5.1f} s | median {result['median_ms']:7.1f} ms | "
+                  f"RTF {result['rtf']:.3f} | WER {result['wer'] * 100:5.2f}%")
+        fp32, int8 = results['fp32'], results['int8']
+        print(f"📊 {model_name}: int8 is {fp32['median_ms'] / int8['median_ms']:.2f}x faster, "
+              f"{fp32['size_mb'] / int8['size_mb']:.2f}x smaller, "
+              f"WER {(int8['wer'] - fp32['wer']) * 100:+.2f} points")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark resampling to 16 kHz: polyphase (one-shot and streamed), libsoxr and np.interp
+
+Usage:
+    python benchmarks/bench_resample.py [--duration 60] [--runs 5]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.resampler import Resampler, SOXR_AVAILABLE
+
+TARGET_RATE = 16000
+
+
+def interp_resample(audio_array: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """The previous deploy-path resampler: linear interpolation, no anti-aliasing filter"""
+    new_length = int(len(audio_array) * target_rate / source_rate)
+    indices = np.linspace(0, len(audio_array) - 1, new_length)
+    return np.interp(indices, np.arange(len(audio_array)), audio_array).astype(np.float32)
+
+
+def streamed_resample(resampler: Resampler, audio_array: np.ndarray, source_rate: int,
+                      target_rate: int, block_seconds: float = 1.0) -> np.ndarray:
+    """Resample in fixed-size blocks, as a streaming decoder would"""
+    stream = resampler.stream(source_rate, target_rate)
+    block = int(source_rate * block_seconds)
+    pieces = [stream.write(audio_array[start:start + block]) for start in range(0, len(audio_array), block)]
+    pieces.append(stream.flush())
+    return np.concatenate(pieces)
+
+
+def alias_level_db(func, source_rate: int) -> float:
+    """Level left at 16 kHz by a 10 kHz tone, which must be filtered out rather than folded to 6 kHz"""
+    t = np.arange(source_rate * 2) / source_rate
+    tone = np.sin(2 * np.pi * 10000 * t).astype(np.float32)
+    output = func(tone, source_rate, TARGET_RATE)[1000:-1000]
+    return 20 * np.log10(np.sqrt(np.mean(output ** 2)) / np.sqrt(0.5) + 1e-12)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--duration', type=float, default=60.0, help='clip length in seconds')
+    parser.add_argument('--runs', type=int, default=5, help='conversions per method')
+    args = parser.parse_args()
+
+    polyphase = Resampler(use_soxr=False)
+    methods = {
+        'polyphase': polyphase.resample,
+        'polyphase_stream': lambda audio, src, dst: streamed_resample(polyphase, audio, src, dst),
+        'np.interp': interp_resample
+    }
+    if SOXR_AVAILABLE:
+        methods['soxr'] = Resampler(use_soxr=True).resample
+
+    rng = np.random.default_rng(0)
+    for source_rate in (44100, 48000):
+        audio_array = rng.standard_normal(int(source_rate * args.duration)).astype(np.float32)
+        polyphase.get_filter(source_rate, TARGET_RATE)
+        print(f"📦 {source_rate} Hz -> {TARGET_RATE} Hz, {args.duration:.0f}s clip")
+
+        for name, func in methods.items():
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                func(audio_array, source_rate, TARGET_RATE)
+                timings.append(time.perf_counter() - start)
+            best = min(timings)
+            print(f"⏱️  {name:<17} {best * 1000:8.1f} ms | {args.duration / best:8.0f}x realtime | "
+                  f"{len(audio_array) / best / 1e6:6.1f} Msamples/s | "
+                  f"10 kHz alias {alias_level_db(func, source_rate):7.1f} dB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark whole-buffer decode vs. streaming decode of a long WAV upload
+
+Reports peak RSS above the baseline (each variant in a fresh process, VmHWM
+reset after the payload is built, Linux only) and the time until the first
+window is available to the transcription model.
+
+Usage:
+    python benchmarks/bench_stream_decode.py [--durations 60 600] [--window 30]
+"""
+
+import os
+import sys
+import io
+import time
+import argparse
+import multiprocessing
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_variant(variant: str, duration: float, window: float, results):
+    """Decode one payload, touching every window as a consumer would"""
+    import numpy as np
+    import soundfile as sf
+    from utils.audio_utils import AudioProcessor
+    from utils.audio_stream import prefetch
+    from utils.memory_stats import current_rss, MB
+    from benchmarks.bench_pitch_memory import read_hwm
+
+    # 44.1 kHz stereo, as phones and browsers record it
+    sample_rate = 44100
+    rng = np.random.default_rng(0)
+    frames = (0.1 * rng.standard_normal((int(sample_rate * duration), 2))).astype(np.float32)
+    buffer = io.BytesIO()
+    sf.write(buffer, frames, sample_rate, format='WAV', subtype='PCM_16')
+    payload = buffer.getvalue()
+    del frames, buffer
+
+    processor = AudioProcessor(noise_reduction=False)
+    # Warm up filter design and imports so the baseline includes them
+    list(processor.stream_audio(payload[:sample_rate * 4 + 44], 'wav', block_duration=window))
+    baseline = current_rss()
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')
+
+    start = time.perf_counter()
+    first_window = None
+    energy = 0.0
+    if variant == 'load_audio':
+        audio_array, _ = processor.load_audio(payload, 'wav')
+        for block in processor.split_audio_into_chunks(audio_array, window):
+            first_window = first_window or time.perf_counter() - start
+            energy += float(np.dot(block, block))
+    else:
+        for block in prefetch(processor.stream_audio(payload, 'wav', block_duration=window)):
+            first_window = first_window or time.perf_counter() - start
+            energy += float(np.dot(block, block))
+    total = time.perf_counter() - start
+
+    results.put((variant, duration, (read_hwm() - baseline) / MB, first_window, total))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--durations', type=float, nargs='+', default=[60.0, 600.0],
+                        help='recording lengths in seconds')
+    parser.add_argument('--window', type=float, default=30.0, help='window length in seconds')
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    for duration in args.durations:
+        for variant in ('load_audio', 'stream_audio'):
+            process = context.Process(target=run_variant, args=(variant, duration, args.window, results))
+            process.start()
+            process.join()
+            name, clip_duration, peak_mb, first_window, total = results.get()
+            print(f"🧠 {clip_duration:6.0f}s upload | {name:<12} | peak RSS +{peak_mb:7.1f} MB | "
+                  f"first window {first_window * 1000:7.1f} ms | total {total * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
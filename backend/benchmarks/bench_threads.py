@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Find the fastest split of this host's cores into server workers x torch threads
+
+Each split runs its workers as concurrent processes doing Whisper-encoder-sized
+matmuls, so cross-worker contention is measured. Use the winner for
+SERVER_WORKERS and TORCH_NUM_THREADS.
+
+Usage:
+    python benchmarks/bench_threads.py [--seconds 3] [--cpus 8]
+"""
+
+import os
+import sys
+import argparse
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.inference_runtime import benchmark_thread_splits, usable_cpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=3.0, help='measurement time per split')
+    parser.add_argument('--cpus', type=int, default=None, help='cores to divide (default: usable CPUs)')
+    args = parser.parse_args()
+
+    cpus = args.cpus or len(usable_cpus())
+    print(f"📦 Splitting {cpus} CPUs, {args.seconds:.0f}s per split")
+
+    results = benchmark_thread_splits(args.seconds, cpus)
+    for result in results:
+        print(f"⏱️  {result['workers']:>3} workers x {result['threads']:>3} threads | "
+              f"{result['passes_per_second']:8.1f} passes/s | {result['latency_ms']:7.1f} ms/pass")
+    best = results[0]
+    print(f"🚀 SERVER_WORKERS={best['workers']} TORCH_NUM_THREADS={best['threads']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark webm decoding: ffmpeg pipe decode vs. the temp-file + librosa path
+
+Usage:
+    python benchmarks/bench_webm_decode.py [--duration 10] [--runs 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import numpy as np
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_utils import AudioProcessor
+
+
+def make_webm(duration: float, sample_rate: int = 48000) -> bytes:
+    """Encode a synthetic two-tone clip as opus/webm, like a browser recording"""
+    t = np.arange(int(duration * sample_rate), dtype=np.float32) / sample_rate
+    signal = 0.4 * np.sin(2 * np.pi * 220 * t) + 0.2 * np.sin(2 * np.pi * 1330 * t)
+    cmd = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-f', 'f32le', '-ar', str(sample_rate), '-ac', '1', '-i', 'pipe:0',
+        '-c:a', 'libopus', '-f', 'webm', 'pipe:1'
+    ]
+    result = subprocess.run(cmd, input=signal.astype('<f4').tobytes(),
+                            stdout=subprocess.PIPE, check=True)
+    return result.stdout
+
+
+def time_decode(processor: AudioProcessor, audio_data: bytes, runs: int) -> list:
+    """Time repeated webm decodes, returning per-run durations in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        processor.load_audio(audio_data, format='webm')
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--duration', type=float, default=10.0, help='clip length in seconds')
+    parser.add_argument('--runs', type=int, default=20, help='decodes per mode')
+    args = parser.parse_args()
+
+    audio_data = make_webm(args.duration)
+    print(f"📦 Synthetic webm: {args.duration:.1f}s, {len(audio_data)} bytes")
+
+    outputs = {}
+    for mode in ('tempfile', 'pipe'):
+        processor = AudioProcessor(decode_mode=mode)
+        outputs[mode] = processor.load_audio(audio_data, format='webm')[0]
+        timings = np.array(time_decode(processor, audio_data, args.runs))
+        print(f"⏱️  {mode:<8} median {np.median(timings):7.2f} ms | "
+              f"p95 {np.percentile(timings, 95):7.2f} ms | min {timings.min():7.2f} ms")
+
+    n = min(len(outputs['pipe']), len(outputs['tempfile']))
+    max_diff = np.max(np.abs(outputs['pipe'][:n] - outputs['tempfile'][:n])) if n else 0.0
+    print(f"🔍 Samples: pipe={len(outputs['pipe'])}, tempfile={len(outputs['tempfile'])}, "
+          f"max abs diff={max_diff:.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,8 @@ class Config:
     
     # API settings
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    MAX_AUDIO_DURATION = float(os.getenv('MAX_AUDIO_DURATION', 600))  # seconds of audio accepted per request
+    UPLOAD_CHUNK_SIZE = 64 * 1024  # bytes read from the request stream at a time
     REQUEST_TIMEOUT = 30  # seconds
     
     # Security settings
@@ -36,7 +38,17 @@ class Config:
     # Model settings
     TRANSCRIPTION_MODEL = os.getenv('TRANSCRIPTION_MODEL', 'whisper-1')
     TRANSCRIPTION_MODEL_NAME = os.getenv('TRANSCRIPTION_MODEL_NAME', 'openai/whisper-tiny')
+    # 'fp32', or 'int8' for dynamic quantization of Linear layers on CPU (see benchmarks/bench_quantization.py)
+    TRANSCRIPTION_QUANTIZATION = os.getenv('TRANSCRIPTION_QUANTIZATION', 'fp32').lower()
+    # 'auto' picks the fastest installed runtime: ctranslate2, onnxruntime, transformers, speech_recognition
+    TRANSCRIPTION_BACKEND = os.getenv('TRANSCRIPTION_BACKEND', 'auto').lower()
+    MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', 'models')  # converted model artifacts (safetensors, ONNX, CTranslate2)
+    MODEL_OFFLINE = os.getenv('MODEL_OFFLINE', 'False').lower() == 'true'  # never download; require setup_deploy.py artifacts
     EMOTION_MODEL = os.getenv('EMOTION_MODEL', 'emotion-english-distilroberta-base')
+    EMOTION_MODEL_NAME = os.getenv('EMOTION_MODEL_NAME', 'j-hartmann/emotion-english-distilroberta-base')
+    MODEL_LOADING = os.getenv('MODEL_LOADING', 'background').lower()  # 'background' or 'eager' (load at import)
+    MODEL_WARMUP_ENABLED = os.getenv('MODEL_WARMUP_ENABLED', 'True').lower() == 'true'  # synthetic inference after load
+    MODEL_READY_TIMEOUT = float(os.getenv('MODEL_READY_TIMEOUT', 120))  # seconds a request waits for a loading model
     
     # Rate limiting (optional)
     RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'False').lower() == 'true'
@@ -47,6 +59,57 @@ class Config:
     AUDIO_SAMPLE_RATE = int(os.getenv('AUDIO_SAMPLE_RATE', 16000))
     AUDIO_CHANNELS = int(os.getenv('AUDIO_CHANNELS', 1))
     AUDIO_FORMATS = ['wav', 'mp3', 'm4a', 'flac']
+    AUDIO_DECODE_MODE = os.getenv('AUDIO_DECODE_MODE', 'pipe')  # 'pipe' (in-memory) or 'tempfile'
+    
+    # Voice activity detection in front of transcription
+    VAD_ENABLED = os.getenv('VAD_ENABLED', 'True').lower() == 'true'
+    VAD_ABSOLUTE_FLOOR_DB = float(os.getenv('VAD_ABSOLUTE_FLOOR_DB', -50))  # dBFS below which audio is silence
+
+    # Streaming spectral-gate noise reduction in preprocessing
+    NOISE_REDUCTION_ENABLED = os.getenv('NOISE_REDUCTION_ENABLED', 'True').lower() == 'true'
+
+    # Streaming decode: long recordings are decoded and transcribed window by window
+    STREAMING_DECODE_ENABLED = os.getenv('STREAMING_DECODE_ENABLED', 'True').lower() == 'true'
+    STREAM_WINDOW_SECONDS = float(os.getenv('STREAM_WINDOW_SECONDS', 30))  # seconds decoded per streamed block
+    STREAM_PREFETCH_WINDOWS = int(os.getenv('STREAM_PREFETCH_WINDOWS', 1))  # windows decoded ahead of the model
+
+    # Long-form transcription: overlapping, silence-aware windows stitched into one transcript
+    LONG_FORM_ENABLED = os.getenv('LONG_FORM_ENABLED', 'True').lower() == 'true'
+    LONG_FORM_WINDOW_SECONDS = float(os.getenv('LONG_FORM_WINDOW_SECONDS', 30))  # Whisper's context length
+    LONG_FORM_OVERLAP_SECONDS = float(os.getenv('LONG_FORM_OVERLAP_SECONDS', 2))
+    LONG_FORM_SILENCE_SEARCH_SECONDS = float(os.getenv('LONG_FORM_SILENCE_SEARCH_SECONDS', 3))
+
+    # Cross-request micro-batching of Whisper inference
+    WHISPER_BATCHING_ENABLED = os.getenv('WHISPER_BATCHING_ENABLED', 'True').lower() == 'true'
+    WHISPER_MAX_BATCH_SIZE = int(os.getenv('WHISPER_MAX_BATCH_SIZE', 8))  # clips per forward pass
+    WHISPER_BATCH_WAIT_MS = float(os.getenv('WHISPER_BATCH_WAIT_MS', 20))  # longest a clip waits for others to join
+
+    # In-memory cache of transcription results for resent clips (hashes and results only, never audio)
+    TRANSCRIPTION_CACHE_ENABLED = os.getenv('TRANSCRIPTION_CACHE_ENABLED', 'True').lower() == 'true'
+    TRANSCRIPTION_CACHE_SIZE = int(os.getenv('TRANSCRIPTION_CACHE_SIZE', 256))  # entries
+    TRANSCRIPTION_CACHE_TTL = float(os.getenv('TRANSCRIPTION_CACHE_TTL', 300))  # seconds an entry lives
+
+    # Worker processes that decode and preprocess transcribe_chunks() input in parallel
+    CHUNK_POOL_WORKERS = int(os.getenv('CHUNK_POOL_WORKERS', min(4, os.cpu_count() or 1)))
+
+    # Torch thread budget per server process (0 threads = usable cores / SERVER_WORKERS)
+    SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', 1))  # server processes sharing this host's cores
+    SERVER_THREADS = int(os.getenv('SERVER_THREADS', 4))  # request threads per worker (serve.py)
+    SERVER_TIMEOUT = int(os.getenv('SERVER_TIMEOUT', 120))  # seconds before a silent worker is restarted (serve.py)
+    TORCH_NUM_THREADS = int(os.getenv('TORCH_NUM_THREADS', 0))  # intra-op threads per worker
+    TORCH_INTEROP_THREADS = int(os.getenv('TORCH_INTEROP_THREADS', 1))
+    CPU_AFFINITY_ENABLED = os.getenv('CPU_AFFINITY_ENABLED', 'False').lower() == 'true'  # pin each worker to its cores
+    THREAD_BENCHMARK_ON_STARTUP = os.getenv('THREAD_BENCHMARK_ON_STARTUP', 'False').lower() == 'true'
+
+    # Decoder pool settings (shared by all services)
+    DECODER_POOL_SIZE = int(os.getenv('DECODER_POOL_SIZE', min(4, os.cpu_count() or 1)))  # concurrent ffmpeg processes
+    DECODER_QUEUE_SIZE = int(os.getenv('DECODER_QUEUE_SIZE', 16))  # decodes allowed to wait for a worker
+    DECODER_TIMEOUT = float(os.getenv('DECODER_TIMEOUT', 30))  # seconds per decode, including queue wait
+    DECODER_STREAM_BUFFER_MB = int(os.getenv('DECODER_STREAM_BUFFER_MB', 8))  # decoded PCM read ahead per streaming decode
+
+    # Per-request memory accounting (tracemalloc adds CPU overhead; off by default)
+    MEMORY_TRACE_ALLOCATIONS = os.getenv('MEMORY_TRACE_ALLOCATIONS', 'False').lower() == 'true'
+    ARRAY_TRAFFIC_ENABLED = os.getenv('ARRAY_TRAFFIC_ENABLED', 'True').lower() == 'true'  # per-stage float32 copy counters
 
     # Emotion emoji mapping
     EMOTION_EMOJI_MAP = {
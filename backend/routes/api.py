@@ -4,14 +4,22 @@ API routes for ToneBridge Backend
 
 import time
 import base64
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
 
 from services.transcription_service import TranscriptionService
 from services.emotion_service import EmotionService
 from utils.logger import setup_logger, log_request
-from utils.error_handlers import ValidationError, validate_audio_file
+from utils.error_handlers import ValidationError, PayloadTooLargeError, validate_audio_file
+from utils.audio_intake import read_audio_stream, probe_duration, check_duration, PROBE_BYTES
+from utils.decoder_pool import decoder_pool
+from utils.format_sniffer import format_sniffer
+from utils.memory_stats import memory_tracker
+from utils.dtype_policy import array_traffic
+from utils.resampler import resampler
+from utils.inference_runtime import inference_runtime
 from config import Config
 
 logger = setup_logger(__name__)
@@ -23,6 +31,18 @@ api_bp = Blueprint('api', __name__)
 transcription_service = TranscriptionService()
 emotion_service = EmotionService()
 
+@api_bp.before_request
+def start_memory_tracking():
+    """Sample process memory before each API request"""
+    g.memory_start = memory_tracker.start()
+
+@api_bp.after_request
+def finish_memory_tracking(response):
+    """Record the peak RSS of the finished request"""
+    if 'memory_start' in g:
+        memory_tracker.finish(request.endpoint or request.path, g.memory_start)
+    return response
+
 def create_success_response(data: dict, message: str = "Success") -> dict:
     """
     Create standardized success response
@@ -41,75 +61,216 @@ def create_success_response(data: dict, message: str = "Success") -> dict:
         'timestamp': time.time()
     }
 
+def parse_pcm_params(params) -> tuple:
+    """
+    Read the sample rate and channel count declared for raw PCM audio
+    
+    Args:
+        params: Mapping of request parameters
+    
+    Returns:
+        Tuple of (sample_rate, channels); either may be None if not declared
+    """
+    try:
+        sample_rate = int(params['sample_rate']) if params.get('sample_rate') is not None else None
+        channels = int(params['channels']) if params.get('channels') is not None else None
+    except (TypeError, ValueError):
+        raise ValidationError("sample_rate and channels must be integers")
+    
+    if sample_rate is not None and not 8000 <= sample_rate <= 192000:
+        raise ValidationError("sample_rate must be between 8000 and 192000")
+    if channels is not None and not 1 <= channels <= 8:
+        raise ValidationError("channels must be between 1 and 8")
+    
+    return sample_rate, channels
+
+# Request headers that can carry audio parameters for binary request bodies
+AUDIO_PARAM_HEADERS = {
+    'X-Audio-Format': 'format',
+    'X-Sample-Rate': 'sample_rate',
+    'X-Channels': 'channels',
+    'X-Include-Emotion': 'include_emotion',
+    'X-Emotion-Method': 'method'
+}
+
+def normalize_audio_format(audio_format: str):
+    """
+    Normalize a client-supplied audio format or MIME type
+    
+    Args:
+        audio_format: Format name or MIME type (e.g. 'webm', 'audio/webm;codecs=opus')
+    
+    Returns:
+        Normalized format name, or None if the format should be detected from the audio bytes
+    """
+    if not audio_format:
+        return None
+    
+    # Map common MIME types to format names
+    format_mapping = {
+        'audio/webm': 'webm',
+        'audio/mp4': 'mp4',
+        'audio/wav': 'wav',
+        'audio/x-wav': 'wav',
+        'audio/wave': 'wav',
+        'audio/mpeg': 'mp3',
+        'audio/ogg': 'ogg',
+        'audio/flac': 'flac',
+        'audio/x-flac': 'flac',
+        'audio/aac': 'aac'
+    }
+    
+    # Drop MIME parameters such as 'audio/webm;codecs=opus'
+    audio_format = audio_format.split(';')[0].lower().strip()
+    
+    # If format looks like a MIME type, convert it
+    if audio_format.startswith('audio/'):
+        audio_format = format_mapping.get(audio_format, audio_format.split('/')[-1])
+    
+    # Unknown labels are not trusted; the decoder sniffs the real format from the bytes
+    supported_formats = ['wav', 'webm', 'mp4', 'mp3', 'ogg', 'flac', 'aac', 'm4a', 'pcm_s16le', 'pcm_f32le']
+    if audio_format not in supported_formats:
+        logger.warning(f"Unrecognized format '{audio_format}', detecting from audio content")
+        return None
+    
+    return audio_format
+
+def parse_bool(value, default: bool = True) -> bool:
+    """Parse a boolean parameter that may arrive as a JSON bool or a string"""
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('true', '1', 'yes')
+
+def read_audio_request() -> tuple:
+    """
+    Read audio bytes and parameters from the current request
+    
+    Supports three request bodies:
+    - application/json: base64 audio in 'audio', parameters in the JSON object
+    - application/octet-stream or audio/*: raw audio bytes as the body,
+      parameters in the query string or X-Audio-* headers
+    - multipart/form-data: audio in an 'audio' file part, parameters in
+      form fields, the query string or headers
+    
+    Returns:
+        Tuple of (audio_data, params); audio_data is None if no audio was sent
+    """
+    mimetype = request.mimetype
+    
+    if mimetype in ('application/octet-stream', 'multipart/form-data') or mimetype.startswith('audio/'):
+        params = {name: request.headers[header] for header, name in AUDIO_PARAM_HEADERS.items()
+                  if header in request.headers}
+        params.update(request.args.to_dict())
+        
+        if mimetype == 'multipart/form-data':
+            parse_multipart()
+            params.update(request.form.to_dict())
+            upload = request.files.get('audio')
+            if upload and 'format' not in params:
+                params['format'] = upload.mimetype if upload.mimetype.startswith('audio/') else upload.filename.rsplit('.', 1)[-1]
+            stream, content_length = (upload.stream, None) if upload else (None, None)
+        else:
+            if mimetype.startswith('audio/') and 'format' not in params:
+                params['format'] = request.content_type
+            stream, content_length = request.stream, request.content_length
+        
+        if stream is None:
+            return None, params
+        
+        # Stream the body straight into bytes with size/duration limits; no text or base64 round trip
+        sample_rate, channels = parse_pcm_params(params)
+        audio_data = read_audio_stream(stream, params.get('format'), content_length, sample_rate, channels)
+        return audio_data or None, params
+    
+    data = request.get_json()
+    if not data:
+        raise ValidationError("No JSON data provided")
+    
+    params = dict(data)
+    audio_b64 = params.pop('audio', None)
+    if not audio_b64:
+        return None, params
+    
+    # Decode base64 audio
+    try:
+        audio_data = base64.b64decode(audio_b64)
+    except Exception as e:
+        logger.error(f"Base64 decoding failed: {str(e)}")
+        raise ValidationError(f"Invalid base64 audio data: {str(e)}")
+    
+    if len(audio_data) == 0:
+        raise ValidationError("Audio data is empty after base64 decoding")
+    
+    # Refuse overlong audio from its header before any decode or model work
+    sample_rate, channels = parse_pcm_params(params)
+    check_duration(probe_duration(audio_data[:PROBE_BYTES], params.get('format'), len(audio_data),
+                                  sample_rate, channels))
+    return audio_data, params
+
+def check_content_length():
+    """Reject a request whose declared size exceeds the upload limit before reading it"""
+    if request.content_length is not None and request.content_length > Config.MAX_CONTENT_LENGTH:
+        raise PayloadTooLargeError(
+            f"Request of {request.content_length} bytes exceeds the {Config.MAX_CONTENT_LENGTH} byte limit"
+        )
+
+def parse_multipart():
+    """
+    Parse a multipart body within the upload limit
+    
+    werkzeug parses the whole form before a view can read the file part,
+    buffering each part (in memory up to 500 KB, then in a temporary file),
+    so multipart uploads are not streamed the way raw-body uploads are.
+    The limit is still enforced before and during parsing: a declared
+    Content-Length is checked up front, and the app's MAX_CONTENT_LENGTH
+    makes werkzeug stop reading a chunked body as soon as it exceeds it.
+    """
+    check_content_length()
+    try:
+        request.files
+    except RequestEntityTooLarge:
+        raise PayloadTooLargeError(f"Upload exceeds the {Config.MAX_CONTENT_LENGTH} byte limit")
+
 @api_bp.route('/transcribe', methods=['POST'])
 def transcribe_audio():
     """
     Transcribe audio and detect emotion
     
+    Accepts a JSON body, a raw binary body (application/octet-stream or
+    audio/*) or a multipart body; see read_audio_request.
+    
     Expected request:
-    - audio: base64 encoded audio data
-    - format: audio format (optional, defaults to 'wav')
+    - audio: base64 encoded audio data (JSON), or the raw body / 'audio' file part
+    - format: audio format (optional, defaults to 'wav'); 'pcm_s16le' and
+      'pcm_f32le' send headerless little-endian PCM that skips decoding
+    - sample_rate: sample rate of raw PCM audio (optional, defaults to 16000)
+    - channels: channel count of raw PCM audio (optional, defaults to 1)
     - include_emotion: boolean (optional, defaults to True)
     """
     start_time = time.time()
     
     try:
         # Get request data
-        data = request.get_json()
-        if not data:
-            raise ValidationError("No JSON data provided")
+        audio_data, params = read_audio_request()
         
         # Extract parameters
-        audio_b64 = data.get('audio')
-        audio_format = data.get('format', 'wav')
-        include_emotion = data.get('include_emotion', True)
-        
-        # Normalize and validate audio format
-        if audio_format:
-            # Map common MIME types to format names
-            format_mapping = {
-                'audio/webm': 'webm',
-                'audio/mp4': 'mp4',
-                'audio/wav': 'wav',
-                'audio/mpeg': 'mp3',
-                'audio/ogg': 'ogg',
-                'audio/flac': 'flac',
-                'audio/aac': 'aac'
-            }
-            
-            # If format looks like a MIME type, convert it
-            if audio_format.startswith('audio/'):
-                audio_format = format_mapping.get(audio_format, audio_format.split('/')[-1])
-            
-            # Clean up format name
-            audio_format = audio_format.lower().strip()
-            
-            # Validate format
-            supported_formats = ['wav', 'webm', 'mp4', 'mp3', 'ogg', 'flac', 'aac', 'm4a']
-            if audio_format not in supported_formats:
-                logger.warning(f"Unsupported format '{audio_format}', defaulting to 'wav'")
-                audio_format = 'wav'
+        audio_format = normalize_audio_format(params.get('format', 'wav'))
+        include_emotion = parse_bool(params.get('include_emotion'), default=True)
+        sample_rate, channels = parse_pcm_params(params)
         
-        if not audio_b64:
+        if not audio_data:
             raise ValidationError("No audio data provided")
         
-        # Decode base64 audio
-        try:
-            audio_data = base64.b64decode(audio_b64)
-            logger.info(f"Audio data decoded successfully: {len(audio_data)} bytes, format: {audio_format}")
-            
-            # Validate audio data
-            if len(audio_data) == 0:
-                raise ValidationError("Audio data is empty after base64 decoding")
-            if len(audio_data) < 100:  # Very small audio files are suspicious
-                logger.warning(f"Audio data seems very small: {len(audio_data)} bytes")
-                
-        except Exception as e:
-            logger.error(f"Base64 decoding failed: {str(e)}")
-            raise ValidationError(f"Invalid base64 audio data: {str(e)}")
+        logger.info(f"Audio data received: {len(audio_data)} bytes, format: {audio_format}")
+        if len(audio_data) < 100:  # Very small audio files are suspicious
+            logger.warning(f"Audio data seems very small: {len(audio_data)} bytes")
         
         # Transcribe audio
-        transcription_result = transcription_service.transcribe_audio(audio_data, audio_format)
+        transcription_result = transcription_service.transcribe_audio(
+            audio_data, audio_format, sample_rate=sample_rate, channels=channels
+        )
         
         # Initialize response
         response_data = {
@@ -149,9 +310,13 @@ def detect_emotion():
     """
     Detect emotion from text or audio
     
+    Accepts a JSON body, a raw binary body (application/octet-stream or
+    audio/*) or a multipart body; see read_audio_request.
+    
     Expected request:
     - text: text to analyze (optional if audio provided)
-    - audio: base64 encoded audio data (optional if text provided)
+    - audio: base64 encoded audio data (JSON), or the raw body / 'audio' file part
+      (optional if text provided)
     - format: audio format (optional, defaults to 'wav')
     - method: 'text', 'audio', or 'combined' (optional, defaults to 'combined')
     """
@@ -159,17 +324,14 @@ def detect_emotion():
     
     try:
         # Get request data
-        data = request.get_json()
-        if not data:
-            raise ValidationError("No JSON data provided")
+        audio_data, params = read_audio_request()
         
         # Extract parameters
-        text = data.get('text', '').strip()
-        audio_b64 = data.get('audio')
-        audio_format = data.get('format', 'wav')
-        method = data.get('method', 'combined')
+        text = (params.get('text') or '').strip()
+        audio_format = normalize_audio_format(params.get('format', 'wav'))
+        method = params.get('method', 'combined')
         
-        if not text and not audio_b64:
+        if not text and not audio_data:
             raise ValidationError("Either text or audio must be provided")
         
         # Detect emotion based on method
@@ -179,17 +341,12 @@ def detect_emotion():
             emotion_result = emotion_service.detect_emotion_from_text(text)
             
         elif method == 'audio':
-            if not audio_b64:
+            if not audio_data:
                 raise ValidationError("Audio is required for audio-only emotion detection")
             
-            audio_data = base64.b64decode(audio_b64)
             emotion_result = emotion_service.detect_emotion_from_audio(audio_data, audio_format)
             
         else:  # combined
-            audio_data = None
-            if audio_b64:
-                audio_data = base64.b64decode(audio_b64)
-            
             emotion_result = emotion_service.detect_emotion_combined(text, audio_data, audio_format)
         
         # Prepare response
@@ -214,7 +371,7 @@ def detect_emotion():
         duration = time.time() - start_time
         log_request(logger, {
             'text_length': len(text),
-            'audio_length': len(audio_b64) if audio_b64 else 0,
+            'audio_length': len(audio_data) if audio_data else 0,
             'method': method
         }, response_data, duration)
         
@@ -232,10 +389,17 @@ def upload_audio():
     Expected request:
     - file: audio file (multipart/form-data)
     - include_emotion: boolean (optional, defaults to True)
+    
+    The multipart form is buffered by werkzeug before the file is read, so
+    the upload limit is enforced while parsing but the body is not streamed;
+    use /transcribe with a raw body for chunked reading in bounded memory.
     """
     start_time = time.time()
     
     try:
+        # Refuse oversized uploads before and while the form is parsed
+        parse_multipart()
+        
         # Check if file was uploaded
         if 'file' not in request.files:
             raise ValidationError("No file uploaded")
@@ -248,9 +412,9 @@ def upload_audio():
         # Get parameters
         include_emotion = request.form.get('include_emotion', 'true').lower() == 'true'
         
-        # Read file data
-        audio_data = file.read()
+        # The part is already buffered by the form parser; this only rejects overlong audio from its header
         audio_format = file.filename.split('.')[-1].lower()
+        audio_data = read_audio_stream(file.stream, audio_format)
         
         # Transcribe audio
         transcription_result = transcription_service.transcribe_audio(audio_data, audio_format)
@@ -299,6 +463,20 @@ def health_check():
         'timestamp': time.time()
     })
 
+@api_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Runtime metrics for the audio pipeline"""
+    return jsonify(create_success_response({
+        'decoder_pool': decoder_pool.get_stats(),
+        'audio_formats': format_sniffer.get_stats(),
+        'memory': memory_tracker.get_stats(),
+        'array_traffic': array_traffic.get_stats(),
+        'resampler': resampler.get_stats(),
+        'inference_runtime': inference_runtime.get_stats(),
+        'transcription_batching': transcription_service.get_batching_stats(),
+        'transcription_cache': transcription_service.get_cache_stats()
+    }, "Metrics retrieved"))
+
 @api_bp.route('/debug/audio', methods=['POST'])
 def debug_audio():
     """Debug endpoint to test audio data"""
@@ -334,10 +512,12 @@ def debug_audio():
 @api_bp.route('/models', methods=['GET'])
 def get_models():
     """Get available models and their status"""
+    backend = transcription_service.get_backend_info()
     return jsonify(create_success_response({
         'transcription_models': {
-            'whisper': transcription_service.whisper_pipeline is not None,
-            'speech_recognition': True
+            'whisper': backend['name'] not in (None, 'speech_recognition'),
+            'speech_recognition': 'speech_recognition' in backend['available'],
+            'backend': backend
         },
         'emotion_models': {
             'text_classification': emotion_service.text_emotion_pipeline is not None,
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+ToneBridge Backend Production Server
+Loads the models once, then forks gunicorn workers that share them copy-on-write
+"""
+
+import os
+import sys
+import time
+import threading
+
+from config import get_config
+from utils.logger import setup_logger
+from utils.model_loader import model_loader
+from utils.inference_runtime import inference_runtime
+from utils.memory_stats import memory_breakdown
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # Windows, or gunicorn not installed
+    BaseApplication = None
+
+logger = setup_logger(__name__)
+
+def pre_fork(server, worker):
+    """Give each new worker the lowest free slot, so core slices stay stable across restarts"""
+    taken = {getattr(other, 'slot', None) for other in server.WORKERS.values()}
+    worker.slot = next(slot for slot in range(len(taken) + 1) if slot not in taken)
+
+def post_fork(server, worker):
+    """Apply this worker's thread budget and core slice, then warm up its models"""
+    os.environ['WORKER_INDEX'] = str(worker.slot)
+    inference_runtime.configure(worker_index=worker.slot)
+    model_loader.start_warmup()
+    threading.Thread(target=report_memory, args=(worker.slot,), name='memory-report', daemon=True).start()
+
+def report_memory(slot: int):
+    """Log how much of this worker's memory is its own once its models are warm"""
+    for name in model_loader.get_status()['models']:
+        model_loader.wait(name)
+    sharing = memory_breakdown()
+    if sharing:
+        logger.info(f"Worker {slot} (pid {os.getpid()}) warm: {sharing['rss_mb']} MB RSS, "
+                    f"{sharing['unique_mb']} MB unique, {sharing['shared_mb']} MB shared")
+
+if BaseApplication is not None:
+    class PreforkServer(BaseApplication):
+        """
+        gunicorn server that loads the application in the master process
+
+        The master imports the app, loads every model without warming it up,
+        moves the weights to shared memory and freezes the heap; workers are
+        forked afterwards and map the same weight pages instead of loading
+        their own copy. Warmup runs in each worker, so thread pools and
+        kernel caches are created after the fork (OpenMP pools do not
+        survive one) and /ready turns ready per worker.
+        """
+
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            started = time.perf_counter()
+            from app import create_app
+            model_loader.load_all(warmup=False)
+            app = create_app(get_config())
+            model_loader.prepare_fork()
+
+            status = model_loader.get_status()['models']
+            logger.info(f"Models loaded in the master in {(time.perf_counter() - started) * 1000:.0f}ms: "
+                        f"{ {name: model['state'] for name, model in status.items()} }")
+            sharing = memory_breakdown()
+            if sharing:
+                logger.info(f"Master RSS before fork: {sharing['rss_mb']} MB")
+            return app
+
+def main():
+    """Production entry point"""
+    if BaseApplication is None:
+        print("❌ serve.py needs gunicorn (Linux/macOS); use run.py for development")
+        sys.exit(1)
+
+    config = get_config()
+    host = os.getenv('HOST', config.HOST)
+    port = int(os.getenv('PORT', config.PORT))
+
+    print("🚀 Starting ToneBridge Backend (Production, prefork)")
+    print(f"📍 Server: http://{host}:{port}")
+    print(f"👷 Workers: {config.SERVER_WORKERS} x {config.SERVER_THREADS} threads")
+    print("🔒 Privacy: No data storage enabled")
+
+    PreforkServer({
+        'bind': f"{host}:{port}",
+        'workers': config.SERVER_WORKERS,
+        'worker_class': 'gthread',
+        'threads': config.SERVER_THREADS,
+        'timeout': config.SERVER_TIMEOUT,
+        'preload_app': True,
+        'pre_fork': pre_fork,
+        'post_fork': post_fork
+    }).run()
+
+if __name__ == '__main__':
+    main()
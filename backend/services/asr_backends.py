@@ -0,0 +1,352 @@
+"""
+Speech-to-text backends for ToneBridge Backend
+A common interface over the ASR runtimes the service can use, with a registry selected by config
+"""
+
+import os
+import importlib
+import importlib.util
+import numpy as np
+from typing import Dict, Any, List, Type, Tuple
+from utils.logger import setup_logger
+from utils.error_handlers import AudioProcessingError, ModelError
+from utils.inference_runtime import inference_mode
+from utils.model_artifacts import artifact_path, pipeline_source, check_download_allowed
+from config import Config
+
+logger = setup_logger(__name__)
+
+# Backends tried by TRANSCRIPTION_BACKEND=auto, fastest CPU runtime first
+AUTO_BACKEND_ORDER = ('ctranslate2', 'onnxruntime', 'transformers', 'speech_recognition')
+
+ASR_BACKENDS: Dict[str, Type['ASRBackend']] = {}
+
+def register_backend(backend_class: Type['ASRBackend']) -> Type['ASRBackend']:
+    """Class decorator adding a backend to the registry under its name"""
+    ASR_BACKENDS[backend_class.name] = backend_class
+    return backend_class
+
+class ASRBackend:
+    """
+    Interface every speech-to-text backend implements
+
+    A backend is constructed cheaply, then load() brings up the model.
+    transcribe_batch() takes a list of {'array', 'sampling_rate'} inputs
+    (mono float32, already preprocessed) and returns one {'text'} dict per
+    input, optionally with a 'confidence'. Backends without native batching
+    loop over the list. Capabilities tell the service what the backend can
+    do: batching (worth putting a micro-batcher in front of), timestamps,
+    the precisions it can run, and whether it needs the network.
+    """
+
+    name = ''
+    # Label reported as the result's 'model', kept stable for API clients
+    model_label = 'whisper'
+    # Python modules that must be importable for the backend to work
+    requires: Tuple[str, ...] = ()
+    capabilities: Dict[str, Any] = {
+        'batching': False,
+        'timestamps': False,
+        'precisions': ('fp32',),
+        'network': False
+    }
+
+    def __init__(self, model_name: str, precision: str = 'fp32'):
+        self.model_name = model_name
+        self.requested_precision = precision
+        self.precision = 'fp32'
+        self.device = 'cpu'
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Tell whether the backend's runtime is installed, without importing it"""
+        return all(importlib.util.find_spec(module) is not None for module in cls.requires)
+
+    def load(self):
+        """Load the model; raises if the backend cannot run here"""
+        raise NotImplementedError
+
+    def transcribe_batch(self, audio_inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Transcribe several clips
+
+        Args:
+            audio_inputs: Dicts with 'array' (float32 samples) and 'sampling_rate'
+
+        Returns:
+            One dict per input with 'text' and optionally 'confidence'
+        """
+        raise NotImplementedError
+
+    def share_memory(self):
+        """Move the weights to shared memory before forking workers (no-op for runtimes that keep them in C++)"""
+
+    def _resolve_precision(self, supported: Tuple[str, ...]) -> str:
+        """Use the requested precision if this backend and device support it, else fp32"""
+        if self.requested_precision in supported:
+            return self.requested_precision
+        if self.requested_precision != 'fp32':
+            logger.warning(f"{self.name} backend cannot run {self.requested_precision} on {self.device}; using fp32")
+        return 'fp32'
+
+    def get_info(self) -> Dict[str, Any]:
+        """Describe the loaded backend"""
+        return {
+            'name': self.name,
+            'model': self.model_name,
+            'device': self.device,
+            'precision': self.precision,
+            'capabilities': {key: list(value) if isinstance(value, tuple) else value
+                             for key, value in self.capabilities.items()}
+        }
+
+@register_backend
+class TransformersBackend(ASRBackend):
+    """Hugging Face transformers pipeline (PyTorch), optionally int8-quantized on CPU"""
+
+    name = 'transformers'
+    requires = ('torch', 'transformers')
+    capabilities = {
+        'batching': True,
+        'timestamps': True,
+        'precisions': ('fp32', 'int8'),
+        'network': False
+    }
+
+    def __init__(self, model_name: str, precision: str = 'fp32'):
+        super().__init__(model_name, precision)
+        self.pipeline = None
+
+    def load(self):
+        torch = importlib.import_module('torch')
+        transformers = importlib.import_module('transformers')
+        logger.info(f"torch version: {torch.__version__}, transformers version: {transformers.__version__}")
+
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        logger.info(f"Initializing Whisper pipeline with model: {self.model_name} on {self.device}")
+        source, model_kwargs = pipeline_source(self.model_name)
+        self.pipeline = transformers.pipeline(
+            "automatic-speech-recognition",
+            model=source,
+            device=self.device,
+            model_kwargs=model_kwargs
+        )
+        self._apply_precision()
+
+    def share_memory(self):
+        # int8 packed weights live in quantized-op objects that share_memory leaves in place
+        self.pipeline.model.share_memory()
+
+    def _apply_precision(self):
+        """Quantize the loaded model if int8 was requested; quantized kernels only exist for CPU"""
+        self.precision = self._resolve_precision(('fp32', 'int8') if self.device == 'cpu' else ('fp32',))
+        if self.precision == 'int8':
+            from utils.quantization import quantize_dynamic_int8
+            self.pipeline.model = quantize_dynamic_int8(self.pipeline.model)
+
+    def transcribe_batch(self, audio_inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # The feature extractor pads every clip to Whisper's 30 s input, so clips of any length share a batch
+        with inference_mode():
+            if len(audio_inputs) == 1:
+                outputs = [self.pipeline(audio_inputs[0])]
+            else:
+                outputs = self.pipeline(audio_inputs, batch_size=len(audio_inputs))
+        return [{'text': output.get('text', '').strip()} for output in outputs]
+
+@register_backend
+class OnnxRuntimeBackend(TransformersBackend):
+    """Whisper exported to ONNX and run by ONNX Runtime through optimum's pipeline integration"""
+
+    name = 'onnxruntime'
+    requires = ('onnxruntime', 'optimum', 'transformers')
+    capabilities = {
+        'batching': True,
+        'timestamps': True,
+        'precisions': ('fp32',),
+        'network': False
+    }
+
+    def load(self):
+        onnxruntime = importlib.import_module('optimum.onnxruntime')
+        transformers = importlib.import_module('transformers')
+
+        # The export runs once, from the local safetensors artifact when there is one; later starts
+        # load the saved ONNX graphs and processor without touching the hub
+        export_dir = artifact_path('onnx', self.model_name)
+        if os.path.isdir(export_dir):
+            model = onnxruntime.ORTModelForSpeechSeq2Seq.from_pretrained(export_dir, local_files_only=True)
+            processor = transformers.AutoProcessor.from_pretrained(export_dir, local_files_only=True)
+        else:
+            source, source_kwargs = pipeline_source(self.model_name)
+            local_files_only = source_kwargs.get('local_files_only', False)
+            logger.info(f"Exporting {self.model_name} to ONNX in {export_dir}")
+            model = onnxruntime.ORTModelForSpeechSeq2Seq.from_pretrained(source, export=True,
+                                                                         local_files_only=local_files_only)
+            processor = transformers.AutoProcessor.from_pretrained(source, local_files_only=local_files_only)
+            model.save_pretrained(export_dir)
+            processor.save_pretrained(export_dir)
+
+        self.device = 'cpu'
+        self.precision = self._resolve_precision(('fp32',))
+        self.pipeline = transformers.pipeline(
+            "automatic-speech-recognition",
+            model=model,
+            tokenizer=processor.tokenizer,
+            feature_extractor=processor.feature_extractor
+        )
+
+    def share_memory(self):
+        """
+        No-op: the ONNX Runtime sessions hold their weights in C++ memory, not torch tensors
+
+        Forked workers still map the parent's session pages copy-on-write.
+        """
+
+@register_backend
+class CTranslate2Backend(ASRBackend):
+    """Whisper converted to CTranslate2 and run by faster-whisper (int8/fp16 kernels, no PyTorch)"""
+
+    name = 'ctranslate2'
+    requires = ('ctranslate2', 'faster_whisper')
+    capabilities = {
+        'batching': False,
+        'timestamps': True,
+        'precisions': ('fp32', 'int8'),
+        'network': False
+    }
+
+    def __init__(self, model_name: str, precision: str = 'fp32'):
+        super().__init__(model_name, precision)
+        self.model = None
+
+    def load(self):
+        ctranslate2 = importlib.import_module('ctranslate2')
+        faster_whisper = importlib.import_module('faster_whisper')
+
+        self.device = 'cuda' if ctranslate2.get_cuda_device_count() > 0 else 'cpu'
+        self.precision = self._resolve_precision(('fp32', 'int8'))
+        compute_type = 'int8' if self.precision == 'int8' else ('float16' if self.device == 'cuda' else 'float32')
+
+        # A model converted into the artifact directory is used as is; otherwise faster-whisper fetches
+        # its converted openai checkpoint by size ('tiny', 'base', ...) into the same cache
+        converted_dir = artifact_path('ctranslate2', self.model_name)
+        if os.path.isfile(os.path.join(converted_dir, 'model.bin')):
+            model = converted_dir
+        else:
+            model = self.model_name.split('openai/whisper-', 1)[-1]
+        try:
+            self.model = faster_whisper.WhisperModel(model, device=self.device, compute_type=compute_type,
+                                                     download_root=os.path.join(Config.MODEL_CACHE_DIR, 'ctranslate2'),
+                                                     local_files_only=Config.MODEL_OFFLINE)
+        except Exception:
+            if model != converted_dir:
+                # Offline, a checkpoint missing from the cache is a missing artifact, not a load failure
+                check_download_allowed(self.model_name)
+            raise
+        logger.info(f"Loaded CTranslate2 Whisper '{model}' on {self.device} ({compute_type})")
+
+    def transcribe_batch(self, audio_inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results = []
+        for audio_input in audio_inputs:
+            # Greedy decoding, as the transformers pipeline does by default
+            segments, _ = self.model.transcribe(audio_input['array'], beam_size=1)
+            results.append({'text': ' '.join(segment.text.strip() for segment in segments).strip()})
+        return results
+
+@register_backend
+class SpeechRecognitionBackend(ASRBackend):
+    """speech_recognition library: Google Web Speech API, with CMU Sphinx as the offline fallback"""
+
+    name = 'speech_recognition'
+    model_label = 'speech_recognition'
+    requires = ('speech_recognition',)
+    capabilities = {
+        'batching': False,
+        'timestamps': False,
+        'precisions': ('fp32',),
+        'network': True
+    }
+
+    def __init__(self, model_name: str, precision: str = 'fp32'):
+        super().__init__(model_name, precision)
+        self.model_name = 'google+sphinx'
+        self.recognizer = None
+
+    def load(self):
+        speech_recognition = importlib.import_module('speech_recognition')
+        self.recognizer = speech_recognition.Recognizer()
+        self._audio_data = speech_recognition.AudioData
+        self.precision = self._resolve_precision(('fp32',))
+
+    def transcribe_batch(self, audio_inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self._recognize(audio_input['array'], audio_input['sampling_rate']) for audio_input in audio_inputs]
+
+    def _recognize(self, audio_array: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        """Recognize one clip, given as float samples, via 16-bit PCM"""
+        pcm = (np.clip(audio_array, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+        audio = self._audio_data(pcm, sample_rate=sample_rate, sample_width=2)
+
+        # Try Google Speech Recognition
+        try:
+            result = self.recognizer.recognize_google(audio, show_all=True)
+            if result and 'alternative' in result:
+                logger.info("Used Google Speech Recognition")
+                return {
+                    'text': result['alternative'][0]['transcript'].strip(),
+                    'confidence': result['alternative'][0].get('confidence', 0.0)
+                }
+        except Exception as e:
+            logger.warning(f"Google Speech Recognition failed: {str(e)}")
+
+        # Fallback to Sphinx if Google fails
+        try:
+            text = self.recognizer.recognize_sphinx(audio)
+            logger.info("Used Sphinx recognition")
+            # Sphinx doesn't provide confidence scores
+            return {'text': text.strip(), 'confidence': 0.5}
+        except Exception as e:
+            logger.error(f"Sphinx recognition failed: {str(e)}")
+            raise AudioProcessingError("All speech recognition methods failed")
+
+def available_backends() -> List[str]:
+    """Names of registered backends whose runtime is installed"""
+    return [name for name, backend_class in ASR_BACKENDS.items() if backend_class.is_available()]
+
+def create_backend(preference: str = 'auto', model_name: str = 'openai/whisper-tiny',
+                   precision: str = 'fp32') -> ASRBackend:
+    """
+    Load the configured backend, or the fastest one available
+
+    An explicitly configured backend that fails to load falls back to the
+    automatic order, so a node missing a runtime still serves requests.
+
+    Args:
+        preference: Backend name, or 'auto'
+        model_name: Hugging Face model id
+        precision: Requested precision ('fp32' or 'int8')
+
+    Returns:
+        A loaded backend
+    """
+    if preference != 'auto' and preference not in ASR_BACKENDS:
+        logger.warning(f"Unknown TRANSCRIPTION_BACKEND '{preference}', selecting automatically")
+        preference = 'auto'
+
+    candidates = list(AUTO_BACKEND_ORDER) if preference == 'auto' else \
+        [preference] + [name for name in AUTO_BACKEND_ORDER if name != preference]
+
+    for name in candidates:
+        backend_class = ASR_BACKENDS[name]
+        if not backend_class.is_available():
+            logger.info(f"ASR backend '{name}' is not installed")
+            continue
+        backend = backend_class(model_name, precision)
+        try:
+            backend.load()
+        except Exception as e:
+            logger.warning(f"ASR backend '{name}' failed to load: {str(e)}")
+            continue
+        logger.info(f"Using ASR backend '{name}' ({backend.device}, {backend.precision})")
+        return backend
+
+    raise ModelError("No speech-to-text backend could be loaded")
@@ -4,18 +4,16 @@ Supports multiple emotion detection models
 """
 
 import os
+import importlib.util
 import numpy as np
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Union
 
-# Optional imports for transformer models
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-    import torch
-    TRANSFORMERS_AVAILABLE = True
+# Optional transformer models; imported when the models load, so importing this module stays fast
+TRANSFORMERS_AVAILABLE = all(importlib.util.find_spec(module) is not None for module in ('torch', 'transformers'))
+if TRANSFORMERS_AVAILABLE:
     print("✅ PyTorch/Transformers available for emotion detection")
-except ImportError as e:
-    TRANSFORMERS_AVAILABLE = False
-    print(f"⚠️ Warning: PyTorch/Transformers not available: {e}")
+else:
+    print("⚠️ Warning: PyTorch/Transformers not available")
     print("⚠️ Using rule-based emotion detection as fallback")
 
 # StandardScaler import removed for deployment - not needed for basic emotion detection
@@ -23,8 +21,15 @@ from utils.logger import setup_logger
 from utils.error_handlers import ModelError
 try:
     from utils.audio_utils import audio_processor
+    from utils.feature_engine import FEATURE_STAT_KEYS
 except ImportError:
     from utils.audio_utils_deploy import audio_processor
+    # The deploy processor returns raw per-feature values, never engine statistics
+    FEATURE_STAT_KEYS = ()
+from utils.decoded_audio import DecodedAudio, decode_audio
+from utils.inference_runtime import inference_runtime, inference_mode
+from utils.model_loader import model_loader, synthetic_speech
+from utils.model_artifacts import pipeline_source
 from config import Config
 
 logger = setup_logger(__name__)
@@ -36,17 +41,23 @@ class EmotionService:
         self.text_emotion_pipeline = None
         self.audio_emotion_model = None
         self.scaler = None  # Not needed for deployment
-        self._initialize_models()
+        # Loaded in the background by model_loader; rule-based detection serves until then
+        model_loader.register('emotion', self._initialize_models, self._warmup,
+                              share=lambda: self.text_emotion_pipeline.model.share_memory())
     
     def _initialize_models(self):
         """Initialize emotion detection models"""
         logger.info(f"TRANSFORMERS_AVAILABLE for emotion: {TRANSFORMERS_AVAILABLE}")
+        inference_runtime.configure()
         
         if not TRANSFORMERS_AVAILABLE:
             logger.info("PyTorch/Transformers not available. Using rule-based emotion detection.")
-            return
+            raise ModelError("PyTorch/Transformers not available; using rule-based emotion detection")
             
         try:
+            import torch
+            from transformers import pipeline
+            
             # Initialize text-based emotion detection
             if torch.cuda.is_available():
                 device = "cuda"
@@ -55,23 +66,18 @@ class EmotionService:
                 device = "cpu"
                 logger.info("Using CPU for emotion detection")
             
-            # Use a reliable, public emotion model
-            emotion_model = "j-hartmann/emotion-english-distilroberta-base"
+            emotion_model = Config.EMOTION_MODEL_NAME
             logger.info(f"Initializing emotion pipeline with model: {emotion_model}")
             
-            # Test if we can import the pipeline function
             logger.info("Creating pipeline...")
+            source, model_kwargs = pipeline_source(emotion_model)
             self.text_emotion_pipeline = pipeline(
                 "text-classification",
-                model=emotion_model,
-                device=device
+                model=source,
+                device=device,
+                model_kwargs=model_kwargs
             )
             
-            # Test the pipeline with a simple input
-            logger.info("Testing pipeline with sample input...")
-            test_result = self.text_emotion_pipeline("I am happy")
-            logger.info(f"Pipeline test result: {test_result}")
-            
             logger.info("Emotion detection models initialized successfully")
             logger.info(f"Emotion pipeline created: {self.text_emotion_pipeline is not None}")
             
@@ -82,6 +88,17 @@ class EmotionService:
             logger.error(f"Full traceback: {tb}")
             logger.info("Falling back to rule-based emotion detection")
             self.text_emotion_pipeline = None
+            raise ModelError(f"Failed to initialize emotion models: {str(e)}")
+    
+    def _warmup(self):
+        """Run the text model and the audio feature path once on synthetic input"""
+        with inference_mode():
+            test_result = self.text_emotion_pipeline("I am happy")
+        logger.info(f"Pipeline test result: {test_result}")
+        
+        # Runs preprocessing (denoise, normalize, trim) and the feature engine's STFT once;
+        # pitch is computed only on demand and is not warmed
+        self.detect_emotion_from_audio(DecodedAudio('warmup', synthetic_speech(), 16000))
     
     def detect_emotion_from_text(self, text: str) -> Dict[str, Any]:
         """
@@ -107,12 +124,16 @@ class EmotionService:
             logger.info(f"text_emotion_pipeline exists: {self.text_emotion_pipeline is not None}")
             logger.info(f"Input text: '{text}'")
             
+            # Requests that arrive while the model loads wait for it rather than silently using rules
+            model_loader.wait('emotion', Config.MODEL_READY_TIMEOUT)
+            
             # Use transformer model if available
             if TRANSFORMERS_AVAILABLE and self.text_emotion_pipeline:
                 logger.info("Using AI-based emotion detection (transformer model)")
                 try:
                     # Get emotion prediction
-                    result = self.text_emotion_pipeline(text)
+                    with inference_mode():
+                        result = self.text_emotion_pipeline(text)
                     logger.info(f"Raw pipeline result: {result}")
                     
                     # Extract emotion and confidence
@@ -153,27 +174,24 @@ class EmotionService:
             logger.error(f"Full error traceback: {traceback.format_exc()}")
             return self._detect_emotion_rule_based(text)
     
-    def detect_emotion_from_audio(self, audio_data: bytes, audio_format: str = 'wav') -> Dict[str, Any]:
+    def detect_emotion_from_audio(self, audio: Union[bytes, DecodedAudio], audio_format: str = 'wav') -> Dict[str, Any]:
         """
         Detect emotion from audio using audio features
         
         Args:
-            audio_data: Audio data as bytes
-            audio_format: Format of the audio data
+            audio: Audio data as bytes, or audio already decoded for this request
+            audio_format: Format of the audio data (bytes input only)
         
         Returns:
             Dictionary with emotion detection results
         """
         try:
-            # Load and preprocess audio
-            audio_array, sample_rate = audio_processor.load_audio(audio_data)
-            audio_array = audio_processor.preprocess_audio(audio_array, sample_rate)
-            
-            # Extract audio features
-            features = audio_processor.extract_audio_features(audio_array, sample_rate)
+            # Decode once per request; preprocessing and features are cached on the decoded audio
+            if not isinstance(audio, DecodedAudio):
+                audio = decode_audio(audio, audio_format)
             
             # Analyze features for emotion
-            emotion_result = self._analyze_audio_features(features, audio_array, sample_rate)
+            emotion_result = self._analyze_audio_features(audio.features, audio.preprocessed, audio.sample_rate)
             
             logger.info(f"Audio emotion detected: {emotion_result['emotion']} (confidence: {emotion_result['confidence']:.3f})")
             
@@ -197,7 +215,8 @@ class EmotionService:
         """
         try:
             # Calculate feature statistics
-            feature_stats = {}
+            # Statistics already summarized by the feature engine
+            feature_stats = {key: features[key] for key in FEATURE_STAT_KEYS if key in features}
             
             # MFCC statistics
             if 'mfcc' in features:
@@ -432,13 +451,13 @@ class EmotionService:
             'original_text': text
         }
     
-    def detect_emotion_combined(self, text: str, audio_data: bytes = None, audio_format: str = 'wav') -> Dict[str, Any]:
+    def detect_emotion_combined(self, text: str, audio_data: Union[bytes, DecodedAudio] = None, audio_format: str = 'wav') -> Dict[str, Any]:
         """
         Combine text and audio emotion detection for better accuracy
         
         Args:
             text: Input text
-            audio_data: Audio data (optional)
+            audio_data: Audio data as bytes or decoded audio (optional)
             audio_format: Audio format
         
         Returns:
@@ -5,25 +5,30 @@ Supports multiple speech-to-text engines
 
 import os
 import io
+import time
 import base64
-from typing import Dict, Any, Optional, List
-import speech_recognition as sr
-
-# Optional imports for transformer models
-try:
-    from transformers import pipeline
-    import torch
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
-    print("Warning: PyTorch/Transformers not available. Using fallback speech recognition.")
+import hashlib
+import numpy as np
+from typing import Dict, Any, Optional, List, Union
 
 from utils.logger import setup_logger
-from utils.error_handlers import AudioProcessingError, ModelError
+from utils.error_handlers import AudioProcessingError, ModelError, ModelNotReadyError, PayloadTooLargeError
 try:
     from utils.audio_utils import audio_processor
 except ImportError:
     from utils.audio_utils_deploy import audio_processor
+from utils.decoded_audio import DecodedAudio, decode_audio
+from utils.dtype_policy import array_traffic
+from utils.audio_stream import prefetch
+from utils.micro_batcher import MicroBatcher
+from utils.long_form import WindowPlanner, stitch_transcripts
+from utils.chunk_pool import chunk_pool
+from utils.result_cache import transcription_cache
+from utils.audio_layout import to_mono
+from utils.vad import detect_speech_segments, concatenate_segments
+from utils.inference_runtime import inference_runtime
+from utils.model_loader import model_loader, synthetic_speech
+from services.asr_backends import ASRBackend, available_backends, create_backend
 from config import Config
 
 logger = setup_logger(__name__)
@@ -32,111 +37,367 @@ class TranscriptionService:
     """Service for handling speech-to-text transcription"""
     
     def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.whisper_pipeline = None
-        self._initialize_models()
+        self.backend: Optional[ASRBackend] = None
+        self.batcher = None
+        # Loaded in the background by model_loader so startup does not wait on Whisper
+        model_loader.register('transcription', self._initialize_models, self._warmup,
+                              share=lambda: self.backend.share_memory())
     
     def _initialize_models(self):
-        """Initialize speech recognition models"""
-        import importlib
-        logger.info(f"TRANSFORMERS_AVAILABLE: {TRANSFORMERS_AVAILABLE}")
-        if TRANSFORMERS_AVAILABLE:
-            try:
-                torch_version = importlib.import_module('torch').__version__
-                transformers_version = importlib.import_module('transformers').__version__
-                logger.info(f"torch version: {torch_version}")
-                logger.info(f"transformers version: {transformers_version}")
-            except Exception as e:
-                logger.warning(f"Could not get torch/transformers version: {e}")
-        if not TRANSFORMERS_AVAILABLE:
-            logger.info("PyTorch/Transformers not available. Using speech_recognition library only.")
-            return
+        """Load the configured speech-to-text backend, or the fastest one available on this node"""
+        inference_runtime.configure()
+        logger.info(f"Installed ASR backends: {available_backends()}")
         try:
-            # Initialize Whisper pipeline for better accuracy
-            if torch.cuda.is_available():
-                device = "cuda"
-                logger.info("Using CUDA for transcription")
-            else:
-                device = "cpu"
-                logger.info("Using CPU for transcription")
-            
-            model_name = getattr(Config, 'TRANSCRIPTION_MODEL_NAME', 'openai/whisper-tiny')
-            logger.info(f"Initializing Whisper pipeline with model: {model_name}")
-            self.whisper_pipeline = pipeline(
-                "automatic-speech-recognition",
-                model=model_name,
-                device=device
+            backend = create_backend(
+                Config.TRANSCRIPTION_BACKEND,
+                model_name=getattr(Config, 'TRANSCRIPTION_MODEL_NAME', 'openai/whisper-tiny'),
+                precision=Config.TRANSCRIPTION_QUANTIZATION
             )
             logger.info("Transcription models initialized successfully")
-            logger.info(f"Whisper pipeline created: {self.whisper_pipeline is not None}")
+            
+            # Concurrent requests share forward passes instead of queueing behind batch-of-one calls
+            if Config.WHISPER_BATCHING_ENABLED and backend.capabilities['batching']:
+                self.batcher = MicroBatcher(
+                    backend.transcribe_batch,
+                    max_batch_size=Config.WHISPER_MAX_BATCH_SIZE,
+                    max_wait_ms=Config.WHISPER_BATCH_WAIT_MS,
+                    name='whisper-batcher'
+                )
+                logger.info(f"Whisper micro-batching enabled: up to {Config.WHISPER_MAX_BATCH_SIZE} clips, "
+                            f"{Config.WHISPER_BATCH_WAIT_MS}ms window")
+            self.backend = backend
         except Exception as e:
-            import traceback
-            tb = traceback.format_exc()
-            logger.error(f"Failed to initialize Whisper pipeline: {str(e)}\n{tb}")
-            logger.warning("Continuing with fallback speech recognition only")
-            self.whisper_pipeline = None
+            logger.error(f"Failed to initialize transcription backend: {str(e)}")
+            raise
+    
+    def _warmup(self):
+        """Run preprocessing and one forward pass on synthetic speech to initialize kernels and caches"""
+        if self.backend.capabilities['network']:
+            # A warmup call to a hosted API would only cost quota
+            return
+        audio = DecodedAudio('warmup', synthetic_speech(), 16000)
+        self.backend.transcribe_batch([{'array': audio.preprocessed, 'sampling_rate': audio.sample_rate}])
+    
+    def get_backend_info(self) -> Dict[str, Any]:
+        """
+        Describe the active speech-to-text backend
+        
+        Returns:
+            Backend name, model, device, precision and capabilities, plus the
+            backends installed on this node
+        """
+        info = self.backend.get_info() if self.backend is not None else {'name': None}
+        info['available'] = available_backends()
+        return info
     
-    def transcribe_audio(self, audio_data: bytes, audio_format: str = 'wav') -> Dict[str, Any]:
+    def transcribe_audio(self, audio: Union[bytes, DecodedAudio], audio_format: str = 'wav',
+                         sample_rate: Optional[int] = None, channels: Optional[int] = None) -> Dict[str, Any]:
         """
         Transcribe audio to text using available models
         
         Args:
-            audio_data: Audio data as bytes
-            audio_format: Format of the audio data
+            audio: Audio data as bytes, or audio already decoded for this request
+            audio_format: Format of the audio data (bytes input only)
+            sample_rate: Sample rate of raw PCM input (pcm_s16le/pcm_f32le only)
+            channels: Channel count of raw PCM input (pcm_s16le/pcm_f32le only)
         
         Returns:
             Dictionary with transcription results
         """
+        self._await_model()
+        
         try:
-            # Preprocess audio
-            audio_array, sample_rate = audio_processor.load_audio(audio_data, format=audio_format)
-            audio_array = audio_processor.preprocess_audio(audio_array, sample_rate)
+            # Raw uploads are decoded window by window so long recordings are never held whole
+            streaming = not isinstance(audio, DecodedAudio) and self._can_stream()
+            
+            # Decode once per request; preprocessing is cached on the decoded audio
+            if not streaming and not isinstance(audio, DecodedAudio):
+                audio = decode_audio(audio, audio_format, sample_rate=sample_rate, channels=channels)
+            
+            # Resent clips (client retries) are answered without another model pass
+            cache_key = self._cache_key(audio, audio_format, sample_rate, channels) \
+                if Config.TRANSCRIPTION_CACHE_ENABLED else None
+            if cache_key is not None:
+                cached = transcription_cache.get(cache_key)
+                if cached is not None:
+                    logger.info("Transcription cache hit, skipping transcription model")
+                    return cached
             
-            # Try Whisper first (better accuracy)
-            if TRANSFORMERS_AVAILABLE and self.whisper_pipeline:
-                logger.info("Using Whisper for transcription")
-                result = self._transcribe_with_whisper(audio_array, sample_rate)
+            if streaming:
+                result = self.transcribe_stream(audio, audio_format, sample_rate=sample_rate, channels=channels)
             else:
-                logger.info("Using speech_recognition fallback")
-                # Fallback to speech_recognition
-                result = self._transcribe_with_speech_recognition(audio_data, audio_format)
+                result = self._transcribe_decoded(audio)
             
+            if cache_key is not None:
+                transcription_cache.put(cache_key, result)
             return result
             
+        except PayloadTooLargeError:
+            raise
         except Exception as e:
             logger.error(f"Transcription failed: {str(e)}")
             raise AudioProcessingError(f"Transcription failed: {str(e)}")
     
-    def _transcribe_with_whisper(self, audio_array, sample_rate: int) -> Dict[str, Any]:
-        """Transcribe using Whisper model"""
+    def _transcribe_decoded(self, audio: DecodedAudio) -> Dict[str, Any]:
+        """Transcribe audio decoded for this request"""
+        # Clips longer than Whisper's context are transcribed as a batch of overlapping windows
+        if self._backend_ready() and Config.LONG_FORM_ENABLED and audio.duration > Config.LONG_FORM_WINDOW_SECONDS:
+            return self.transcribe_long_form(audio)
+        
+        # Only speech regions go to the model; silent clips never reach it
+        if Config.VAD_ENABLED:
+            if not audio.speech_segments:
+                logger.info("No speech detected, skipping transcription model")
+                return {
+                    'text': '',
+                    'confidence': 0.0,
+                    'language': 'en',
+                    'model': 'vad'
+                }
+            audio_array = audio.speech_preprocessed
+        else:
+            audio_array = audio.preprocessed
+        
+        if not self._backend_ready():
+            raise ModelError("No speech-to-text backend is loaded")
+        logger.info(f"Using {self.backend.name} backend for transcription")
+        return self._transcribe(audio_array, audio.sample_rate)
+    
+    def _cache_key(self, audio: Union[bytes, DecodedAudio], audio_format: str,
+                   sample_rate: Optional[int], channels: Optional[int]) -> str:
+        """
+        Hash the audio together with everything else that affects its transcription
+        
+        Decoded audio is keyed by its PCM samples. Streamed uploads are keyed
+        by their encoded bytes and decode parameters instead: their PCM only
+        ever exists one window at a time, and decoding is deterministic.
+        """
+        if isinstance(audio, DecodedAudio):
+            samples = np.ascontiguousarray(audio.samples)
+            digest = hashlib.blake2b(samples.data, digest_size=16)
+            digest.update(f"|pcm|{samples.dtype}|{samples.shape}|{audio.sample_rate}".encode())
+        else:
+            digest = hashlib.blake2b(audio, digest_size=16)
+            digest.update(f"|{audio_format}|{sample_rate}|{channels}".encode())
+        
+        backend = self.backend.get_info() if self.backend is not None else {}
+        digest.update(repr((
+            backend.get('name'), backend.get('model'), backend.get('precision'),
+            Config.VAD_ENABLED, Config.VAD_ABSOLUTE_FLOOR_DB, Config.NOISE_REDUCTION_ENABLED,
+            Config.LONG_FORM_ENABLED, Config.LONG_FORM_WINDOW_SECONDS,
+            Config.LONG_FORM_OVERLAP_SECONDS, Config.LONG_FORM_SILENCE_SEARCH_SECONDS
+        )).encode())
+        return digest.hexdigest()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get transcription result cache statistics
+        
+        Returns:
+            Hit ratio, evictions and size, or just the disabled flag
+        """
+        if not Config.TRANSCRIPTION_CACHE_ENABLED:
+            return {'enabled': False}
+        return {'enabled': True, **transcription_cache.get_stats()}
+    
+    def _await_model(self):
+        """Hold requests that arrive while the model loads, up to MODEL_READY_TIMEOUT"""
+        if not model_loader.wait('transcription', Config.MODEL_READY_TIMEOUT):
+            raise ModelNotReadyError("Transcription model is still loading")
+    
+    def _backend_ready(self) -> bool:
+        """Tell whether a speech-to-text backend is loaded"""
+        return self.backend is not None
+    
+    def _can_stream(self) -> bool:
+        """Tell whether uploads can go through the streaming decode path"""
+        return Config.STREAMING_DECODE_ENABLED and self._backend_ready() and hasattr(audio_processor, 'stream_audio')
+    
+    def _window_planner(self, sample_rate: int) -> WindowPlanner:
+        """Planner for the configured long-form windows (back-to-back model-length windows when long-form mode is off)"""
+        if not Config.LONG_FORM_ENABLED:
+            return WindowPlanner(sample_rate, Config.LONG_FORM_WINDOW_SECONDS, overlap_seconds=0.0, search_seconds=0.0)
+        return WindowPlanner(sample_rate, Config.LONG_FORM_WINDOW_SECONDS,
+                             Config.LONG_FORM_OVERLAP_SECONDS, Config.LONG_FORM_SILENCE_SEARCH_SECONDS)
+    
+    def _prepare_window(self, window, sample_rate: int):
+        """Preprocess one window for the model, or return None if VAD finds no speech in it"""
+        if Config.VAD_ENABLED:
+            segments = detect_speech_segments(window, sample_rate, absolute_floor_db=Config.VAD_ABSOLUTE_FLOOR_DB)
+            if not segments:
+                return None
+            window = concatenate_segments(window, segments)
+        return audio_processor.preprocess_audio(window, sample_rate)
+    
+    def _combine_windows(self, windows: List[Dict[str, Any]], total_windows: int) -> Dict[str, Any]:
+        """Stitch per-window results into one transcription result with segment timestamps"""
+        if not windows:
+            logger.info("No speech detected, transcription model was not run")
+        text, segments = stitch_transcripts(windows)
+        confidences = [window['confidence'] for window in windows if window['text']]
+        
+        return {
+            'text': text,
+            'confidence': sum(confidences) / len(confidences) if confidences else 0.0,
+            'language': 'en',
+            'model': self.backend.model_label if windows else 'vad',
+            'windows': total_windows,
+            'segments': segments
+        }
+    
+    def transcribe_long_form(self, audio: DecodedAudio) -> Dict[str, Any]:
+        """
+        Transcribe a decoded clip longer than one Whisper window
+        
+        The clip is cut into LONG_FORM_WINDOW_SECONDS windows that overlap by
+        LONG_FORM_OVERLAP_SECONDS, with each cut moved to the quietest point
+        in the preceding LONG_FORM_SILENCE_SEARCH_SECONDS. Windows with speech
+        are submitted together so they run as a batch, and the overlaps are
+        stitched into one transcript with per-window segment timestamps.
+        
+        Args:
+            audio: Audio decoded for this request
+        
+        Returns:
+            Dictionary with transcription results, window count and segments
+        """
+        sample_rate = audio.sample_rate
+        mono = to_mono(audio.samples)
+        planner = self._window_planner(sample_rate)
+        planned = planner.push(mono) + planner.finish()
+        
+        spans = []
+        inputs = []
+        for start, window in planned:
+            prepared = self._prepare_window(window, sample_rate)
+            if prepared is not None:
+                spans.append((start / sample_rate, (start + len(window)) / sample_rate))
+                inputs.append(prepared)
+        
+        logger.info(f"Long-form transcription: {len(planned)} windows, {len(inputs)} with speech")
+        results = self._transcribe_batch(inputs, sample_rate) if inputs else []
+        windows = [
+            {'start': start, 'end': end, 'text': result['text'], 'confidence': result['confidence']}
+            for (start, end), result in zip(spans, results)
+        ]
+        return self._combine_windows(windows, len(planned))
+    
+    def transcribe_stream(self, audio_data: bytes, audio_format: str = 'wav',
+                          sample_rate: Optional[int] = None, channels: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Transcribe a recording while it is still being decoded
+        
+        The payload is decoded in STREAM_WINDOW_SECONDS blocks on a background
+        thread, STREAM_PREFETCH_WINDOWS ahead of the model. Blocks are cut into
+        the same overlapping, silence-aware windows as transcribe_long_form,
+        and each window is transcribed as soon as it is complete, while later
+        ones are still decoding. Windows are released once transcribed, so
+        peak memory follows the window size, not the file.
+        
+        Args:
+            audio_data: Encoded audio bytes
+            audio_format: Format of the audio data
+            sample_rate: Sample rate of raw PCM input (pcm_s16le/pcm_f32le only)
+            channels: Channel count of raw PCM input (pcm_s16le/pcm_f32le only)
+        
+        Returns:
+            Dictionary with transcription results, window count and segments
+        """
+        target_rate = audio_processor.target_sample_rate
+        blocks = audio_processor.stream_audio(
+            audio_data, format=audio_format, sample_rate=sample_rate, channels=channels,
+            block_duration=Config.STREAM_WINDOW_SECONDS
+        )
+        planner = self._window_planner(target_rate)
+        
+        windows = []
+        total_windows = 0
+        
+        def transcribe(planned):
+            nonlocal total_windows
+            for start, window in planned:
+                total_windows += 1
+                prepared = self._prepare_window(window, target_rate)
+                if prepared is None:
+                    logger.info(f"No speech in window at {start / target_rate:.1f}s, skipping transcription model")
+                    continue
+                result = self._transcribe(prepared, target_rate)
+                windows.append({
+                    'start': start / target_rate,
+                    'end': (start + len(window)) / target_rate,
+                    'text': result['text'],
+                    'confidence': result['confidence']
+                })
+        
+        # Without long-form mode only the first window is transcribed, as Whisper would see
+        # only its first 30 s of a whole clip; decoding stops there instead of buffering the rest
+        single_window = not Config.LONG_FORM_ENABLED
+        stream = prefetch(blocks, depth=Config.STREAM_PREFETCH_WINDOWS)
+        try:
+            for block in stream:
+                planned = planner.push(block)
+                if single_window and planned:
+                    transcribe(planned[:1])
+                    logger.warning(f"Long-form mode is off; audio after {Config.LONG_FORM_WINDOW_SECONDS:.0f}s "
+                                   f"was not transcribed")
+                    break
+                transcribe(planned)
+            else:
+                transcribe(planner.finish())
+        finally:
+            stream.close()
+        
+        return self._combine_windows(windows, total_windows)
+    
+    def _transcribe(self, audio_array, sample_rate: int) -> Dict[str, Any]:
+        """Transcribe one clip with the active backend"""
+        return self._transcribe_batch([audio_array], sample_rate)[0]
+    
+    def _transcribe_batch(self, audio_arrays: List, sample_rate: int) -> List[Dict[str, Any]]:
+        """Transcribe several clips, batched with each other and with concurrent requests where the backend batches"""
         try:
-            # Ensure audio is in the right format for Whisper
-            if audio_array.dtype != 'float32':
-                audio_array = audio_array.astype('float32')
+            # Models take float32; conforming arrays pass through without a copy
+            audio_arrays = [array_traffic.checkpoint('model_input', audio_array, source=audio_array)
+                            for audio_array in audio_arrays]
+            audio_inputs = [{"array": audio_array, "sampling_rate": sample_rate} for audio_array in audio_arrays]
             
-            # Transcribe with Whisper - use the correct API format
-            # For newer transformers versions, we need to pass audio as a dict
-            audio_input = {
-                "array": audio_array,
-                "sampling_rate": sample_rate
-            }
-            
-            result = self.whisper_pipeline(audio_input)
-            text = result.get('text', '').strip()
-            
-            # Calculate confidence (Whisper doesn't provide this directly)
-            confidence = self._calculate_whisper_confidence(text, audio_array)
+            if self.batcher is not None:
+                outputs = self.batcher.submit_many(audio_inputs)
+            else:
+                step = Config.WHISPER_MAX_BATCH_SIZE
+                outputs = []
+                for offset in range(0, len(audio_inputs), step):
+                    outputs.extend(self.backend.transcribe_batch(audio_inputs[offset:offset + step]))
             
-            return {
-                'text': text,
-                'confidence': confidence,
-                'language': 'en',
-                'model': 'whisper'
-            }
+            results = []
+            for audio_array, output in zip(audio_arrays, outputs):
+                text = output['text']
+                # Whisper runtimes don't report confidence, so fall back to the heuristic
+                confidence = output.get('confidence')
+                results.append({
+                    'text': text,
+                    'confidence': confidence if confidence is not None
+                    else self._calculate_whisper_confidence(text, audio_array),
+                    'language': 'en',
+                    'model': self.backend.model_label,
+                    'backend': self.backend.name
+                })
+            return results
             
         except Exception as e:
-            logger.error(f"Whisper transcription failed: {str(e)}")
-            raise AudioProcessingError(f"Whisper transcription failed: {str(e)}")
+            logger.error(f"{self.backend.name} transcription failed: {str(e)}")
+            raise AudioProcessingError(f"{self.backend.name} transcription failed: {str(e)}")
+    
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """
+        Get Whisper micro-batching statistics
+        
+        Returns:
+            Batch size and queue delay statistics, or just the disabled flag
+        """
+        if self.batcher is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.batcher.get_stats()}
     
     def _calculate_whisper_confidence(self, text: str, audio_array) -> float:
         """Calculate confidence score for Whisper results"""
@@ -157,58 +418,16 @@ class TranscriptionService:
         confidence = min(0.95, 0.3 + (word_count * 0.1) + (char_count / audio_length * 100))
         return confidence
     
-    def _transcribe_with_speech_recognition(self, audio_data: bytes, audio_format: str = 'wav') -> Dict[str, Any]:
-        """Transcribe using speech_recognition library"""
-        try:
-            # Default sample rate if not specified
-            sample_rate = 16000
-            
-            # Convert audio data to AudioData object
-            audio = sr.AudioData(
-                audio_data,
-                sample_rate=sample_rate,
-                sample_width=2  # 16-bit audio
-            )
-            
-            # Try multiple recognition services
-            text = None
-            confidence = 0.0
-            
-            # Try Google Speech Recognition
-            try:
-                result = self.recognizer.recognize_google(audio, show_all=True)
-                if result and 'alternative' in result:
-                    text = result['alternative'][0]['transcript']
-                    confidence = result['alternative'][0].get('confidence', 0.0)
-                    logger.info("Used Google Speech Recognition")
-            except Exception as e:
-                logger.warning(f"Google Speech Recognition failed: {str(e)}")
-            
-            # Fallback to Sphinx if Google fails
-            if not text:
-                try:
-                    text = self.recognizer.recognize_sphinx(audio)
-                    confidence = 0.5  # Sphinx doesn't provide confidence scores
-                    logger.info("Used Sphinx recognition")
-                except Exception as e:
-                    logger.error(f"Sphinx recognition failed: {str(e)}")
-                    raise AudioProcessingError("All speech recognition methods failed")
-            
-            return {
-                'text': text.strip(),
-                'confidence': confidence,
-                'language': 'en',
-                'model': 'speech_recognition'
-            }
-            
-        except Exception as e:
-            logger.error(f"Speech recognition failed: {str(e)}")
-            raise AudioProcessingError(f"Speech recognition failed: {str(e)}")
-    
     def transcribe_chunks(self, audio_chunks: List[bytes], audio_format: str = 'wav') -> List[Dict[str, Any]]:
         """
         Transcribe multiple audio chunks
         
+        Decoding, VAD and preprocessing fan out across the chunk process pool,
+        then every chunk with speech goes to the backend in one batched
+        submission. Results come back in chunk_index order; a chunk that fails
+        keeps its error without affecting the others. Each result carries
+        per-stage 'timings' (seconds) for get_transcription_stats.
+        
         Args:
             audio_chunks: List of audio data chunks
             audio_format: Format of the audio data
@@ -216,24 +435,51 @@ class TranscriptionService:
         Returns:
             List of transcription results
         """
-        results = []
-        
-        for i, chunk in enumerate(audio_chunks):
-            try:
-                result = self.transcribe_audio(chunk, audio_format)
-                result['chunk_index'] = i
-                results.append(result)
-                logger.info(f"Transcribed chunk {i+1}/{len(audio_chunks)}")
-            except Exception as e:
-                logger.error(f"Failed to transcribe chunk {i}: {str(e)}")
-                # Continue with other chunks
-                results.append({
-                    'text': '',
-                    'confidence': 0.0,
-                    'error': str(e),
-                    'chunk_index': i
-                })
+        self._await_model()
+        started = time.perf_counter()
+        prepared = chunk_pool.prepare(audio_chunks, audio_format)
         
+        results: List[Optional[Dict[str, Any]]] = [None] * len(audio_chunks)
+        to_transcribe = []
+        for i, chunk in enumerate(prepared):
+            if chunk['error'] is not None:
+                logger.error(f"Failed to transcribe chunk {i}: {chunk['error']}")
+                results[i] = {'text': '', 'confidence': 0.0, 'error': chunk['error']}
+            elif chunk['audio'] is None:
+                results[i] = {'text': '', 'confidence': 0.0, 'language': 'en', 'model': 'vad'}
+            else:
+                to_transcribe.append(i)
+        
+        inference_started = time.perf_counter()
+        if to_transcribe and not self._backend_ready():
+            for i in to_transcribe:
+                results[i] = {'text': '', 'confidence': 0.0, 'error': 'No speech-to-text backend is loaded'}
+        elif to_transcribe:
+            # Chunks at different rates cannot share a batch; decoders normally all produce the target rate
+            by_rate: Dict[int, List[int]] = {}
+            for i in to_transcribe:
+                by_rate.setdefault(prepared[i]['sample_rate'], []).append(i)
+            for sample_rate, indices in by_rate.items():
+                try:
+                    batch = self._transcribe_batch([prepared[i]['audio'] for i in indices], sample_rate)
+                    for i, result in zip(indices, batch):
+                        results[i] = result
+                except Exception as e:
+                    logger.error(f"Failed to transcribe chunks {indices}: {str(e)}")
+                    for i in indices:
+                        results[i] = {'text': '', 'confidence': 0.0, 'error': str(e)}
+        inference_time = time.perf_counter() - inference_started
+        wall_clock = time.perf_counter() - started
+        
+        transcribed = set(to_transcribe)
+        for i, result in enumerate(results):
+            # Batched inference time is shared evenly by the chunks in the batch
+            inference_share = inference_time / len(to_transcribe) if i in transcribed else 0.0
+            result['chunk_index'] = i
+            result['timings'] = {**prepared[i]['timings'], 'inference': inference_share, 'wall_clock': wall_clock}
+        
+        logger.info(f"Transcribed {len(audio_chunks)} chunks ({len(to_transcribe)} with speech) "
+                    f"in {wall_clock * 1000:.0f}ms")
         return results
     
     def get_transcription_stats(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -244,7 +490,9 @@ class TranscriptionService:
             results: List of transcription results
         
         Returns:
-            Dictionary with statistics
+            Dictionary with statistics; results from transcribe_chunks also get
+            per-stage totals, their sum over all chunks, the wall-clock time
+            and the average number of chunks in flight
         """
         if not results:
             return {}
@@ -253,11 +501,30 @@ class TranscriptionService:
         avg_confidence = sum([r.get('confidence', 0.0) for r in results]) / len(results)
         successful_chunks = len([r for r in results if r.get('text', '').strip()])
         
-        return {
+        stats = {
             'total_characters': len(total_text),
             'total_words': len(total_text.split()),
             'average_confidence': avg_confidence,
             'successful_chunks': successful_chunks,
             'total_chunks': len(results),
-            'success_rate': successful_chunks / len(results) if results else 0.0
-        } 
\ No newline at end of file
+            'success_rate': successful_chunks / len(results) if results else 0.0,
+            'failed_chunks': len([r for r in results if 'error' in r])
+        }
+        
+        timings = [r['timings'] for r in results if 'timings' in r]
+        if timings:
+            stage_ms = {
+                stage: sum(t[stage] for t in timings) * 1000
+                for stage in ('decode', 'preprocess', 'inference')
+            }
+            chunk_ms_total = sum(stage_ms.values())
+            wall_clock_ms = max(t['wall_clock'] for t in timings) * 1000
+            stats.update({
+                'stage_ms': stage_ms,
+                'chunk_ms_total': chunk_ms_total,
+                'wall_clock_ms': wall_clock_ms,
+                # Chunks in flight on average; benchmarks/bench_chunks.py measures the real speedup
+                'concurrency': chunk_ms_total / wall_clock_ms if wall_clock_ms else 0.0
+            })
+        
+        return stats
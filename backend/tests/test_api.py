@@ -62,6 +62,21 @@ class TestHealthCheck:
         assert data['status'] == 'healthy'
         assert data['service'] == 'ToneBridge Backend'
 
+class TestReadiness:
+    """Test the readiness endpoint"""
+    
+    def test_ready_reports_model_states(self, client):
+        """Test /ready reports each model once loading has finished"""
+        from utils.model_loader import model_loader
+        model_loader.wait('transcription', timeout=30)
+        model_loader.wait('emotion', timeout=30)
+        
+        response = client.get('/ready')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['ready'] is True
+        assert set(data['models']) >= {'transcription', 'emotion'}
+
 class TestTranscribeAPI:
     """Test transcription endpoint"""
     
@@ -107,6 +122,48 @@ class TestTranscribeAPI:
         assert data['data']['transcript'] == 'Hello, how are you?'
         assert data['data']['confidence'] == 0.95
 
+    @patch('routes.api.transcription_service.transcribe_audio')
+    def test_transcribe_raw_pcm(self, mock_transcribe, client):
+        """Test raw PCM parameters are passed through to the transcription service"""
+        mock_transcribe.return_value = {
+            'text': 'Raw PCM',
+            'confidence': 0.9,
+            'model': 'whisper',
+            'language': 'en'
+        }
+        
+        audio_b64 = base64.b64encode(b'\x00\x00' * 1600).decode('utf-8')
+        response = client.post('/api/transcribe',
+                             json={'audio': audio_b64, 'format': 'pcm_s16le',
+                                   'sample_rate': 16000, 'channels': 1})
+        assert response.status_code == 200
+        
+        args, kwargs = mock_transcribe.call_args
+        assert args[1] == 'pcm_s16le'
+        assert kwargs == {'sample_rate': 16000, 'channels': 1}
+
+    @patch('routes.api.transcription_service.transcribe_audio')
+    def test_transcribe_binary_body(self, mock_transcribe, client, mock_audio_data):
+        """Test raw audio bytes with parameters in headers and the query string"""
+        mock_transcribe.return_value = {
+            'text': 'Binary body',
+            'confidence': 0.9,
+            'model': 'whisper',
+            'language': 'en'
+        }
+        
+        response = client.post('/api/transcribe?include_emotion=false',
+                             data=mock_audio_data,
+                             content_type='application/octet-stream',
+                             headers={'X-Audio-Format': 'audio/wav'})
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data['data']['transcript'] == 'Binary body'
+        assert 'emotion' not in data['data']
+        args, _ = mock_transcribe.call_args
+        assert args == (mock_audio_data, 'wav')
+
 class TestEmotionAPI:
     """Test emotion detection endpoint"""
     
@@ -162,9 +219,44 @@ class TestEmotionAPI:
         assert data['data']['emotion'] == 'excited'
         assert data['data']['emoji'] == '🤩'
 
+    @patch('routes.api.emotion_service.detect_emotion_from_audio')
+    def test_emotion_multipart_audio(self, mock_emotion, client, mock_audio_data):
+        """Test audio sent as a multipart file part"""
+        mock_emotion.return_value = {
+            'emotion': 'neutral',
+            'confidence': 0.5,
+            'emoji': '😐',
+            'model': 'audio_features'
+        }
+        
+        response = client.post('/api/emotion',
+                             data={'audio': (BytesIO(mock_audio_data), 'clip.wav'), 'method': 'audio'},
+                             content_type='multipart/form-data')
+        assert response.status_code == 200
+        
+        args, _ = mock_emotion.call_args
+        assert args == (mock_audio_data, 'wav')
+
 class TestUploadAPI:
     """Test file upload endpoint"""
     
+    def test_chunked_upload_over_limit_rejected_while_parsing(self, app):
+        """Test a multipart body without Content-Length is cut off at the upload limit"""
+        from routes.api import parse_multipart
+        from utils.error_handlers import PayloadTooLargeError
+        body = (b'--X\r\nContent-Disposition: form-data; name="file"; filename="a.wav"\r\n\r\n'
+                + b'\0' * (app.config['MAX_CONTENT_LENGTH'] + 1) + b'\r\n--X--\r\n')
+        environ = {
+            'CONTENT_TYPE': 'multipart/form-data; boundary=X',
+            'HTTP_TRANSFER_ENCODING': 'chunked',
+            'wsgi.input': BytesIO(body),
+            'wsgi.input_terminated': True
+        }
+        
+        with app.test_request_context('/api/upload', method='POST', environ_overrides=environ):
+            with pytest.raises(PayloadTooLargeError):
+                parse_multipart()
+    
     def test_upload_no_file(self, client):
         """Test upload with no file"""
         response = client.post('/api/upload')
@@ -219,6 +311,25 @@ class TestModelsAPI:
         assert 'supported_emotions' in data['data']
         assert 'emotion_emojis' in data['data']
 
+class TestMetricsAPI:
+    """Test runtime metrics endpoint"""
+    
+    def test_metrics_report_request_memory(self, client):
+        """Test per-endpoint peak RSS is recorded for API requests"""
+        client.get('/api/models')
+        response = client.get('/api/metrics')
+        assert response.status_code == 200
+        
+        memory = json.loads(response.data)['data']['memory']
+        assert memory['endpoints']['api.get_models']['requests'] >= 1
+        assert memory['endpoints']['api.get_models']['max_peak_rss_mb'] > 0
+    
+    def test_metrics_report_transcription_batching(self, client):
+        """Test Whisper micro-batching state is exposed"""
+        response = client.get('/api/metrics')
+        batching = json.loads(response.data)['data']['transcription_batching']
+        assert 'enabled' in batching
+
 class TestErrorHandling:
     """Test error handling"""
     
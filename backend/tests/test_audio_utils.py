@@ -0,0 +1,954 @@
+"""
+Audio processing tests for ToneBridge Backend
+"""
+
+import os
+import pytest
+import subprocess
+import numpy as np
+from unittest.mock import patch, MagicMock
+
+from utils.audio_utils import AudioProcessor
+from utils.decoder_pool import DecoderPool
+from utils.format_sniffer import sniff_format
+from utils.decoded_audio import DecodedAudio, decode_audio
+from utils.vad import detect_speech_segments
+from utils.feature_engine import FeatureEngine
+from utils.dtype_policy import ArrayTrafficMonitor
+from utils.denoise import SpectralGateDenoiser
+from utils.resampler import Resampler
+from utils.audio_stream import prefetch
+from utils.micro_batcher import MicroBatcher
+from utils.long_form import plan_windows, stitch_transcripts
+from utils.chunk_pool import ChunkPool
+from utils.inference_runtime import InferenceRuntime, plan_threads, worker_cores, usable_cpus
+from utils.model_loader import ModelLoader, synthetic_speech
+from utils.result_cache import ResultCache
+from config import Config
+from utils.model_artifacts import ARTIFACT_MANIFEST, artifact_path, pipeline_source
+from services.asr_backends import TransformersBackend
+from utils.error_handlers import AudioProcessingError, ModelError, PayloadTooLargeError
+from utils.audio_intake import read_audio_stream, probe_duration
+
+class TestFfmpegPipeDecode:
+    """Test in-memory ffmpeg decoding"""
+
+    @patch('utils.audio_utils.tempfile.NamedTemporaryFile')
+    @patch('utils.decoder_pool.subprocess.Popen')
+    def test_pipe_decode_reads_pcm_from_stdout(self, mock_popen, mock_tempfile):
+        """Test webm bytes go through stdin and come back as float32 PCM"""
+        pcm = np.linspace(-0.5, 0.5, 1600, dtype=np.float32)
+        process = mock_popen.return_value
+        process.communicate.return_value = (pcm.tobytes(), b'')
+        process.returncode = 0
+
+        processor = AudioProcessor(decode_mode='pipe')
+        audio_array, sample_rate = processor.load_audio(b'\x1a\x45\xdf\xa3webm', format='webm')
+
+        assert sample_rate == 16000
+        assert audio_array.dtype == np.float32
+        np.testing.assert_array_equal(audio_array, pcm)
+        assert process.communicate.call_args.kwargs['input'] == b'\x1a\x45\xdf\xa3webm'
+        mock_tempfile.assert_not_called()
+
+    @patch('utils.decoder_pool.subprocess.Popen', side_effect=FileNotFoundError)
+    def test_pipe_decode_without_ffmpeg(self, mock_popen):
+        """Test a missing ffmpeg binary surfaces as an AudioProcessingError"""
+        processor = AudioProcessor(decode_mode='pipe')
+        with pytest.raises(AudioProcessingError):
+            processor.load_audio(b'webm', format='webm')
+
+class TestDecoderPool:
+    """Test the bounded decoder pool"""
+
+    @patch('utils.decoder_pool.subprocess.Popen')
+    def test_timeout_kills_decoder(self, mock_popen):
+        """Test a decode that overruns its timeout is killed and counted"""
+        process = mock_popen.return_value
+        process.communicate.side_effect = [subprocess.TimeoutExpired('ffmpeg', 1), (b'', b'')]
+
+        pool = DecoderPool(size=1, queue_size=0, timeout=1)
+        with pytest.raises(AudioProcessingError):
+            pool.run_command(['ffmpeg'], b'data')
+
+        process.kill.assert_called_once()
+        stats = pool.get_stats()
+        assert stats['timeouts'] == 1
+        assert stats['active'] == 0
+
+    def test_rejects_when_saturated(self):
+        """Test decodes beyond size + queue_size are rejected immediately"""
+        pool = DecoderPool(size=1, queue_size=0, timeout=1)
+        pool._stats['active'] = 1
+
+        with pytest.raises(AudioProcessingError):
+            pool.run_command(['ffmpeg'], b'data')
+        assert pool.get_stats()['rejected'] == 1
+
+def make_wav(samples: np.ndarray, sample_rate: int = 16000, sampwidth: int = 2) -> bytes:
+    """Build a WAV file in memory from interleaved integer samples"""
+    import io
+    import wave
+    channels = samples.shape[1] if samples.ndim > 1 else 1
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(sampwidth)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+def whisper_backend(pipeline, precision: str = 'fp32') -> TransformersBackend:
+    """Transformers backend around a stand-in pipeline"""
+    backend = TransformersBackend('openai/whisper-tiny', precision)
+    backend.pipeline = pipeline
+    return backend
+
+class TestWavFastPath:
+    """Test the native WAV loader"""
+
+    @patch('utils.audio_utils.AudioSegment.from_file')
+    def test_pcm16_mono_bypasses_pydub(self, mock_from_file):
+        """Test 16-bit mono WAV at the target rate is read without pydub"""
+        samples = np.array([0, 16384, -16384, 32767, -32768], dtype=np.int16)
+        audio_array, sample_rate = AudioProcessor().load_audio(make_wav(samples), format='wav')
+
+        mock_from_file.assert_not_called()
+        assert sample_rate == 16000
+        assert audio_array.dtype == np.float32
+        np.testing.assert_allclose(audio_array, samples / 32768.0)
+
+    def test_stereo_is_downmixed(self):
+        """Test interleaved stereo frames are averaged to mono"""
+        samples = np.array([[1000, 3000], [-2000, 2000]], dtype=np.int16)
+        audio_array, _ = AudioProcessor().load_audio(make_wav(samples), format='wav')
+
+        np.testing.assert_allclose(audio_array, [2000 / 32768.0, 0.0])
+
+    def test_unsupported_encoding_falls_back(self):
+        """Test 24-bit WAV is left to the general-purpose decoder"""
+        wav = make_wav(np.zeros(6, dtype=np.uint8), sampwidth=3)
+        assert AudioProcessor()._load_wav_fast(wav) is None
+
+class TestFormatSniffer:
+    """Test magic-byte format detection"""
+
+    @pytest.mark.parametrize('head, expected', [
+        (b'RIFF\x24\x00\x00\x00WAVEfmt ', 'wav'),
+        (b'OggS\x00\x02\x00\x00', 'ogg'),
+        (b'\x1a\x45\xdf\xa3\x9f\x42\x86\x81', 'webm'),
+        (b'ID3\x04\x00\x00\x00\x00', 'mp3'),
+        (b'\xff\xfb\x90\x64\x00\x00', 'mp3'),
+        (b'\xff\xf1\x50\x80\x00\x1f', 'aac'),
+        (b'fLaC\x00\x00\x00\x22', 'flac'),
+        (b'\x00\x00\x00\x18ftypM4A ', 'mp4'),
+        (b'not audio at all', None)
+    ])
+    def test_sniff_format(self, head, expected):
+        """Test each container is identified from its leading bytes"""
+        assert sniff_format(head) == expected
+
+    @patch('utils.decoder_pool.subprocess.Popen')
+    def test_mislabeled_wav_skips_ffmpeg(self, mock_popen):
+        """Test a WAV labelled as webm goes straight to the native WAV decoder"""
+        samples = np.array([0, 8192, -8192], dtype=np.int16)
+        audio_array, _ = AudioProcessor().load_audio(make_wav(samples), format='webm')
+
+        mock_popen.assert_not_called()
+        np.testing.assert_allclose(audio_array, samples / 32768.0)
+
+class TestRawPcm:
+    """Test headerless PCM ingest"""
+
+    def test_f32le_at_target_layout_is_not_copied(self):
+        """Test 16 kHz mono float32 PCM is returned as a view over the request bytes"""
+        pcm = np.linspace(-1, 1, 320, dtype=np.float32)
+        audio_array, sample_rate = AudioProcessor().load_audio(pcm.tobytes(), format='pcm_f32le',
+                                                               sample_rate=16000, channels=1)
+
+        assert sample_rate == 16000
+        assert not audio_array.flags.owndata
+        np.testing.assert_array_equal(audio_array, pcm)
+
+    def test_s16le_stereo_is_scaled_and_downmixed(self):
+        """Test interleaved int16 PCM is scaled to float32 and downmixed"""
+        pcm = np.array([16384, 0, -16384, -16384], dtype=np.int16)
+        audio_array, _ = AudioProcessor().load_audio(pcm.tobytes(), format='pcm_s16le',
+                                                     sample_rate=16000, channels=2)
+
+        np.testing.assert_allclose(audio_array, [0.25, -0.5])
+
+    def test_partial_frame_is_rejected(self):
+        """Test a payload that is not a whole number of frames is rejected"""
+        with pytest.raises(AudioProcessingError):
+            AudioProcessor().load_audio(b'\x00\x00\x00', format='pcm_s16le')
+
+class TestAudioIntake:
+    """Test streaming upload limits"""
+
+    def test_overlong_wav_rejected_from_header(self):
+        """Test a WAV declaring too much audio is refused after the first chunk"""
+        import io
+        import struct
+        data_size = 16000 * 2 * 60 * 20  # 20 minutes of 16 kHz mono int16
+        header = (b'RIFF' + struct.pack('<I', 36 + data_size) + b'WAVE' +
+                  b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, 16000, 32000, 2, 16) +
+                  b'data' + struct.pack('<I', data_size))
+        stream = io.BytesIO(header + b'\x00' * (256 * 1024))
+
+        with pytest.raises(PayloadTooLargeError):
+            read_audio_stream(stream, 'wav')
+        assert stream.tell() < 256 * 1024
+
+    def test_oversized_stream_rejected(self):
+        """Test the byte limit is enforced while reading, without a Content-Length"""
+        import io
+        with pytest.raises(PayloadTooLargeError):
+            read_audio_stream(io.BytesIO(b'\x00' * 200000), max_bytes=100000)
+
+    def test_raw_pcm_duration(self):
+        """Test raw PCM duration comes from the payload size and declared layout"""
+        assert probe_duration(b'', 'pcm_s16le', total_size=64000, sample_rate=16000, channels=1) == 2.0
+
+class TestDecodedAudio:
+    """Test request-scoped decoded audio sharing"""
+
+    @patch('utils.decoded_audio.audio_processor.load_audio')
+    def test_same_bytes_decoded_once_per_request(self, mock_load):
+        """Test repeated decodes of the same payload within a request hit the cache"""
+        from flask import Flask
+        mock_load.return_value = (np.zeros(1600, dtype=np.float32), 16000)
+        wav = make_wav(np.zeros(1600, dtype=np.int16))
+
+        with Flask(__name__).app_context():
+            first = decode_audio(wav, 'wav')
+            second = decode_audio(wav, 'wav')
+        with Flask(__name__).app_context():
+            third = decode_audio(wav, 'wav')
+
+        assert first is second
+        assert third is not first
+        assert mock_load.call_count == 2
+
+    def test_preprocessing_is_lazy_and_cached(self):
+        """Test derived data is computed on first access only"""
+        processor = MagicMock()
+        processor.preprocess_audio.return_value = np.ones(10, dtype=np.float32)
+        decoded = DecodedAudio('key', np.zeros(10, dtype=np.float32), 16000, processor=processor)
+
+        processor.preprocess_audio.assert_not_called()
+        decoded.preprocessed
+        decoded.preprocessed
+        processor.preprocess_audio.assert_called_once()
+
+    @pytest.mark.parametrize('audio_format', ['pcm_f32le', 'wav'])
+    def test_deploy_processor_stereo_layout(self, audio_format):
+        """Test stereo from the deployment processor keeps its duration and speech"""
+        from utils.audio_utils_deploy import AudioProcessor as DeployAudioProcessor
+        speech = synthetic_speech(1.0, 48000)
+        frames = np.stack([speech, speech * 0.5], axis=1)
+        if audio_format == 'wav':
+            payload = make_wav((frames * 32767).astype(np.int16), sample_rate=48000)
+        else:
+            payload = frames.astype('<f4').tobytes()
+
+        with patch('utils.decoded_audio.audio_processor', DeployAudioProcessor()):
+            decoded = decode_audio(payload, audio_format, sample_rate=48000, channels=2)
+
+        assert decoded.samples.ndim == 1
+        assert decoded.duration == pytest.approx(1.0)
+        assert decoded.speech_segments
+
+class TestVoiceActivityDetection:
+    """Test the energy/ZCR voice activity detector"""
+
+    def test_silent_clip_has_no_segments(self):
+        """Test digital silence and faint noise produce no speech"""
+        rng = np.random.default_rng(0)
+        assert detect_speech_segments(np.zeros(16000, dtype=np.float32), 16000) == []
+        noise = (rng.standard_normal(16000) * 1e-4).astype(np.float32)
+        assert detect_speech_segments(noise, 16000) == []
+
+    def test_finds_burst_between_silences(self):
+        """Test a tone burst in the middle of a clip is found with padding"""
+        sample_rate = 16000
+        audio = np.zeros(sample_rate * 3, dtype=np.float32)
+        t = np.arange(sample_rate) / sample_rate
+        audio[sample_rate:2 * sample_rate] = 0.5 * np.sin(2 * np.pi * 220 * t)
+
+        segments = detect_speech_segments(audio, sample_rate)
+
+        assert len(segments) == 1
+        start, end = segments[0]
+        assert sample_rate - 4000 <= start <= sample_rate
+        assert 2 * sample_rate <= end <= 2 * sample_rate + 4000
+
+    @patch('services.transcription_service.Config.STREAMING_DECODE_ENABLED', False)
+    @patch('services.transcription_service.decode_audio')
+    def test_silent_clip_skips_model(self, mock_decode):
+        """Test transcription short-circuits without touching the model"""
+        from services.transcription_service import TranscriptionService
+        mock_decode.return_value = DecodedAudio('key', np.zeros(16000, dtype=np.float32), 16000)
+
+        service = TranscriptionService.__new__(TranscriptionService)
+        service.backend = whisper_backend(MagicMock())
+        result = service.transcribe_audio(b'audio', 'wav')
+
+        assert result['text'] == ''
+        assert result['model'] == 'vad'
+        service.backend.pipeline.assert_not_called()
+
+class TestFeatureEngine:
+    """Test single-STFT feature extraction"""
+
+    def test_matches_librosa_statistics(self):
+        """Test engine statistics agree with the per-feature librosa calls"""
+        import librosa
+        sample_rate = 16000
+        rng = np.random.default_rng(1)
+        t = np.arange(sample_rate * 2) / sample_rate
+        audio = (0.4 * np.sin(2 * np.pi * 300 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+        stats = FeatureEngine().analyze(audio, sample_rate)
+
+        mfcc = librosa.feature.mfcc(y=audio, sr=sample_rate, n_mfcc=13)
+        centroid = librosa.feature.spectral_centroid(y=audio, sr=sample_rate)[0]
+        rms = librosa.feature.rms(y=audio)[0]
+        zcr = librosa.feature.zero_crossing_rate(audio)[0]
+        assert stats['mfcc_mean'] == pytest.approx(np.mean(np.mean(mfcc, axis=1)), rel=1e-3)
+        assert stats['mfcc_std'] == pytest.approx(np.mean(np.std(mfcc, axis=1)), rel=1e-3)
+        assert stats['spectral_centroid_mean'] == pytest.approx(np.mean(centroid), rel=1e-3)
+        assert stats['energy_mean'] == pytest.approx(np.mean(rms), rel=1e-3)
+        assert stats['zcr_mean'] == pytest.approx(np.mean(zcr), rel=1e-2)
+
+    def test_short_clip(self):
+        """Test a clip shorter than one FFT frame still yields statistics"""
+        stats = FeatureEngine().analyze(np.full(100, 0.1, dtype=np.float32), 16000)
+
+        assert stats['energy_mean'] > 0
+
+    def test_pitch_track_follows_tone(self):
+        """Test the f0 track finds a harmonic tone and stays compact"""
+        sample_rate = 16000
+        t = np.arange(sample_rate * 2) / sample_rate
+        audio = sum(np.sin(2 * np.pi * 180 * k * t) / k for k in range(1, 5)).astype(np.float32)
+        audio[:sample_rate // 2] = 0
+
+        pitch = FeatureEngine().pitch(audio, sample_rate)
+
+        assert pitch['f0'].dtype == np.float32
+        assert pitch['f0'].nbytes < 1024
+        assert pitch['f0_median'] == pytest.approx(180, rel=0.02)
+        assert 0.6 < pitch['voiced_ratio'] < 0.85
+
+class TestDtypePolicy:
+    """Test the float32 array policy and traffic counters"""
+
+    def test_pipeline_stays_float32_without_copies(self):
+        """Test decode and preprocessing produce float32 with no policy copies"""
+        t = np.arange(16000) / 16000
+        samples = (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16)
+        monitor = ArrayTrafficMonitor()
+        processor = AudioProcessor()
+
+        with patch('utils.audio_utils.array_traffic', monitor):
+            audio_array, sample_rate = processor.load_audio(make_wav(samples), format='wav')
+            processed = processor.preprocess_audio(audio_array, sample_rate)
+        model_input = monitor.checkpoint('model_input', processed, source=processed)
+
+        stats = monitor.get_stats()
+        assert model_input is processed
+        assert processed.dtype == np.float32 and processed.flags.c_contiguous
+        assert all(stage['copies'] == 0 for stage in stats.values())
+        assert stats['decode']['allocations'] == 1
+        assert stats['model_input']['allocations'] == 0
+
+    def test_float64_output_is_counted(self):
+        """Test a stage leaking float64 is converted once and recorded"""
+        monitor = ArrayTrafficMonitor()
+        source = np.zeros(100, dtype=np.float32)
+
+        result = monitor.checkpoint('resample', source.astype(np.float64), source=source)
+
+        assert result.dtype == np.float32
+        assert monitor.get_stats()['resample']['copies'] == 1
+        assert monitor.get_stats()['resample']['nonconforming'] == {'float64': 1}
+
+class TestStreamingDenoiser:
+    """Test the overlap-add spectral gate"""
+
+    def test_unity_gain_reconstructs_input(self):
+        """Test overlap-add returns the input exactly when nothing is gated"""
+        audio = np.random.default_rng(2).standard_normal(16421).astype(np.float32)
+
+        output = SpectralGateDenoiser(gate_threshold=0.0).process(audio)
+
+        assert output.dtype == np.float32
+        assert len(output) == len(audio)
+        np.testing.assert_allclose(output, audio, atol=1e-5)
+
+    def test_stream_matches_whole_clip(self):
+        """Test arbitrary write sizes give the same output as one-shot processing"""
+        audio = np.random.default_rng(3).standard_normal(40000).astype(np.float32)
+        denoiser = SpectralGateDenoiser()
+
+        stream = denoiser.stream()
+        pieces = [stream.write(audio[start:start + size])
+                  for start, size in ((0, 1), (1, 999), (1000, 17), (1017, 38983))]
+        pieces.append(stream.flush())
+
+        np.testing.assert_allclose(np.concatenate(pieces), denoiser.process(audio), atol=1e-6)
+
+    def test_attenuates_noise_between_tones(self):
+        """Test background noise in pauses is reduced while the tone survives"""
+        sample_rate = 16000
+        rng = np.random.default_rng(4)
+        t = np.arange(sample_rate * 4) / sample_rate
+        gate = (np.sin(2 * np.pi * 0.75 * t) > 0).astype(np.float32)
+        clean = (0.5 * np.sin(2 * np.pi * 300 * t) * gate).astype(np.float32)
+        noisy = clean + 0.02 * rng.standard_normal(len(t)).astype(np.float32)
+
+        output = SpectralGateDenoiser().process(noisy)
+
+        pauses = gate == 0
+        assert np.mean(output[pauses] ** 2) < 0.25 * np.mean(noisy[pauses] ** 2)
+        assert np.mean(output[~pauses] ** 2) > 0.8 * np.mean(clean[~pauses] ** 2)
+
+    def test_vad_segments_keep_noise_floor_off_speech(self):
+        """Test speech without pauses is not gated against itself when VAD marks it"""
+        sample_rate = 16000
+        rng = np.random.default_rng(5)
+        t = np.arange(sample_rate * 4) / sample_rate
+        pitch = 140 + 40 * np.sin(2 * np.pi * 0.5 * t)
+        phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+        speech = sum(np.sin(k * phase) / k for k in range(1, 8)) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+        speech = (0.2 * speech + 0.002 * rng.standard_normal(len(t))).astype(np.float32)
+
+        segments = detect_speech_segments(speech, sample_rate)
+        assert segments == [(0, len(speech))]
+
+        output = SpectralGateDenoiser().process(speech, segments)
+        assert np.mean(output ** 2) > 0.95 * np.mean(speech ** 2)
+
+    def test_vad_segments_still_attenuate_pauses(self):
+        """Test noise in VAD pauses is still reduced when the floor comes from non-speech frames"""
+        sample_rate = 16000
+        rng = np.random.default_rng(4)
+        t = np.arange(sample_rate * 4) / sample_rate
+        gate = (np.sin(2 * np.pi * 0.75 * t) > 0).astype(np.float32)
+        clean = (0.5 * np.sin(2 * np.pi * 300 * t) * gate).astype(np.float32)
+        noisy = clean + 0.01 * rng.standard_normal(len(t)).astype(np.float32)
+
+        segments = detect_speech_segments(noisy, sample_rate)
+        assert len(segments) > 1
+        output = SpectralGateDenoiser().process(noisy, segments)
+
+        pauses = gate == 0
+        assert np.mean(output[pauses] ** 2) < 0.25 * np.mean(noisy[pauses] ** 2)
+        assert np.mean(output[~pauses] ** 2) > 0.8 * np.mean(clean[~pauses] ** 2)
+
+class TestPolyphaseResampler:
+    """Test the cached polyphase resampler"""
+
+    @pytest.mark.parametrize('source_rate', [44100, 48000, 8000])
+    def test_stream_matches_one_shot(self, source_rate):
+        """Test block-by-block output equals whole-buffer output and length"""
+        resampler = Resampler(use_soxr=False)
+        audio = np.random.default_rng(5).standard_normal(source_rate + 123).astype(np.float32)
+
+        whole = resampler.resample(audio, source_rate, 16000)
+        stream = resampler.stream(source_rate, 16000)
+        pieces = [stream.write(audio[start:start + 1000]) for start in range(0, len(audio), 1000)]
+        pieces.append(stream.flush())
+
+        assert whole.dtype == np.float32
+        assert len(whole) == -(-len(audio) * 16000 // source_rate)
+        np.testing.assert_allclose(np.concatenate(pieces), whole, atol=1e-6)
+
+    def test_passes_speech_band_and_rejects_aliases(self):
+        """Test a 1 kHz tone survives while a 10 kHz tone is filtered instead of folding to 6 kHz"""
+        resampler = Resampler(use_soxr=False)
+        t = np.arange(48000) / 48000
+
+        speech_band = resampler.resample(np.sin(2 * np.pi * 1000 * t).astype(np.float32), 48000, 16000)
+        alias = resampler.resample(np.sin(2 * np.pi * 10000 * t).astype(np.float32), 48000, 16000)
+
+        expected = np.sin(2 * np.pi * 1000 * np.arange(len(speech_band)) / 16000)
+        np.testing.assert_allclose(speech_band[200:-200], expected[200:-200], atol=1e-3)
+        assert np.max(np.abs(alias[200:-200])) < 1e-3
+
+    def test_filter_bank_is_cached_per_rate_pair(self):
+        """Test the filter is designed once per (source, target) pair"""
+        resampler = Resampler(use_soxr=False)
+
+        assert resampler.get_filter(44100, 16000) is resampler.get_filter(44100, 16000)
+        assert resampler.get_filter(44100, 16000).up == 160
+        assert resampler.get_filter(44100, 16000).down == 441
+
+    def test_client_rates_cannot_grow_the_filter_cache(self):
+        """Test the bank cache is an LRU and fine ratios never design a bank"""
+        resampler = Resampler(use_soxr=False, max_filters=2)
+        for source_rate in (8000, 22050, 48000):
+            resampler.get_filter(source_rate, 16000)
+
+        stats = resampler.get_stats()
+        assert list(stats['filters']) == ['22050->16000', '48000->16000']
+        assert stats['evictions'] == 1
+
+        with pytest.raises(AudioProcessingError):
+            resampler.get_filter(191999, 16000)
+        stream = resampler.stream(191999, 16000)
+        output = np.concatenate((stream.write(np.zeros(191999, dtype=np.float32)), stream.flush()))
+        assert abs(len(output) - 16000) <= 1
+        assert len(resampler.get_stats()['filters']) == 2
+
+class TestStreamingDecode:
+    """Test window-by-window decoding and transcription"""
+
+    def test_stream_matches_whole_decode(self):
+        """Test streamed 44.1 kHz stereo WAV windows join up to the whole-buffer decode"""
+        t = np.arange(44100 * 5) / 44100
+        tone = (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+        wav = make_wav(np.stack([tone, tone], axis=1), sample_rate=44100)
+        processor = AudioProcessor(noise_reduction=False)
+
+        whole, _ = processor.load_audio(wav, format='wav')
+        blocks = list(prefetch(processor.stream_audio(wav, format='wav', block_duration=2.0)))
+
+        assert [len(block) for block in blocks] == [32000, 32000, 16000]
+        assert all(block.dtype == np.float32 for block in blocks)
+        np.testing.assert_allclose(np.concatenate(blocks), whole, atol=1e-3)
+
+    def test_stream_command_yields_output_and_frees_slot(self):
+        """Test pooled streaming decodes hand back stdout incrementally and release their slot on close"""
+        pool = DecoderPool(size=1, queue_size=0, timeout=1)
+        payload = bytes(range(256)) * 64
+
+        assert b''.join(pool.stream_command(['cat'], payload, 1024)) == payload
+
+        stream = pool.stream_command(['cat'], payload * 64, 1024)
+        next(stream)
+        stream.close()
+        assert pool.get_stats()['active'] == 0
+        assert pool.get_stats()['streams'] == 2
+
+    def test_stream_command_frees_slot_while_caller_is_busy(self):
+        """Test a streaming decode reads ahead and gives its slot up instead of waiting on the caller"""
+        import time
+        pool = DecoderPool(size=1, queue_size=0, timeout=1, stream_buffer_bytes=4096)
+        payload = bytes(range(256)) * 256
+
+        stream = pool.stream_command(['cat'], payload, 1024)
+        first = next(stream)
+        time.sleep(0.3)
+        assert pool.get_stats()['active'] == 0
+        assert pool.run_command(['cat'], b'other decode') == b'other decode'
+        assert first + b''.join(stream) == payload
+
+    def test_stalled_stream_is_killed(self):
+        """Test a streaming decoder that produces no output within the timeout is killed"""
+        pool = DecoderPool(size=1, queue_size=0, timeout=0.5)
+        with pytest.raises(AudioProcessingError):
+            list(pool.stream_command(['sleep', '5'], b'', 1024))
+        assert pool.get_stats()['timeouts'] == 1
+        assert pool.get_stats()['active'] == 0
+
+    def test_transcribes_each_window(self):
+        """Test uploads are transcribed window by window, skipping silent windows"""
+        from services.transcription_service import TranscriptionService
+        t = np.arange(16000 * 70) / 16000
+        audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        audio[16000 * 20:16000 * 60] = 0.0
+
+        service = TranscriptionService.__new__(TranscriptionService)
+        service.backend = whisper_backend(MagicMock(side_effect=[{'text': 'first'}, {'text': 'last'}]))
+        service.batcher = None
+        result = service.transcribe_audio(audio.tobytes(), 'pcm_f32le')
+
+        assert result['text'] == 'first last'
+        assert result['model'] == 'whisper'
+        assert result['windows'] == 3
+        assert [segment['text'] for segment in result['segments']] == ['first', 'last']
+        assert service.backend.pipeline.call_count == 2
+
+    @patch('services.transcription_service.Config.LONG_FORM_ENABLED', False)
+    def test_long_form_disabled_transcribes_first_window_only(self):
+        """Test streaming without long-form mode transcribes one model-length window"""
+        from services.transcription_service import TranscriptionService
+        t = np.arange(16000 * 70) / 16000
+        audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+        service = TranscriptionService.__new__(TranscriptionService)
+        service.backend = whisper_backend(MagicMock(return_value={'text': 'first'}))
+        service.batcher = None
+        result = service.transcribe_audio(audio.tobytes(), 'pcm_f32le')
+
+        assert result['text'] == 'first'
+        assert result['windows'] == 1
+        assert result['segments'][0]['end'] == 30.0
+        service.backend.pipeline.assert_called_once()
+
+class TestMicroBatcher:
+    """Test cross-request micro-batching"""
+
+    def test_concurrent_submits_share_a_batch(self):
+        """Test requests arriving within the wait window run as one batch and get their own results"""
+        from concurrent.futures import ThreadPoolExecutor
+        run_batch = MagicMock(side_effect=lambda items: [item * 10 for item in items])
+        batcher = MicroBatcher(run_batch, max_batch_size=4, max_wait_ms=200)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(batcher.submit, [1, 2, 3, 4]))
+
+        assert results == [10, 20, 30, 40]
+        run_batch.assert_called_once()
+        stats = batcher.get_stats()
+        assert stats['batch_size_histogram'] == {4: 1}
+        assert stats['max_queue_delay_ms'] < 1000
+
+    def test_batch_failure_reaches_every_request(self):
+        """Test an exception in the batched call is raised in each waiting request"""
+        batcher = MicroBatcher(MagicMock(side_effect=RuntimeError('model crashed')), max_wait_ms=0)
+
+        with pytest.raises(RuntimeError):
+            batcher.submit('clip')
+        assert batcher.get_stats()['failed_batches'] == 1
+
+class TestMicroBatcherFork:
+    """Test the batcher after a fork"""
+
+    def test_scheduler_restarts_in_child_process(self):
+        """Test a batcher inherited by a forked worker starts its own scheduler thread"""
+        batcher = MicroBatcher(lambda items: [item * 2 for item in items], max_wait_ms=0)
+        assert batcher.submit(1) == 2
+        parent_worker = batcher._worker
+
+        with patch('utils.micro_batcher.os.getpid', return_value=-1):
+            assert batcher.submit(2) == 4
+        assert batcher._worker is not parent_worker
+
+class TestLongForm:
+    """Test overlapping long-form windows and transcript stitching"""
+
+    def test_windows_cut_at_silence_and_overlap(self):
+        """Test cuts move to a quiet gap and consecutive windows share the overlap"""
+        sample_rate = 16000
+        audio = np.random.default_rng(0).standard_normal(sample_rate * 70).astype(np.float32)
+        audio[int(sample_rate * 28.0):int(sample_rate * 28.2)] = 0.0
+
+        windows = plan_windows(audio, sample_rate, window_seconds=30, overlap_seconds=2, search_seconds=3)
+        first_end = windows[0][0] + len(windows[0][1])
+
+        assert 28.0 * sample_rate < first_end < 28.2 * sample_rate
+        assert windows[1][0] == first_end - 2 * sample_rate
+        assert all(len(window) <= 30 * sample_rate for _, window in windows)
+        assert windows[-1][0] + len(windows[-1][1]) == len(audio)
+
+    def test_default_split_is_unchanged(self):
+        """Test split_audio_into_chunks still cuts fixed, non-overlapping chunks by default"""
+        chunks = AudioProcessor().split_audio_into_chunks(np.ones(16000 * 25, dtype=np.float32), 10.0)
+        assert [len(chunk) for chunk in chunks] == [160000, 160000, 80000]
+
+    def test_stitch_keeps_shared_words_once(self):
+        """Test words transcribed in both halves of an overlap appear once, with split timestamps"""
+        text, segments = stitch_transcripts([
+            {'start': 0.0, 'end': 30.0, 'text': 'we met at the station and'},
+            {'start': 28.0, 'end': 50.0, 'text': 'Station, and then walked home'}
+        ])
+
+        assert text == 'we met at the station and then walked home'
+        assert segments == [
+            {'start': 0.0, 'end': 29.0, 'text': 'we met at the station and'},
+            {'start': 29.0, 'end': 50.0, 'text': 'then walked home'}
+        ]
+
+    def test_stitch_without_alignment_cuts_at_overlap_midpoint(self):
+        """Test windows sharing no words drop their half of the overlap instead of repeating it"""
+        text, segments = stitch_transcripts([
+            {'start': 0.0, 'end': 10.0, 'text': ' '.join(f"a{i}" for i in range(10))},
+            {'start': 8.0, 'end': 18.0, 'text': ' '.join(f"b{i}" for i in range(10))}
+        ])
+
+        assert text.split() == [f"a{i}" for i in range(9)] + [f"b{i}" for i in range(1, 10)]
+        assert [(segment['start'], segment['end']) for segment in segments] == [(0.0, 9.0), (9.0, 18.0)]
+
+    def test_long_clip_windows_run_as_one_batch(self):
+        """Test a decoded clip longer than one window goes to the model as a single batch"""
+        from services.transcription_service import TranscriptionService
+        t = np.arange(16000 * 75) / 16000
+        audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+        service = TranscriptionService.__new__(TranscriptionService)
+        service.backend = whisper_backend(MagicMock(return_value=[{'text': 'one two'}, {'text': 'two three'},
+                                                           {'text': 'three four'}]))
+        service.batcher = None
+        result = service.transcribe_audio(DecodedAudio('key', audio, 16000))
+
+        service.backend.pipeline.assert_called_once()
+        assert service.backend.pipeline.call_args.kwargs['batch_size'] == 3
+        assert result['windows'] == 3
+        assert len(result['segments']) == 3
+
+class TestParallelChunks:
+    """Test parallel chunk transcription"""
+
+    @patch('services.transcription_service.chunk_pool', ChunkPool(workers=1))
+    def test_results_are_ordered_with_errors_kept(self):
+        """Test chunks come back in order, speech chunks share one batch and failures keep their error"""
+        from services.transcription_service import TranscriptionService
+        t = np.arange(16000) / 16000
+        tone = make_wav((8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16))
+        silence = make_wav(np.zeros(16000, dtype=np.int16))
+
+        service = TranscriptionService.__new__(TranscriptionService)
+        service.backend = whisper_backend(MagicMock(return_value=[{'text': 'first'}, {'text': 'second'}]))
+        service.batcher = None
+        results = service.transcribe_chunks([tone, b'not audio', silence, tone], 'wav')
+
+        assert [r['chunk_index'] for r in results] == [0, 1, 2, 3]
+        assert [r['text'] for r in results] == ['first', '', '', 'second']
+        assert 'error' in results[1]
+        assert results[2]['model'] == 'vad'
+        service.backend.pipeline.assert_called_once()
+
+        stats = service.get_transcription_stats(results)
+        assert stats['failed_chunks'] == 1
+        assert set(stats['stage_ms']) == {'decode', 'preprocess', 'inference'}
+        assert stats['chunk_ms_total'] >= sum(stats['stage_ms'].values()) - 1e-6
+        assert stats['concurrency'] > 0
+
+    def test_broken_pool_is_shut_down(self):
+        """Test a pool whose worker died is shut down, not just dropped, and its chunks report the crash"""
+        from concurrent.futures import Future
+        from concurrent.futures.process import BrokenProcessPool
+        broken = Future()
+        broken.set_exception(BrokenProcessPool('worker killed'))
+        executor = MagicMock()
+        executor.submit.return_value = broken
+
+        pool = ChunkPool(workers=2)
+        pool._executor = executor
+        results = pool.prepare([b'one', b'two'], 'wav')
+
+        assert all('crashed' in result['error'] for result in results)
+        executor.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        assert pool._executor is None
+
+class TestQuantization:
+    """Test the int8 Whisper mode"""
+
+    @patch('utils.quantization.quantize_dynamic_int8')
+    def test_int8_applies_on_cpu_only(self, mock_quantize):
+        """Test int8 replaces the pipeline's model on CPU and is skipped on CUDA"""
+        backend = whisper_backend(MagicMock(), precision='int8')
+        original = backend.pipeline.model
+
+        backend.device = 'cuda'
+        backend._apply_precision()
+        assert backend.precision == 'fp32'
+        mock_quantize.assert_not_called()
+
+        backend.device = 'cpu'
+        backend._apply_precision()
+        assert backend.precision == 'int8'
+        mock_quantize.assert_called_once_with(original)
+        assert backend.pipeline.model is mock_quantize.return_value
+
+class TestInferenceRuntime:
+    """Test per-worker torch thread budgets"""
+
+    def test_cores_are_split_between_workers(self):
+        """Test each worker gets its own slice of cores"""
+        assert plan_threads(8, 2) == 4
+        assert plan_threads(2, 4) == 1
+        assert worker_cores(list(range(8)), 1, 4) == [4, 5, 6, 7]
+        assert worker_cores([0, 1], 3, 1) == [1]
+
+    @patch.dict('os.environ', {})
+    @patch('utils.inference_runtime.Config.CPU_AFFINITY_ENABLED', True)
+    @patch('utils.inference_runtime.Config.SERVER_WORKERS', 2)
+    def test_configure_applies_budget_once(self):
+        """Test configure sets the thread budget and pins the worker"""
+        cores = usable_cpus()
+        runtime = InferenceRuntime()
+        with patch('utils.inference_runtime.os.sched_setaffinity') as mock_affinity:
+            settings = runtime.configure(worker_index=0)
+            assert runtime.configure() is settings
+
+        threads = max(1, len(cores) // 2)
+        assert settings['intra_op_threads'] == threads
+        assert settings['affinity'] == cores[:threads]
+        mock_affinity.assert_called_once_with(0, cores[:threads])
+        assert os.environ['OMP_NUM_THREADS'] == str(threads)
+        assert runtime.get_stats()['configured'] is True
+
+class TestModelLoader:
+    """Test background model loading and readiness"""
+
+    def test_models_load_in_background_and_report_state(self):
+        """Test models stay pending until started, then load, warm up and become ready"""
+        loader = ModelLoader()
+        warmup = MagicMock()
+        loader.register('transcription', MagicMock(), warmup)
+        loader.register('emotion', MagicMock(side_effect=RuntimeError('no weights')))
+        assert loader.get_status()['models']['transcription']['state'] == 'pending'
+        assert loader.is_ready() is False
+
+        loader.start()
+        assert loader.wait('transcription', timeout=5)
+        assert loader.wait('emotion', timeout=5)
+        assert loader.wait('unregistered', timeout=0)
+
+        status = loader.get_status()
+        assert status['ready'] is True
+        assert status['degraded'] is True
+        assert status['models']['transcription']['state'] == 'ready'
+        assert status['models']['emotion'] == {'state': 'failed', 'error': 'no weights',
+                                               'load_ms': None, 'warmup_ms': None}
+        warmup.assert_called_once()
+
+    def test_prefork_loads_in_parent_and_warms_in_worker(self):
+        """Test models can be loaded without warmup, shared, and warmed up later"""
+        import gc
+        loader = ModelLoader()
+        warmup, share = MagicMock(), MagicMock()
+        loader.register('transcription', MagicMock(), warmup, share=share)
+
+        loader.load_all(warmup=False)
+        assert loader.get_status()['models']['transcription']['state'] == 'loaded'
+        loader.start()
+        try:
+            loader.prepare_fork()
+        finally:
+            gc.unfreeze()
+        share.assert_called_once()
+        warmup.assert_not_called()
+
+        loader.start_warmup()
+        assert loader.wait('transcription', timeout=5)
+        assert loader.get_status()['models']['transcription']['state'] == 'ready'
+
+    def test_synthetic_speech_passes_vad(self):
+        """Test the warmup signal is detected as speech so it reaches the model"""
+        audio = synthetic_speech(2.0, 16000)
+        assert audio.dtype == np.float32
+        assert detect_speech_segments(audio, 16000)
+
+class TestModelArtifacts:
+    """Test loading prepared model artifacts"""
+
+    def test_prepared_model_loads_offline(self, tmp_path):
+        """Test a prepared artifact is loaded locally, and MODEL_OFFLINE refuses to download"""
+        with patch('utils.model_artifacts.Config.MODEL_CACHE_DIR', str(tmp_path)):
+            assert pipeline_source('openai/whisper-tiny') == ('openai/whisper-tiny', {})
+
+            with patch('utils.model_artifacts.Config.MODEL_OFFLINE', True), pytest.raises(ModelError):
+                pipeline_source('openai/whisper-tiny')
+
+            directory = artifact_path('safetensors', 'openai/whisper-tiny')
+            os.makedirs(directory)
+            with open(os.path.join(directory, ARTIFACT_MANIFEST), 'w') as manifest:
+                manifest.write('{"model": "openai/whisper-tiny", "revision": "abc123"}')
+
+            source, model_kwargs = pipeline_source('openai/whisper-tiny')
+            assert source == str(tmp_path / 'safetensors' / 'openai--whisper-tiny')
+            assert model_kwargs == {'local_files_only': True, 'use_safetensors': True, 'low_cpu_mem_usage': True}
+
+class TestASRBackends:
+    """Test the speech-to-text backend registry"""
+
+    def test_auto_picks_fastest_installed_backend(self):
+        """Test auto selection skips missing runtimes and backends that fail to load"""
+        from services import asr_backends
+        installed = {'onnxruntime', 'transformers'}
+        with patch.object(asr_backends.ASRBackend, 'is_available',
+                          classmethod(lambda cls: cls.name in installed)), \
+                patch.object(asr_backends.OnnxRuntimeBackend, 'load', side_effect=RuntimeError('export failed')), \
+                patch.object(asr_backends.TransformersBackend, 'load'):
+            assert asr_backends.available_backends() == ['transformers', 'onnxruntime']
+            backend = asr_backends.create_backend('auto', 'openai/whisper-tiny')
+            assert backend.name == 'transformers'
+
+            installed.clear()
+            with pytest.raises(ModelError):
+                asr_backends.create_backend('ctranslate2', 'openai/whisper-tiny')
+
+    def test_speech_recognition_receives_pcm16(self):
+        """Test the speech_recognition backend converts float samples to 16-bit PCM"""
+        from services.asr_backends import SpeechRecognitionBackend
+        backend = SpeechRecognitionBackend('unused')
+        backend.recognizer = MagicMock()
+        backend.recognizer.recognize_google.return_value = {'alternative': [{'transcript': ' hi ', 'confidence': 0.9}]}
+        backend._audio_data = MagicMock()
+
+        result = backend.transcribe_batch([{'array': np.array([0.5, -1.0], dtype=np.float32), 'sampling_rate': 16000}])
+
+        assert result == [{'text': 'hi', 'confidence': 0.9}]
+        pcm = backend._audio_data.call_args.args[0]
+        assert np.frombuffer(pcm, dtype='<i2').tolist() == [16383, -32767]
+
+    def test_onnx_share_memory_is_a_no_op(self):
+        """Test the ONNX backend does not call torch's share_memory on its ORT model"""
+        from services.asr_backends import OnnxRuntimeBackend
+        backend = OnnxRuntimeBackend('openai/whisper-tiny')
+        backend.pipeline = MagicMock()
+        backend.pipeline.model = MagicMock(spec=['generate'])
+
+        backend.share_memory()
+
+    @pytest.mark.parametrize('backend_name', ['onnxruntime', 'ctranslate2'])
+    def test_offline_without_artifact_never_downloads(self, backend_name, tmp_path):
+        """Test offline ONNX and CTranslate2 loads fail with ModelError instead of reaching the hub"""
+        from services.asr_backends import ASR_BACKENDS
+        runtime = MagicMock()
+        runtime.get_cuda_device_count.return_value = 0
+        runtime.WhisperModel.side_effect = OSError('not in the local cache')
+        with patch('utils.model_artifacts.Config.MODEL_CACHE_DIR', str(tmp_path)), \
+                patch('utils.model_artifacts.Config.MODEL_OFFLINE', True), \
+                patch('services.asr_backends.importlib.import_module', return_value=runtime):
+            with pytest.raises(ModelError):
+                ASR_BACKENDS[backend_name]('openai/whisper-tiny').load()
+
+        runtime.ORTModelForSpeechSeq2Seq.from_pretrained.assert_not_called()
+        if backend_name == 'ctranslate2':
+            assert runtime.WhisperModel.call_args.kwargs['local_files_only'] is True
+
+class TestResultCache:
+    """Test the transcription result cache"""
+
+    def test_lru_eviction_and_ttl(self):
+        """Test the least recently used entry is evicted and expired entries miss"""
+        cache = ResultCache(max_entries=2, ttl_seconds=60)
+        cache.put('a', {'text': 'a'})
+        cache.put('b', {'text': 'b'})
+        assert cache.get('a') == {'text': 'a'}
+        cache.put('c', {'text': 'c'})
+
+        assert cache.get('b') is None
+        assert cache.get('c') == {'text': 'c'}
+        with patch('utils.result_cache.time.monotonic', return_value=1e12):
+            assert cache.get('a') is None
+
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses'], stats['evictions'], stats['expirations']) == (2, 2, 1, 1)
+        assert stats['hit_ratio'] == 0.5
+
+    @patch('services.transcription_service.transcription_cache', new_callable=lambda: ResultCache(8, 60))
+    def test_repeated_audio_skips_model(self, cache):
+        """Test identical audio is transcribed once and settings changes miss"""
+        from services.transcription_service import TranscriptionService
+        service = TranscriptionService.__new__(TranscriptionService)
+        service.backend = whisper_backend(MagicMock(return_value={'text': 'hello'}))
+        service.batcher = None
+        audio = synthetic_speech()
+
+        first = service.transcribe_audio(DecodedAudio('one', audio, 16000))
+        first['text'] = 'modified by caller'
+        second = service.transcribe_audio(DecodedAudio('two', audio.copy(), 16000))
+
+        assert second['text'] == 'hello'
+        assert service.backend.pipeline.call_count == 1
+        with patch('services.transcription_service.Config.VAD_ENABLED', not Config.VAD_ENABLED):
+            service.transcribe_audio(DecodedAudio('three', audio, 16000))
+        assert service.backend.pipeline.call_count == 2
+        assert cache.get_stats()['hits'] == 1
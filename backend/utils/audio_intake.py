@@ -0,0 +1,126 @@
+"""
+Streaming audio intake for ToneBridge Backend
+Reads request bodies in chunks and rejects oversized or overlong audio before decoding
+"""
+
+import struct
+from typing import Optional, BinaryIO
+from utils.logger import setup_logger
+from utils.error_handlers import PayloadTooLargeError
+from utils.format_sniffer import sniff_format, normalize_format
+from utils.wav_reader import parse_wav_header, wav_duration
+from config import Config
+
+logger = setup_logger(__name__)
+
+# Enough leading bytes to find the WAV fmt/data chunks or the FLAC STREAMINFO block
+PROBE_BYTES = 4096
+
+# Bytes per sample of the headerless PCM formats
+RAW_PCM_SAMPLE_WIDTHS = {'pcm_s16le': 2, 'pcm_f32le': 4}
+
+def probe_duration(head: bytes, audio_format: Optional[str] = None, total_size: Optional[int] = None,
+                   sample_rate: Optional[int] = None, channels: Optional[int] = None) -> Optional[float]:
+    """
+    Estimate audio duration from container headers without decoding
+
+    Args:
+        head: Leading bytes of the audio
+        audio_format: Client-supplied format, needed for headerless PCM
+        total_size: Total payload size in bytes, if known
+        sample_rate: Declared sample rate for raw PCM
+        channels: Declared channel count for raw PCM
+
+    Returns:
+        Duration in seconds, or None if the header does not declare one
+        (compressed streams such as webm/ogg/mp3 are checked after decoding)
+    """
+    audio_format = normalize_format(audio_format)
+    if audio_format in RAW_PCM_SAMPLE_WIDTHS:
+        if total_size is None:
+            return None
+        frame_size = RAW_PCM_SAMPLE_WIDTHS[audio_format] * (channels or Config.AUDIO_CHANNELS)
+        return total_size / frame_size / (sample_rate or Config.AUDIO_SAMPLE_RATE)
+
+    detected = sniff_format(head)
+    if detected == 'wav':
+        info = parse_wav_header(head)
+        return wav_duration(info) if info else None
+    if detected == 'flac':
+        return _flac_duration(head)
+    return None
+
+def _flac_duration(head: bytes) -> Optional[float]:
+    """Read total samples and sample rate from the FLAC STREAMINFO block"""
+    # 'fLaC', 4-byte block header, then STREAMINFO; rate/channels/bps/total samples start at byte 18
+    if len(head) < 26 or head[4] & 0x7F != 0:
+        return None
+    packed = struct.unpack_from('>Q', head, 18)[0]
+    sample_rate = packed >> 44
+    total_samples = packed & 0xFFFFFFFFF
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / sample_rate
+
+def check_duration(duration: Optional[float], max_duration: Optional[float] = None):
+    """Raise PayloadTooLargeError if a known duration exceeds the configured limit"""
+    max_duration = max_duration or Config.MAX_AUDIO_DURATION
+    if duration is not None and duration > max_duration:
+        raise PayloadTooLargeError(
+            f"Audio is {duration:.1f}s long; the maximum is {max_duration:.0f}s"
+        )
+
+def read_audio_stream(stream: BinaryIO, audio_format: Optional[str] = None,
+                      content_length: Optional[int] = None, sample_rate: Optional[int] = None,
+                      channels: Optional[int] = None, max_bytes: Optional[int] = None) -> bytearray:
+    """
+    Read an audio upload in chunks with early size and duration rejection
+
+    The declared Content-Length is checked before anything is read, the byte
+    count is enforced chunk by chunk (covering chunked transfer encoding), and
+    the container header is probed for duration as soon as the first bytes
+    arrive, so an overlong recording is refused before the rest of it is read.
+
+    Args:
+        stream: Readable binary stream (request body or uploaded file)
+        audio_format: Client-supplied format
+        content_length: Declared body size, if known
+        sample_rate: Declared sample rate for raw PCM
+        channels: Declared channel count for raw PCM
+        max_bytes: Size limit (defaults to MAX_CONTENT_LENGTH)
+
+    Returns:
+        The complete audio payload, in the buffer it was read into
+    """
+    max_bytes = max_bytes or Config.MAX_CONTENT_LENGTH
+    if content_length is not None and content_length > max_bytes:
+        raise PayloadTooLargeError(f"Audio upload of {content_length} bytes exceeds the {max_bytes} byte limit")
+
+    # One growing buffer, handed back as is: no spool to copy out of, so the upload is held once
+    audio_data = bytearray()
+    head = b''
+    probed = False
+
+    while True:
+        chunk = stream.read(Config.UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        if len(audio_data) + len(chunk) > max_bytes:
+            raise PayloadTooLargeError(f"Audio upload exceeds the {max_bytes} byte limit")
+        audio_data += chunk
+
+        if not probed:
+            head += chunk[:PROBE_BYTES - len(head)]
+            if len(head) >= PROBE_BYTES:
+                check_duration(probe_duration(head, audio_format, content_length, sample_rate, channels))
+                probed = True
+
+    total = len(audio_data)
+
+    # Short uploads were never probed; raw PCM duration is only known once fully read
+    if not probed or normalize_format(audio_format) in RAW_PCM_SAMPLE_WIDTHS:
+        check_duration(probe_duration(head, audio_format, total, sample_rate, channels))
+
+    logger.info(f"Audio upload read: {total} bytes")
+    return audio_data
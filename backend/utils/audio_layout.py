@@ -0,0 +1,41 @@
+"""
+Sample layout helpers for ToneBridge Backend
+Decoded audio is mono, or shaped (channels, samples) with samples on the last axis
+"""
+
+import numpy as np
+
+def to_mono(audio_array: np.ndarray) -> np.ndarray:
+    """
+    Average the channels of decoded audio
+
+    Args:
+        audio_array: Mono samples, or samples shaped (channels, samples)
+
+    Returns:
+        float32 mono samples (the input itself when already mono)
+    """
+    if audio_array.ndim == 1:
+        return audio_array
+    if audio_array.shape[0] == 1:
+        return audio_array[0]
+    return audio_array.mean(axis=0, dtype=np.float32)
+
+def frames_to_layout(frames: np.ndarray, channels: int = 1) -> np.ndarray:
+    """
+    Convert interleaved frames, as PCM bytes and soundfile lay them out, to the decoded layout
+
+    Args:
+        frames: Samples shaped (frames, channels), or mono samples
+        channels: Target channel count; 1 downmixes to mono
+
+    Returns:
+        Mono samples, or a contiguous (channels, samples) array
+    """
+    if frames.ndim == 1:
+        return frames
+    if frames.shape[1] == 1:
+        return frames[:, 0]
+    if channels == 1:
+        return frames.mean(axis=1, dtype=np.float32)
+    return np.ascontiguousarray(frames.T)
@@ -0,0 +1,129 @@
+"""
+Streaming audio blocks for ToneBridge Backend
+Re-blocks decoder output into fixed-duration windows and decodes ahead of the consumer
+"""
+
+import queue
+import threading
+import numpy as np
+from typing import Iterator, Iterable, List, Optional
+from utils.logger import setup_logger
+from utils.resampler import resampler
+
+logger = setup_logger(__name__)
+
+class BlockAssembler:
+    """
+    Turns mono decoder output of any size into fixed-size blocks at the target rate
+
+    Decoders hand over whatever they have (a libsndfile block, an ffmpeg pipe
+    read, a slice of a WAV payload). Each piece is resampled through a
+    streaming polyphase filter and copied into the current block; a block is
+    released as soon as it is full, so only one block and the resampler's
+    short history are held at a time.
+    """
+
+    def __init__(self, block_samples: int, source_rate: int, target_rate: int):
+        self.block_samples = max(1, block_samples)
+        self._resample = resampler.stream(source_rate, target_rate) if source_rate != target_rate else None
+        self._block = np.empty(self.block_samples, dtype=np.float32)
+        self._filled = 0
+
+    def write(self, samples: np.ndarray) -> List[np.ndarray]:
+        """
+        Feed decoded samples
+
+        Args:
+            samples: Next mono samples at the source rate
+
+        Returns:
+            Blocks completed by this write (possibly none)
+        """
+        if self._resample is not None:
+            samples = self._resample.write(samples)
+        return self._fill(samples)
+
+    def flush(self) -> List[np.ndarray]:
+        """Finish the signal and return the remaining, possibly short, block"""
+        blocks = self._fill(self._resample.flush()) if self._resample is not None else []
+        if self._filled:
+            blocks.append(self._block[:self._filled])
+            self._block = np.empty(self.block_samples, dtype=np.float32)
+            self._filled = 0
+        return blocks
+
+    def _fill(self, samples: np.ndarray) -> List[np.ndarray]:
+        """Copy samples into the current block, starting a new one whenever it fills"""
+        blocks = []
+        position = 0
+        while position < len(samples):
+            take = min(len(samples) - position, self.block_samples - self._filled)
+            self._block[self._filled:self._filled + take] = samples[position:position + take]
+            self._filled += take
+            position += take
+            if self._filled == self.block_samples:
+                blocks.append(self._block)
+                self._block = np.empty(self.block_samples, dtype=np.float32)
+                self._filled = 0
+        return blocks
+
+_END = object()
+
+def prefetch(blocks: Iterable, depth: int = 1) -> Iterator:
+    """
+    Produce items on a background thread, up to depth items ahead of the consumer
+
+    Decoding the next window then overlaps with whatever the consumer does
+    with the current one (typically running the transcription model), while
+    memory stays bounded by depth + 2 items. Exceptions raised by the
+    producer are re-raised in the consumer; closing the returned generator
+    stops the producer and closes the source.
+
+    Args:
+        blocks: Iterable to drain, e.g. AudioProcessor.stream_audio()
+        depth: Items allowed to wait in the hand-off queue
+
+    Yields:
+        The items of blocks, in order
+    """
+    handoff: queue.Queue = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+    failure: List[Optional[BaseException]] = [None]
+
+    def offer(item) -> bool:
+        """Queue an item, giving up if the consumer has gone away"""
+        while not stop.is_set():
+            try:
+                handoff.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(blocks)
+        try:
+            for item in iterator:
+                if not offer(item):
+                    break
+        except BaseException as e:
+            failure[0] = e
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+            offer(_END)
+
+    producer = threading.Thread(target=produce, name='audio-prefetch', daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = handoff.get()
+            if item is _END:
+                break
+            yield item
+        if failure[0] is not None:
+            raise failure[0]
+    finally:
+        stop.set()
+        producer.join()
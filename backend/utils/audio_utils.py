@@ -9,29 +9,64 @@ import subprocess
 import numpy as np
 import librosa
 import soundfile as sf
-from typing import Tuple, Optional, Union
+from typing import Tuple, Optional, Union, Callable, Iterator
 from pydub import AudioSegment
 from pydub.utils import make_chunks
 import wave
 from utils.logger import setup_logger
-from utils.error_handlers import AudioProcessingError
+from utils.error_handlers import AudioProcessingError, PayloadTooLargeError
+from utils.decoder_pool import decoder_pool
+from utils.wav_reader import parse_wav_header, wav_sample_dtype
+from utils.format_sniffer import format_sniffer
+from utils.audio_intake import check_duration
+from utils.feature_engine import feature_engine
+from utils.dtype_policy import array_traffic
+from utils.denoise import spectral_gate
+from utils.resampler import resampler
+from utils.audio_layout import frames_to_layout, to_mono
+from utils.vad import detect_speech_segments
+from utils.audio_stream import BlockAssembler
+from utils.long_form import plan_windows
+from config import Config
 
 logger = setup_logger(__name__)
 
+# Compressed formats decoded by ffmpeg
+FFMPEG_FORMATS = {'webm', 'ogg', 'mp3', 'aac', 'mp4'}
+
+# Headerless PCM formats clients can send to skip decoding entirely
+RAW_PCM_FORMATS = {
+    'pcm_s16le': np.dtype('<i2'),
+    'pcm_f32le': np.dtype('<f4')
+}
+
+# Formats ffmpeg may need to seek in, so they cannot be streamed through a pipe
+SEEKABLE_INPUT_FORMATS = {'mp4'}
+
+# Source frames converted per step when streaming in-memory PCM
+STREAM_READ_FRAMES = 65536
+
 class AudioProcessor:
     """Centralized audio processing utilities"""
     
-    def __init__(self, target_sample_rate: int = 16000, target_channels: int = 1):
+    def __init__(self, target_sample_rate: int = 16000, target_channels: int = 1, decode_mode: str = 'pipe',
+                 noise_reduction: bool = True):
         self.target_sample_rate = target_sample_rate
         self.target_channels = target_channels
+        # 'pipe' streams through ffmpeg stdin/stdout, 'tempfile' round-trips through disk
+        self.decode_mode = decode_mode
+        self.noise_reduction = noise_reduction
     
-    def load_audio(self, audio_data: Union[bytes, str], format: str = None) -> Tuple[np.ndarray, int]:
+    def load_audio(self, audio_data: Union[bytes, str], format: str = None,
+                   sample_rate: Optional[int] = None, channels: Optional[int] = None) -> Tuple[np.ndarray, int]:
         """
         Load audio from various sources and formats
 
         Args:
             audio_data: Audio data as bytes or file path
             format: Audio format (e.g., 'wav', 'webm', 'mp3'). Used for explicit conversion.
+            sample_rate: Sample rate of raw PCM input ('pcm_s16le'/'pcm_f32le' only)
+            channels: Interleaved channel count of raw PCM input ('pcm_s16le'/'pcm_f32le' only)
 
         Returns:
             Tuple of (audio_array, sample_rate)
@@ -39,115 +74,467 @@ class AudioProcessor:
         try:
             logger.info(f"Loading audio: {len(audio_data)} bytes, format: {format}")
             
-            if isinstance(audio_data, bytes):
-                # If format is webm, convert to wav using ffmpeg
-                if format == 'webm':
-                    logger.info("Converting webm to wav using ffmpeg...")
-                    
-                    # Create temporary files
-                    with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as temp_in:
-                        temp_in.write(audio_data)
-                        temp_in.flush()
-                        temp_in_path = temp_in.name
-                    
-                    temp_out_path = temp_in_path.replace('.webm', '.wav')
-                    
-                    try:
-                        # Run ffmpeg to convert webm to wav
-                        cmd = [
-                            'ffmpeg', '-y', '-i', temp_in_path,
-                            '-ar', str(self.target_sample_rate),
-                            '-ac', str(self.target_channels),
-                            temp_out_path
-                        ]
-                        logger.info(f"Running ffmpeg: {' '.join(cmd)}")
-                        
-                        result = subprocess.run(
-                            cmd, 
-                            check=True, 
-                            stdout=subprocess.PIPE, 
-                            stderr=subprocess.PIPE,
-                            text=True
-                        )
-                        logger.info("ffmpeg conversion completed successfully")
-                        
-                        # Load the wav file with librosa
-                        audio_array, sample_rate = librosa.load(
-                            temp_out_path,
-                            sr=self.target_sample_rate,
-                            mono=(self.target_channels == 1)
-                        )
-                        
-                    except subprocess.CalledProcessError as ffmpeg_error:
-                        logger.error(f"ffmpeg conversion failed: {ffmpeg_error}")
-                        logger.error(f"ffmpeg stderr: {ffmpeg_error.stderr}")
-                        raise AudioProcessingError(f"ffmpeg conversion failed: {ffmpeg_error}")
-                    except Exception as e:
-                        logger.error(f"Unexpected error during ffmpeg conversion: {str(e)}")
-                        raise AudioProcessingError(f"ffmpeg conversion error: {str(e)}")
-                    finally:
-                        # Clean up temp files
-                        try:
-                            os.remove(temp_in_path)
-                            if os.path.exists(temp_out_path):
-                                os.remove(temp_out_path)
-                        except Exception as cleanup_error:
-                            logger.warning(f"Failed to cleanup temp files: {cleanup_error}")
-                else:
-                    # For other formats, try using pydub first for better format support
-                    try:
-                        logger.info(f"Attempting to load audio with pydub, format: {format}")
-                        
-                        # Use pydub to load and convert to wav
-                        audio = AudioSegment.from_file(io.BytesIO(audio_data), format=format)
-                        
-                        # Export to wav format in memory
-                        wav_buffer = io.BytesIO()
-                        audio.export(wav_buffer, format='wav')
-                        wav_buffer.seek(0)
-                        
-                        # Load with librosa
-                        audio_array, sample_rate = librosa.load(
-                            wav_buffer,
-                            sr=self.target_sample_rate,
-                            mono=(self.target_channels == 1)
-                        )
-                        
-                        logger.info("Audio loaded successfully with pydub + librosa")
-                        
-                    except Exception as pydub_error:
-                        logger.warning(f"Pydub loading failed: {str(pydub_error)}, trying librosa directly")
-                        
-                        # Fallback to direct librosa loading
-                        try:
-                            audio_array, sample_rate = librosa.load(
-                                io.BytesIO(audio_data),
-                                sr=self.target_sample_rate,
-                                mono=(self.target_channels == 1)
-                            )
-                            logger.info("Audio loaded successfully with librosa directly")
-                        except Exception as librosa_error:
-                            logger.error(f"Both pydub and librosa loading failed")
-                            logger.error(f"Pydub error: {str(pydub_error)}")
-                            logger.error(f"Librosa error: {str(librosa_error)}")
-                            raise AudioProcessingError(f"Failed to load audio with any method. Pydub: {str(pydub_error)}, Librosa: {str(librosa_error)}")
+            if isinstance(audio_data, (bytes, bytearray)) and format in RAW_PCM_FORMATS:
+                # Raw PCM has no container to sniff or decode
+                format_sniffer.record_decision(format, 'raw_pcm')
+                audio_array, sample_rate = self._load_raw_pcm(audio_data, format, sample_rate, channels)
+            elif isinstance(audio_data, (bytes, bytearray)):
+                # Route by the payload's magic bytes rather than the client label
+                audio_format = format_sniffer.resolve(audio_data, format)
+                decoder_name, decoder = self._select_decoder(audio_format)
+                format_sniffer.record_decision(audio_format, decoder_name)
+                logger.info(f"Decoding {audio_format or 'unknown'} audio with {decoder_name}")
+
+                audio_array, sample_rate = decoder(audio_data, audio_format)
             else:
                 # Load from file path
-                audio_array, sample_rate = librosa.load(
-                    audio_data,
-                    sr=self.target_sample_rate,
-                    mono=(self.target_channels == 1)
-                )
+                audio_array, sample_rate = self._load_with_librosa(audio_data)
             
+            # Every decoder hands back float32 C-contiguous samples; anything else is counted as a copy
+            audio_array = array_traffic.checkpoint('decode', audio_array)
             logger.info(f"Audio loaded successfully: {len(audio_array)} samples, {sample_rate}Hz")
+            
+            # Containers without a declared duration are checked here, still before any model work
+            check_duration(audio_array.shape[-1] / sample_rate)
             return audio_array, sample_rate
             
+        except PayloadTooLargeError:
+            raise
         except Exception as e:
             logger.error(f"Failed to load audio: {str(e)}")
-            logger.error(f"Audio data length: {len(audio_data) if isinstance(audio_data, bytes) else 'N/A'}")
+            logger.error(f"Audio data length: {len(audio_data) if isinstance(audio_data, (bytes, bytearray)) else 'N/A'}")
             logger.error(f"Audio format: {format}")
             raise AudioProcessingError(f"Failed to load audio: {str(e)}")
     
+    def stream_audio(self, audio_data: bytes, format: str = None,
+                     sample_rate: Optional[int] = None, channels: Optional[int] = None,
+                     block_duration: float = 30.0) -> Iterator[np.ndarray]:
+        """
+        Decode audio incrementally, yielding fixed-duration blocks as they become available
+
+        WAV, raw PCM and libsndfile formats are converted a slice at a time
+        from the request bytes, and ffmpeg formats are read from the decoder's
+        stdout as it runs, so the decoded signal is never held in full: peak
+        memory is a block or two, whatever the recording length. Formats that
+        cannot be streamed (mp4 and unrecognized payloads, or multichannel
+        output) are decoded whole and then sliced.
+
+        Args:
+            audio_data: Encoded audio bytes
+            format: Audio format hint, as for load_audio
+            sample_rate: Sample rate of raw PCM input ('pcm_s16le'/'pcm_f32le' only)
+            channels: Interleaved channel count of raw PCM input ('pcm_s16le'/'pcm_f32le' only)
+            block_duration: Seconds of audio per yielded block (the last block may be shorter)
+
+        Yields:
+            float32 blocks at the target sample rate
+        """
+        block_samples = int(block_duration * self.target_sample_rate)
+        try:
+            logger.info(f"Streaming audio: {len(audio_data)} bytes, format: {format}, "
+                        f"{block_duration:.0f}s blocks")
+            pieces = self._stream_pieces(audio_data, format, sample_rate, channels)
+            if pieces is None:
+                audio_array, _ = self.load_audio(audio_data, format=format, sample_rate=sample_rate,
+                                                 channels=channels)
+                for start in range(0, audio_array.shape[-1], block_samples):
+                    yield audio_array[..., start:start + block_samples]
+                return
+
+            source_rate, frames = pieces
+            assembler = BlockAssembler(block_samples, source_rate, self.target_sample_rate)
+            streamed = 0
+            for piece in frames:
+                for block in assembler.write(piece):
+                    streamed += len(block)
+                    check_duration(streamed / self.target_sample_rate)
+                    yield array_traffic.checkpoint('decode', block)
+            for block in assembler.flush():
+                streamed += len(block)
+                check_duration(streamed / self.target_sample_rate)
+                yield array_traffic.checkpoint('decode', block)
+            logger.info(f"Audio streamed successfully: {streamed} samples, {self.target_sample_rate}Hz")
+
+        except (PayloadTooLargeError, AudioProcessingError):
+            raise
+        except Exception as e:
+            logger.error(f"Failed to stream audio: {str(e)}")
+            raise AudioProcessingError(f"Failed to stream audio: {str(e)}")
+
+    def _stream_pieces(self, audio_data: bytes, format: Optional[str], sample_rate: Optional[int],
+                       channels: Optional[int]) -> Optional[Tuple[int, Iterator[np.ndarray]]]:
+        """
+        Pick an incremental decoder for a payload
+
+        Returns:
+            Tuple of (source sample rate, iterator of mono float32 pieces), or
+            None if the payload has to be decoded whole
+        """
+        if self.target_channels != 1:
+            return None
+
+        if format in RAW_PCM_FORMATS:
+            format_sniffer.record_decision(format, 'raw_pcm_stream')
+            sample_rate = sample_rate or self.target_sample_rate
+            channels = channels or self.target_channels
+            dtype = RAW_PCM_FORMATS[format]
+            if len(audio_data) % (dtype.itemsize * channels) != 0:
+                raise AudioProcessingError(
+                    f"{format} payload of {len(audio_data)} bytes is not a whole number of "
+                    f"{channels}-channel frames"
+                )
+            samples = np.frombuffer(audio_data, dtype=dtype).reshape(-1, channels)
+            return sample_rate, self._iter_pcm_frames(samples)
+
+        audio_format = format_sniffer.resolve(audio_data, format)
+        if audio_format == 'wav':
+            info = parse_wav_header(audio_data)
+            dtype = wav_sample_dtype(info) if info is not None else None
+            if dtype is not None and info['channels'] >= 1 and \
+                    info['block_align'] == info['channels'] * dtype.itemsize:
+                format_sniffer.record_decision(audio_format, 'native_wav_stream')
+                frame_count = info['data_size'] // info['block_align']
+                samples = np.frombuffer(audio_data, dtype=dtype, count=frame_count * info['channels'],
+                                        offset=info['data_offset']).reshape(-1, info['channels'])
+                return info['sample_rate'], self._iter_pcm_frames(samples)
+
+        if audio_format in ('wav', 'flac'):
+            format_sniffer.record_decision(audio_format, 'soundfile_stream')
+            sound_file = sf.SoundFile(io.BytesIO(audio_data))
+            return sound_file.samplerate, self._iter_soundfile(sound_file)
+
+        if audio_format in FFMPEG_FORMATS and self.decode_mode == 'pipe' \
+                and audio_format not in SEEKABLE_INPUT_FORMATS:
+            format_sniffer.record_decision(audio_format, 'ffmpeg_stream')
+            return self.target_sample_rate, self._iter_ffmpeg_pipe(audio_data)
+
+        return None
+
+    @staticmethod
+    def _downmix(frames: np.ndarray) -> np.ndarray:
+        """Collapse float32 (frames, channels) to mono"""
+        return frames_to_layout(frames)
+
+    def _iter_pcm_frames(self, samples: np.ndarray) -> Iterator[np.ndarray]:
+        """Scale and downmix a (frames, channels) view over PCM bytes one slice at a time"""
+        for start in range(0, len(samples), STREAM_READ_FRAMES):
+            frames = samples[start:start + STREAM_READ_FRAMES]
+            if samples.dtype.kind == 'u':
+                frames = frames.astype(np.float32)
+                frames -= 128.0
+                frames *= 1.0 / 128.0
+            elif samples.dtype.kind == 'i':
+                frames = frames.astype(np.float32)
+                frames *= 1.0 / float(2 ** (samples.dtype.itemsize * 8 - 1))
+            yield self._downmix(frames.astype(np.float32, copy=False))
+
+    def _iter_soundfile(self, sound_file: sf.SoundFile) -> Iterator[np.ndarray]:
+        """Decode a libsndfile-readable payload block by block"""
+        with sound_file:
+            for frames in sound_file.blocks(blocksize=STREAM_READ_FRAMES, dtype='float32', always_2d=True):
+                yield self._downmix(frames)
+
+    def _iter_ffmpeg_pipe(self, audio_data: bytes) -> Iterator[np.ndarray]:
+        """Read mono float32 PCM from a pooled ffmpeg process as it decodes"""
+        cmd = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin',
+            '-i', 'pipe:0',
+            '-f', 'f32le',
+            '-acodec', 'pcm_f32le',
+            '-ar', str(self.target_sample_rate),
+            '-ac', '1',
+            'pipe:1'
+        ]
+        logger.info(f"Streaming decode via ffmpeg pipe: {' '.join(cmd)}")
+        chunk_size = STREAM_READ_FRAMES * 4
+        for chunk in decoder_pool.stream_command(cmd, audio_data, chunk_size):
+            # Reads end on sample boundaries except possibly at EOF, where ffmpeg writes whole samples
+            yield np.frombuffer(chunk, dtype='<f4', count=len(chunk) // 4)
+
+    def _load_raw_pcm(self, audio_data: bytes, pcm_format: str,
+                      sample_rate: Optional[int] = None, channels: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """
+        Reinterpret raw little-endian PCM bytes as samples without decoding
+
+        pcm_f32le already at the target rate and channel count is returned as a
+        view over the request bytes; pcm_s16le only needs a float32 scale.
+
+        Args:
+            audio_data: Interleaved PCM bytes
+            pcm_format: 'pcm_s16le' or 'pcm_f32le'
+            sample_rate: Declared sample rate (defaults to the target rate)
+            channels: Declared channel count (defaults to the target channels)
+
+        Returns:
+            Tuple of (audio_array, sample_rate)
+        """
+        sample_rate = sample_rate or self.target_sample_rate
+        channels = channels or self.target_channels
+        dtype = RAW_PCM_FORMATS[pcm_format]
+
+        frame_size = dtype.itemsize * channels
+        if len(audio_data) % frame_size != 0:
+            raise AudioProcessingError(
+                f"{pcm_format} payload of {len(audio_data)} bytes is not a whole number of "
+                f"{channels}-channel frames"
+            )
+
+        samples = np.frombuffer(audio_data, dtype=dtype)
+        if dtype.kind == 'i':
+            audio_array = samples.astype(np.float32)
+            audio_array *= 1.0 / 32768.0
+        else:
+            audio_array = samples
+
+        logger.info(f"Loaded raw {pcm_format}: {channels}ch, {sample_rate}Hz")
+        return self._to_target_layout(audio_array.reshape(-1, channels), sample_rate)
+
+    def _select_decoder(self, audio_format: Optional[str]) -> Tuple[str, Callable]:
+        """
+        Pick the cheapest decoder that can handle a format
+
+        Args:
+            audio_format: Sniffed (or claimed) audio format
+
+        Returns:
+            Tuple of (decoder name, decoder callable)
+        """
+        if audio_format == 'wav':
+            return 'native_wav', self._decode_wav
+        if audio_format == 'flac':
+            return 'soundfile', self._decode_with_soundfile
+        if audio_format in FFMPEG_FORMATS:
+            return 'ffmpeg', self._decode_with_ffmpeg
+        return 'fallback_chain', self._decode_with_fallback_chain
+
+    def _decode_wav(self, audio_data: bytes, audio_format: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """Decode WAV natively, using libsndfile for encodings the fast path skips"""
+        fast_result = self._load_wav_fast(audio_data)
+        if fast_result is not None:
+            return fast_result
+        return self._decode_with_soundfile(audio_data, audio_format)
+
+    def _decode_with_soundfile(self, audio_data: bytes, audio_format: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """Decode formats libsndfile handles in-process (FLAC, 24-bit/ADPCM WAV)"""
+        frames, sample_rate = sf.read(io.BytesIO(audio_data), dtype='float32', always_2d=True)
+        return self._to_target_layout(frames, sample_rate)
+
+    def _decode_with_ffmpeg(self, audio_data: bytes, audio_format: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """Decode compressed formats with ffmpeg using the configured decode mode"""
+        # mp4/m4a may keep its index (moov atom) at the end, which ffmpeg can only reach by seeking
+        if self.decode_mode == 'pipe' and audio_format not in SEEKABLE_INPUT_FORMATS:
+            return self._decode_with_ffmpeg_pipe(audio_data)
+        return self._decode_with_ffmpeg_tempfile(audio_data, suffix=f".{audio_format or 'bin'}")
+
+    def _decode_with_fallback_chain(self, audio_data: bytes, audio_format: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """Last resort for payloads the sniffer does not recognize: pydub, then librosa"""
+        try:
+            logger.info(f"Attempting to load audio with pydub, format: {audio_format}")
+
+            # Use pydub to load and convert to wav
+            audio = AudioSegment.from_file(io.BytesIO(audio_data), format=audio_format)
+
+            # Export to wav format in memory
+            wav_buffer = io.BytesIO()
+            audio.export(wav_buffer, format='wav')
+            wav_buffer.seek(0)
+
+            # Load with librosa
+            audio_array, sample_rate = self._load_with_librosa(wav_buffer)
+
+            logger.info("Audio loaded successfully with pydub + librosa")
+            return audio_array, sample_rate
+
+        except Exception as pydub_error:
+            logger.warning(f"Pydub loading failed: {str(pydub_error)}, trying librosa directly")
+
+            # Fallback to direct librosa loading
+            try:
+                audio_array, sample_rate = self._load_with_librosa(io.BytesIO(audio_data))
+                logger.info("Audio loaded successfully with librosa directly")
+                return audio_array, sample_rate
+            except Exception as librosa_error:
+                logger.error(f"Both pydub and librosa loading failed")
+                logger.error(f"Pydub error: {str(pydub_error)}")
+                logger.error(f"Librosa error: {str(librosa_error)}")
+                raise AudioProcessingError(f"Failed to load audio with any method. Pydub: {str(pydub_error)}, Librosa: {str(librosa_error)}")
+
+    def _load_with_librosa(self, source) -> Tuple[np.ndarray, int]:
+        """Load with librosa at the native rate, then convert with the cached polyphase resampler"""
+        audio_array, sample_rate = librosa.load(source, sr=None, mono=(self.target_channels == 1))
+        return resampler.resample(audio_array, sample_rate, self.target_sample_rate), self.target_sample_rate
+
+    def _to_target_layout(self, frames: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, int]:
+        """
+        Downmix and resample decoded frames only where they differ from the target
+
+        Args:
+            frames: float32 samples shaped (frames, channels)
+            sample_rate: Sample rate of the frames
+
+        Returns:
+            Tuple of (audio_array, sample_rate) in the target layout
+        """
+        audio_array = frames_to_layout(frames, self.target_channels)
+
+        if sample_rate != self.target_sample_rate:
+            audio_array = resampler.resample(audio_array, sample_rate, self.target_sample_rate)
+            sample_rate = self.target_sample_rate
+
+        return audio_array, sample_rate
+
+    def _load_wav_fast(self, audio_data: bytes) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Load PCM or float WAV data directly from the RIFF payload
+
+        Samples are viewed in place with np.frombuffer; the only copy made is
+        the int-to-float32 conversion (float32 data is not copied at all).
+        Resampling and downmixing happen only when the file differs from the
+        target layout.
+
+        Args:
+            audio_data: WAV file bytes
+
+        Returns:
+            Tuple of (audio_array, sample_rate), or None if the file needs the
+            general-purpose decoder (compressed or 24-bit WAV, malformed header)
+        """
+        info = parse_wav_header(audio_data)
+        if info is None:
+            return None
+
+        dtype = wav_sample_dtype(info)
+        channels = info['channels']
+        if dtype is None or channels < 1 or info['block_align'] != channels * dtype.itemsize:
+            logger.info(f"WAV fast path unavailable for format tag {info['format_tag']}, "
+                        f"{info['bits_per_sample']}-bit")
+            return None
+
+        frame_count = info['data_size'] // info['block_align']
+        samples = np.frombuffer(audio_data, dtype=dtype, count=frame_count * channels,
+                                offset=info['data_offset'])
+
+        # Scale integer PCM to [-1, 1) in a single float32 pass
+        if dtype.kind == 'u':
+            audio_array = samples.astype(np.float32)
+            audio_array -= 128.0
+            audio_array *= 1.0 / 128.0
+        elif dtype.kind == 'i':
+            audio_array = samples.astype(np.float32)
+            audio_array *= 1.0 / float(2 ** (dtype.itemsize * 8 - 1))
+        else:
+            audio_array = samples.astype(np.float32, copy=False)
+
+        audio_array, sample_rate = self._to_target_layout(audio_array.reshape(-1, channels), info['sample_rate'])
+
+        logger.info(f"Loaded WAV via fast path: {channels}ch, {info['bits_per_sample']}-bit, {info['sample_rate']}Hz")
+        return audio_array, sample_rate
+
+    def _decode_with_ffmpeg_pipe(self, audio_data: bytes, input_format: Optional[str] = None) -> Tuple[np.ndarray, int]:
+        """
+        Decode audio in memory by streaming it through ffmpeg's stdin/stdout
+
+        ffmpeg resamples and downmixes to the target layout and writes raw
+        float32 PCM to stdout, which is wrapped directly as a NumPy array.
+        No temporary files are written and no second decode pass is needed.
+
+        Args:
+            audio_data: Encoded audio bytes
+            input_format: Optional ffmpeg demuxer name; ffmpeg probes the input if omitted
+
+        Returns:
+            Tuple of (audio_array, sample_rate)
+        """
+        cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin']
+        if input_format:
+            cmd += ['-f', input_format]
+        cmd += [
+            '-i', 'pipe:0',
+            '-f', 'f32le',
+            '-acodec', 'pcm_f32le',
+            '-ar', str(self.target_sample_rate),
+            '-ac', str(self.target_channels),
+            'pipe:1'
+        ]
+        logger.info(f"Decoding via ffmpeg pipe: {' '.join(cmd)}")
+
+        # Run on the shared pool so concurrent requests cannot spawn unbounded processes
+        stdout = decoder_pool.run_command(cmd, audio_data)
+
+        # Reinterpret stdout as float32 samples without copying
+        audio_array = np.frombuffer(stdout, dtype='<f4')
+        if self.target_channels > 1:
+            audio_array = np.ascontiguousarray(audio_array.reshape(-1, self.target_channels).T)
+
+        logger.info("ffmpeg pipe decode completed successfully")
+        return audio_array, self.target_sample_rate
+
+    def _decode_with_ffmpeg_tempfile(self, audio_data: bytes, suffix: str = '.webm') -> Tuple[np.ndarray, int]:
+        """
+        Decode audio by converting it to a wav file with ffmpeg on disk
+
+        Used for inputs ffmpeg has to seek in (mp4 with a trailing index), for
+        comparison with the pipe decoder, and where piping is not possible.
+
+        Args:
+            audio_data: Encoded audio bytes
+            suffix: Input file extension, used by ffmpeg as a format hint
+
+        Returns:
+            Tuple of (audio_array, sample_rate)
+        """
+        logger.info(f"Converting {suffix} to wav using ffmpeg...")
+
+        # Create temporary files
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_in:
+            temp_in.write(audio_data)
+            temp_in.flush()
+            temp_in_path = temp_in.name
+
+        temp_out_path = os.path.splitext(temp_in_path)[0] + '.wav'
+
+        try:
+            # Run ffmpeg to convert webm to wav
+            cmd = [
+                'ffmpeg', '-y', '-i', temp_in_path,
+                '-ar', str(self.target_sample_rate),
+                '-ac', str(self.target_channels),
+                temp_out_path
+            ]
+            logger.info(f"Running ffmpeg: {' '.join(cmd)}")
+
+            subprocess.run(
+                cmd,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+            logger.info("ffmpeg conversion completed successfully")
+
+            # Load the wav file with librosa
+            return librosa.load(
+                temp_out_path,
+                sr=self.target_sample_rate,
+                mono=(self.target_channels == 1)
+            )
+
+        except subprocess.CalledProcessError as ffmpeg_error:
+            logger.error(f"ffmpeg conversion failed: {ffmpeg_error}")
+            logger.error(f"ffmpeg stderr: {ffmpeg_error.stderr}")
+            raise AudioProcessingError(f"ffmpeg conversion failed: {ffmpeg_error}")
+        except Exception as e:
+            logger.error(f"Unexpected error during ffmpeg conversion: {str(e)}")
+            raise AudioProcessingError(f"ffmpeg conversion error: {str(e)}")
+        finally:
+            # Clean up temp files
+            try:
+                os.remove(temp_in_path)
+                if os.path.exists(temp_out_path):
+                    os.remove(temp_out_path)
+            except Exception as cleanup_error:
+                logger.warning(f"Failed to cleanup temp files: {cleanup_error}")
+
     def preprocess_audio(self, audio_array: np.ndarray, sample_rate: int) -> np.ndarray:
         """
         Preprocess audio for model input
@@ -160,15 +547,24 @@ class AudioProcessor:
             Preprocessed audio array
         """
         try:
-            # Normalize audio
-            audio_array = librosa.util.normalize(audio_array)
+            source = audio_array
             
-            # Apply noise reduction (optional)
-            # audio_array = self._reduce_noise(audio_array, sample_rate)
+            # Apply noise reduction first; it writes a new buffer that normalization can scale in place
+            if self.noise_reduction:
+                audio_array = self._reduce_noise(audio_array, sample_rate)
             
-            # Trim silence
+            # Peak-normalize (the decoded samples are shared and may be read-only, so never in place on them)
+            peak = max(float(audio_array.max(initial=0.0)), -float(audio_array.min(initial=0.0)))
+            if peak > np.finfo(np.float32).tiny:
+                if audio_array is source:
+                    audio_array = audio_array * np.float32(1.0 / peak)
+                else:
+                    audio_array *= np.float32(1.0 / peak)
+            
+            # Trim silence (returns a view)
             audio_array, _ = librosa.effects.trim(audio_array, top_db=20)
             
+            audio_array = array_traffic.checkpoint('preprocess', audio_array, source=source)
             logger.info(f"Audio preprocessed: {len(audio_array)} samples")
             return audio_array
             
@@ -202,25 +598,29 @@ class AudioProcessor:
             logger.error(f"Failed to convert audio format: {str(e)}")
             raise AudioProcessingError(f"Failed to convert audio format: {str(e)}")
     
-    def split_audio_into_chunks(self, audio_array: np.ndarray, chunk_duration: float = 10.0) -> list:
+    def split_audio_into_chunks(self, audio_array: np.ndarray, chunk_duration: float = 10.0,
+                                overlap_duration: float = 0.0, silence_search: float = 0.0) -> list:
         """
         Split audio into chunks for processing
         
+        With the defaults chunks are cut at fixed boundaries. With
+        silence_search each cut moves back to the quietest point within that
+        many seconds, and with overlap_duration consecutive chunks share
+        audio (see utils/long_form.py).
+        
         Args:
             audio_array: Input audio array
-            chunk_duration: Duration of each chunk in seconds
+            chunk_duration: Longest chunk in seconds
+            overlap_duration: Seconds shared by consecutive chunks
+            silence_search: Seconds before each cut searched for a quiet point
         
         Returns:
             List of audio chunks
         """
         try:
-            samples_per_chunk = int(self.target_sample_rate * chunk_duration)
-            chunks = []
-            
-            for i in range(0, len(audio_array), samples_per_chunk):
-                chunk = audio_array[i:i + samples_per_chunk]
-                if len(chunk) > 0:
-                    chunks.append(chunk)
+            windows = plan_windows(audio_array, self.target_sample_rate, chunk_duration,
+                                   overlap_seconds=overlap_duration, search_seconds=silence_search)
+            chunks = [chunk for _, chunk in windows if len(chunk) > 0]
             
             logger.info(f"Audio split into {len(chunks)} chunks")
             return chunks
@@ -233,36 +633,19 @@ class AudioProcessor:
         """
         Extract audio features for emotion analysis
         
+        The clip is framed and transformed once by the feature engine; MFCC,
+        spectral centroid, RMS and ZCR statistics all come from that single
+        STFT. Pitch is not part of this set; use extract_pitch when needed.
+        
         Args:
             audio_array: Input audio array
             sample_rate: Sample rate
         
         Returns:
-            Dictionary of audio features
+            Dictionary of feature statistics (see FEATURE_STAT_KEYS)
         """
         try:
-            features = {}
-            
-            # MFCC features
-            mfcc = librosa.feature.mfcc(y=audio_array, sr=sample_rate, n_mfcc=13)
-            features['mfcc'] = mfcc
-            
-            # Spectral features
-            spectral_centroids = librosa.feature.spectral_centroid(y=audio_array, sr=sample_rate)[0]
-            features['spectral_centroid'] = spectral_centroids
-            
-            # Pitch features
-            pitches, magnitudes = librosa.piptrack(y=audio_array, sr=sample_rate)
-            features['pitch'] = pitches
-            features['pitch_magnitude'] = magnitudes
-            
-            # Energy features
-            rms = librosa.feature.rms(y=audio_array)[0]
-            features['rms_energy'] = rms
-            
-            # Zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(audio_array)[0]
-            features['zero_crossing_rate'] = zcr
+            features = feature_engine.analyze(audio_array, sample_rate)
             
             logger.info(f"Extracted {len(features)} audio features")
             return features
@@ -271,35 +654,49 @@ class AudioProcessor:
             logger.error(f"Failed to extract audio features: {str(e)}")
             raise AudioProcessingError(f"Failed to extract audio features: {str(e)}")
     
-    def _reduce_noise(self, audio_array: np.ndarray, sample_rate: int) -> np.ndarray:
+    def extract_pitch(self, audio_array: np.ndarray, sample_rate: int) -> dict:
         """
-        Apply noise reduction to audio
+        Extract a compact pitch track and its summary statistics
         
         Args:
             audio_array: Input audio array
             sample_rate: Sample rate
         
         Returns:
-            Noise-reduced audio array
+            Dictionary with the per-frame 'f0' track and f0 statistics
         """
-        # Simple noise reduction using spectral gating
-        # This is a basic implementation - could be enhanced with more sophisticated methods
-        
-        # Compute spectrogram
-        D = librosa.stft(audio_array)
+        try:
+            return feature_engine.pitch(audio_array, sample_rate)
+            
+        except Exception as e:
+            logger.error(f"Failed to extract pitch: {str(e)}")
+            raise AudioProcessingError(f"Failed to extract pitch: {str(e)}")
+    
+    def _reduce_noise(self, audio_array: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        Apply noise reduction to audio
         
-        # Estimate noise from first and last frames
-        noise_spectrum = np.mean(np.abs(D[:, :10]), axis=1, keepdims=True)
+        Streaming spectral gating (see utils/denoise.py): fixed-size blocks
+        with overlap-add and a running noise floor, so working memory does not
+        grow with the clip. The floor is estimated only from frames VAD marks
+        as non-speech, so speech without pauses is not gated against itself.
         
-        # Apply spectral gating
-        gate_threshold = 2.0
-        gain = np.maximum(1 - gate_threshold * noise_spectrum / (np.abs(D) + 1e-8), 0)
-        D_filtered = D * gain
+        Args:
+            audio_array: Input audio array
+            sample_rate: Sample rate
         
-        # Convert back to time domain
-        audio_filtered = librosa.istft(D_filtered)
+        Returns:
+            Noise-reduced audio array
+        """
+        speech_segments = detect_speech_segments(to_mono(audio_array), sample_rate,
+                                                 absolute_floor_db=Config.VAD_ABSOLUTE_FLOOR_DB)
+        if audio_array.ndim > 1:
+            audio_filtered = np.stack([spectral_gate.process(channel, speech_segments) for channel in audio_array])
+        else:
+            audio_filtered = spectral_gate.process(audio_array, speech_segments)
         
-        return audio_filtered
+        return array_traffic.checkpoint('denoise', audio_filtered, source=audio_array)
 
 # Global audio processor instance
-audio_processor = AudioProcessor() 
\ No newline at end of file
+audio_processor = AudioProcessor(decode_mode=Config.AUDIO_DECODE_MODE,
+                                 noise_reduction=Config.NOISE_REDUCTION_ENABLED)
@@ -10,6 +10,9 @@ import numpy as np
 from typing import Tuple, Dict, Any
 from utils.logger import setup_logger
 from utils.error_handlers import AudioProcessingError
+from utils.dtype_policy import array_traffic
+from utils.resampler import resampler
+from utils.audio_layout import to_mono, frames_to_layout
 
 logger = setup_logger(__name__)
 
@@ -21,13 +24,16 @@ class AudioProcessor:
         self.channels = 1
         logger.info("Initializing deployment audio processor")
     
-    def load_audio(self, audio_data: bytes, format: str = 'wav') -> Tuple[np.ndarray, int]:
+    def load_audio(self, audio_data: bytes, format: str = 'wav',
+                   sample_rate: int = None, channels: int = None) -> Tuple[np.ndarray, int]:
         """
         Load audio data and convert to numpy array
         
         Args:
             audio_data: Raw audio data as bytes
-            format: Audio format (wav, webm, mp3, etc.)
+            format: Audio format (wav, webm, mp3, pcm_s16le, pcm_f32le, etc.)
+            sample_rate: Sample rate of raw PCM input
+            channels: Channel count of raw PCM input
         
         Returns:
             Tuple of (audio_array, sample_rate)
@@ -35,6 +41,18 @@ class AudioProcessor:
         try:
             logger.info(f"Loading audio: {len(audio_data)} bytes, format: {format}")
             
+            # Raw PCM needs no decoding, just a reinterpretation of the bytes
+            if format in ('pcm_s16le', 'pcm_f32le'):
+                channels = channels or self.channels
+                samples = np.frombuffer(audio_data, dtype='<i2' if format == 'pcm_s16le' else '<f4')
+                if format == 'pcm_s16le':
+                    samples = samples.astype(np.float32)
+                    samples *= 1.0 / 32768.0
+                # Interleaved frames become the (channels, samples) layout the services expect
+                samples = frames_to_layout(samples.reshape(-1, channels), self.channels)
+                logger.info(f"Loaded raw {format}: {channels}ch, {sample_rate or self.sample_rate}Hz")
+                return array_traffic.checkpoint('decode', samples), sample_rate or self.sample_rate
+            
             # Create temporary file
             with tempfile.NamedTemporaryFile(suffix=f'.{format}', delete=False) as temp_file:
                 temp_file.write(audio_data)
@@ -44,9 +62,10 @@ class AudioProcessor:
                 # Try to load with soundfile first (works for wav, flac)
                 if format in ['wav', 'flac']:
                     import soundfile as sf
-                    audio_array, sample_rate = sf.read(temp_file_path)
-                    logger.info(f"Loaded with soundfile: {sample_rate}Hz, {len(audio_array)} samples")
-                    return audio_array, sample_rate
+                    audio_array, sample_rate = sf.read(temp_file_path, dtype='float32')
+                    audio_array = frames_to_layout(audio_array, self.channels)
+                    logger.info(f"Loaded with soundfile: {sample_rate}Hz, {audio_array.shape[-1]} samples")
+                    return array_traffic.checkpoint('decode', audio_array), sample_rate
                 
                 # For other formats, try pydub
                 else:
@@ -66,19 +85,20 @@ class AudioProcessor:
                     audio = audio.set_channels(1)
                     audio = audio.set_frame_rate(self.sample_rate)
                     
-                    # Convert to numpy array
-                    samples = np.array(audio.get_array_of_samples())
+                    # View the sample buffer and convert to float32 in a single pass
+                    raw_samples = audio.get_array_of_samples()
+                    samples = np.frombuffer(raw_samples, dtype=np.dtype(raw_samples.typecode)).astype(np.float32)
                     
                     # Normalize to float
                     if audio.sample_width == 2:
-                        samples = samples.astype(np.float32) / 32768.0
+                        samples *= 1.0 / 32768.0
                     elif audio.sample_width == 4:
-                        samples = samples.astype(np.float32) / 2147483648.0
+                        samples *= 1.0 / 2147483648.0
                     else:
-                        samples = samples.astype(np.float32) / 128.0
+                        samples *= 1.0 / 128.0
                     
                     logger.info(f"Loaded with pydub: {self.sample_rate}Hz, {len(samples)} samples")
-                    return samples, self.sample_rate
+                    return array_traffic.checkpoint('decode', samples), self.sample_rate
                     
             finally:
                 # Clean up temporary file
@@ -101,18 +121,21 @@ class AudioProcessor:
             Preprocessed audio array
         """
         try:
+            source = audio_array
+            
+            # Ensure mono first so resampling and normalization touch one channel
+            audio_array = to_mono(audio_array)
+            
             # Resample if needed
             if sample_rate != self.sample_rate:
                 audio_array = self._resample_audio(audio_array, sample_rate, self.sample_rate)
             
-            # Normalize audio
-            if np.max(np.abs(audio_array)) > 0:
-                audio_array = audio_array / np.max(np.abs(audio_array))
-            
-            # Ensure mono
-            if len(audio_array.shape) > 1:
-                audio_array = np.mean(audio_array, axis=1)
+            # Normalize audio into one new float32 buffer
+            peak = max(float(audio_array.max(initial=0.0)), -float(audio_array.min(initial=0.0)))
+            if peak > 0:
+                audio_array = audio_array * np.float32(1.0 / peak)
             
+            audio_array = array_traffic.checkpoint('preprocess', audio_array, source=source)
             logger.info(f"Preprocessed audio: {len(audio_array)} samples")
             return audio_array
             
@@ -155,7 +178,7 @@ class AudioProcessor:
     
     def _resample_audio(self, audio_array: np.ndarray, old_rate: int, new_rate: int) -> np.ndarray:
         """
-        Simple resampling (for deployment)
+        Band-limited resampling with the shared polyphase resampler
         
         Args:
             audio_array: Audio data
@@ -168,12 +191,10 @@ class AudioProcessor:
         if old_rate == new_rate:
             return audio_array
         
-        # Simple linear interpolation
-        ratio = new_rate / old_rate
-        new_length = int(len(audio_array) * ratio)
-        indices = np.linspace(0, len(audio_array) - 1, new_length)
+        # Filter banks are cached per rate pair, so only the first call per rate designs one
+        resampled = resampler.resample(audio_array, old_rate, new_rate)
         
-        return np.interp(indices, np.arange(len(audio_array)), audio_array)
+        return array_traffic.checkpoint('resample', resampled, source=audio_array)
 
 # Create global instance
 audio_processor = AudioProcessor() 
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Parallel chunk preparation for ToneBridge Backend
+Decodes, runs VAD on and preprocesses independent audio chunks across a process pool
+"""
+
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional
+from utils.logger import setup_logger
+from utils.vad import detect_speech_segments, concatenate_segments
+from utils.audio_layout import to_mono
+from config import Config
+
+logger = setup_logger(__name__)
+
+def prepare_chunk(audio_data: bytes, audio_format: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Decode one chunk and produce the model input, as transcribe_audio would
+
+    Runs in a pool worker, so failures are returned rather than raised and
+    the chunk's error travels back with its index.
+
+    Args:
+        audio_data: Encoded chunk bytes
+        audio_format: Audio format hint
+
+    Returns:
+        Dictionary with 'audio' (preprocessed samples, None when VAD found no
+        speech), 'sample_rate', 'error' and per-stage 'timings' in seconds
+    """
+    try:
+        from utils.audio_utils import audio_processor
+    except ImportError:
+        from utils.audio_utils_deploy import audio_processor
+
+    timings = {'decode': 0.0, 'preprocess': 0.0}
+    try:
+        started = time.perf_counter()
+        samples, sample_rate = audio_processor.load_audio(audio_data, format=audio_format)
+        timings['decode'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        audio = samples
+        if Config.VAD_ENABLED:
+            segments = detect_speech_segments(to_mono(samples), sample_rate, absolute_floor_db=Config.VAD_ABSOLUTE_FLOOR_DB)
+            audio = concatenate_segments(samples, segments) if segments else None
+        if audio is not None:
+            audio = audio_processor.preprocess_audio(audio, sample_rate)
+        timings['preprocess'] = time.perf_counter() - started
+
+        return {'audio': audio, 'sample_rate': sample_rate, 'error': None, 'timings': timings}
+
+    except Exception as e:
+        return {'audio': None, 'sample_rate': None, 'error': str(e), 'timings': timings}
+
+class ChunkPool:
+    """
+    Process pool that prepares audio chunks in parallel
+
+    Decoding and preprocessing are CPU-bound NumPy/ffmpeg work that would
+    serialize on the GIL in threads, so chunks fan out to worker processes.
+    Workers are started with 'spawn' (a forked copy of a process holding
+    torch thread pools can deadlock) on first use and then kept; a single
+    chunk, or a pool of one worker, is prepared in-process.
+    """
+
+    def __init__(self, workers: int = 4):
+        self.workers = max(1, workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the worker processes on first use"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+                logger.info(f"Started chunk pool with {self.workers} worker processes")
+            return self._executor
+
+    def prepare(self, audio_chunks: List[bytes], audio_format: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Prepare chunks in parallel
+
+        Args:
+            audio_chunks: Encoded chunks
+            audio_format: Audio format hint shared by the chunks
+
+        Returns:
+            prepare_chunk() results in chunk order
+        """
+        if self.workers == 1 or len(audio_chunks) <= 1:
+            return [prepare_chunk(chunk, audio_format) for chunk in audio_chunks]
+
+        executor = self._get_executor()
+        futures = [executor.submit(prepare_chunk, chunk, audio_format) for chunk in audio_chunks]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed for memory); shut the broken pool down and replace it for later calls
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = None
+                        executor.shutdown(wait=False, cancel_futures=True)
+                results.append({'audio': None, 'sample_rate': None, 'error': f"Chunk worker crashed: {e}",
+                                'timings': {'decode': 0.0, 'preprocess': 0.0}})
+        return results
+
+# Global chunk pool instance
+chunk_pool = ChunkPool(workers=Config.CHUNK_POOL_WORKERS)
@@ -0,0 +1,125 @@
+"""
+Request-scoped decoded audio for ToneBridge Backend
+Decodes each payload once and shares the PCM and derived data between services
+"""
+
+import hashlib
+import numpy as np
+from typing import Optional, Dict, Any, List, Tuple
+from flask import g, has_app_context
+from utils.logger import setup_logger
+from utils.vad import detect_speech_segments, concatenate_segments
+from utils.audio_layout import to_mono
+try:
+    from utils.audio_utils import audio_processor
+except ImportError:
+    from utils.audio_utils_deploy import audio_processor
+from config import Config
+
+logger = setup_logger(__name__)
+
+def audio_content_key(audio_data: bytes, audio_format: Optional[str] = None,
+                      sample_rate: Optional[int] = None, channels: Optional[int] = None) -> str:
+    """Hash audio bytes together with the parameters that affect how they decode"""
+    digest = hashlib.blake2b(audio_data, digest_size=16)
+    digest.update(f"|{audio_format}|{sample_rate}|{channels}".encode())
+    return digest.hexdigest()
+
+class DecodedAudio:
+    """
+    Decoded PCM for one audio payload
+
+    Carries the decoded samples and sample rate, plus derived data (the
+    preprocessed signal, emotion features) that is computed on first access
+    and then reused by every consumer holding the same object.
+    """
+
+    def __init__(self, key: str, samples: np.ndarray, sample_rate: int,
+                 audio_data: Optional[bytes] = None, audio_format: Optional[str] = None,
+                 processor=None):
+        self.key = key
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.audio_data = audio_data
+        self.audio_format = audio_format
+        self._processor = processor or audio_processor
+        self._derived: Dict[str, Any] = {}
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds"""
+        return self.samples.shape[-1] / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def preprocessed(self) -> np.ndarray:
+        """Normalized and trimmed samples, as fed to the models"""
+        if 'preprocessed' not in self._derived:
+            self._derived['preprocessed'] = self._processor.preprocess_audio(self.samples, self.sample_rate)
+        return self._derived['preprocessed']
+
+    @property
+    def speech_segments(self) -> List[Tuple[int, int]]:
+        """Speech regions (sample ranges) found by voice activity detection"""
+        if 'speech_segments' not in self._derived:
+            self._derived['speech_segments'] = detect_speech_segments(
+                to_mono(self.samples), self.sample_rate, absolute_floor_db=Config.VAD_ABSOLUTE_FLOOR_DB
+            )
+        return self._derived['speech_segments']
+
+    @property
+    def speech_preprocessed(self) -> np.ndarray:
+        """Preprocessed samples restricted to the speech regions"""
+        if 'speech_preprocessed' not in self._derived:
+            speech = concatenate_segments(self.samples, self.speech_segments)
+            self._derived['speech_preprocessed'] = self._processor.preprocess_audio(speech, self.sample_rate)
+        return self._derived['speech_preprocessed']
+
+    @property
+    def features(self) -> Dict[str, Any]:
+        """Audio features for emotion analysis, extracted from the preprocessed samples"""
+        if 'features' not in self._derived:
+            self._derived['features'] = self._processor.extract_audio_features(self.preprocessed, self.sample_rate)
+        return self._derived['features']
+
+    @property
+    def pitch(self) -> Dict[str, Any]:
+        """Per-frame f0 track and pitch statistics, computed only when asked for"""
+        if 'pitch' not in self._derived:
+            self._derived['pitch'] = self._processor.extract_pitch(self.preprocessed, self.sample_rate)
+        return self._derived['pitch']
+
+def decode_audio(audio_data: bytes, audio_format: Optional[str] = None,
+                 sample_rate: Optional[int] = None, channels: Optional[int] = None) -> DecodedAudio:
+    """
+    Decode audio bytes, reusing an earlier decode of the same bytes in this request
+
+    Inside a Flask request the decoded object is cached on ``flask.g`` keyed by
+    content hash, so every service that handles the payload shares one decode.
+    Nothing outlives the request.
+
+    Args:
+        audio_data: Encoded audio bytes
+        audio_format: Audio format hint
+        sample_rate: Declared sample rate for raw PCM
+        channels: Declared channel count for raw PCM
+
+    Returns:
+        DecodedAudio for the payload
+    """
+    key = audio_content_key(audio_data, audio_format, sample_rate, channels)
+
+    cache = None
+    if has_app_context():
+        cache = g.setdefault('decoded_audio', {})
+        if key in cache:
+            logger.info("Reusing decoded audio from this request")
+            return cache[key]
+
+    samples, decoded_rate = audio_processor.load_audio(
+        audio_data, format=audio_format, sample_rate=sample_rate, channels=channels
+    )
+    decoded = DecodedAudio(key, samples, decoded_rate, audio_data=audio_data, audio_format=audio_format)
+
+    if cache is not None:
+        cache[key] = decoded
+    return decoded
@@ -0,0 +1,334 @@
+"""
+Bounded decoder pool for ToneBridge Backend
+Caps concurrent ffmpeg decodes, queues the overflow and enforces per-decode timeouts
+"""
+
+import time
+import queue
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional
+from utils.logger import setup_logger
+from utils.error_handlers import AudioProcessingError
+from config import Config
+
+logger = setup_logger(__name__)
+
+# Marks the end of a streaming decode's output
+_END = object()
+
+class DecoderPool:
+    """
+    Shared pool of long-lived decoder workers
+
+    Each worker thread drives one ffmpeg process at a time, so at most ``size``
+    decoders run concurrently no matter how many requests arrive. Up to
+    ``queue_size`` further decodes wait for a free worker; beyond that new
+    decodes are rejected immediately instead of piling up processes.
+    """
+
+    def __init__(self, size: int = 4, queue_size: int = 16, timeout: float = 30.0,
+                 stream_buffer_bytes: int = 8 * 1024 * 1024):
+        self.size = max(1, size)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.stream_buffer_bytes = stream_buffer_bytes
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='decoder')
+        self._lock = threading.Lock()
+        # One slot per running decoder, shared by pooled and streaming decodes
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._stats = {
+            'active': 0,
+            'queued': 0,
+            'peak_active': 0,
+            'peak_queued': 0,
+            'completed': 0,
+            'failed': 0,
+            'timeouts': 0,
+            'rejected': 0,
+            'streams': 0,
+            'total_queue_wait': 0.0,
+            'total_decode_time': 0.0
+        }
+
+    def run_command(self, cmd: List[str], input_data: bytes) -> bytes:
+        """
+        Run a decoder command on a pooled worker
+
+        Args:
+            cmd: Command line to execute (reads stdin, writes stdout)
+            input_data: Bytes fed to the process's stdin
+
+        Returns:
+            Everything the process wrote to stdout
+        """
+        self._admit()
+        submitted_at = time.monotonic()
+        deadline = submitted_at + self.timeout
+        future = self._executor.submit(self._execute, cmd, input_data, submitted_at, deadline)
+        return future.result()
+
+    def stream_command(self, cmd: List[str], input_data: bytes, chunk_size: int) -> Iterator[bytes]:
+        """
+        Run a decoder command and yield its output as it is produced
+
+        A reader thread decodes ahead of the caller into a buffer of at most
+        stream_buffer_bytes, so a short recording decodes to the end and
+        frees its slot while the caller is still transcribing. The slot is
+        only held while ffmpeg can run: when the buffer is full the reader
+        gives the slot up, ffmpeg blocks on its stdout pipe, and the slot is
+        taken again once the caller catches up. The caller's time between
+        chunks therefore never holds a slot. ffmpeg is killed if it produces
+        no output for ``timeout`` seconds while it is being read. Closing the
+        generator early kills the process.
+
+        Args:
+            cmd: Command line to execute (reads stdin, writes stdout)
+            input_data: Bytes fed to the process's stdin
+            chunk_size: Bytes per yielded chunk (the last chunk may be shorter)
+
+        Yields:
+            Successive chunks of the process's stdout
+        """
+        self._admit()
+        submitted_at = time.monotonic()
+        started_at = self._acquire_slot(submitted_at, submitted_at + self.timeout)
+        self._record('streams')
+
+        try:
+            process = self._spawn(cmd)
+        except BaseException:
+            self._release_slot(started_at)
+            raise
+
+        buffered: queue.Queue = queue.Queue(maxsize=max(1, self.stream_buffer_bytes // max(1, chunk_size)))
+        stop = threading.Event()
+        outcome: Dict[str, Any] = {'error': None}
+        stderr_chunks: List[bytes] = []
+        helpers = [
+            threading.Thread(target=self._feed, args=(process, input_data), daemon=True),
+            threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+        ]
+
+        def offer(item) -> bool:
+            """Buffer an item, giving up if the caller has gone away"""
+            while not stop.is_set():
+                try:
+                    buffered.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read_ahead():
+            """Drain ffmpeg into the buffer, holding the slot only while ffmpeg can make progress"""
+            slot_start = started_at
+            try:
+                while True:
+                    idle_timer = threading.Timer(self.timeout, self._kill_idle, args=(process, outcome))
+                    idle_timer.start()
+                    try:
+                        chunk = process.stdout.read(chunk_size)
+                    finally:
+                        idle_timer.cancel()
+                    if not chunk:
+                        break
+                    if buffered.full():
+                        # The caller is busy: let other decodes run while ffmpeg waits on its pipe
+                        self._release_slot(slot_start)
+                        slot_start = None
+                        if not offer(chunk):
+                            return
+                        slot_start = self._reacquire_slot(stop)
+                        if slot_start is None:
+                            return
+                    elif not offer(chunk):
+                        return
+                process.wait()
+                for helper in helpers:
+                    helper.join()
+                if outcome['error'] is None and process.returncode != 0:
+                    message = b''.join(stderr_chunks).decode('utf-8', errors='replace').strip()
+                    logger.error(f"Streaming decoder exited with code {process.returncode}: {message}")
+                    outcome['error'] = AudioProcessingError(f"Audio decode failed: {message or process.returncode}")
+            except Exception as e:
+                outcome['error'] = e
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                if slot_start is not None:
+                    self._release_slot(slot_start)
+                offer(_END)
+
+        for helper in helpers:
+            helper.start()
+        reader = threading.Thread(target=read_ahead, name='decoder-stream', daemon=True)
+        reader.start()
+
+        finished = False
+        try:
+            while True:
+                chunk = buffered.get()
+                if chunk is _END:
+                    break
+                yield chunk
+            finished = True
+        finally:
+            stop.set()
+            if not finished and process.poll() is None:
+                process.kill()
+            reader.join()
+            process.stdout.close()
+
+        if outcome['error'] is not None:
+            self._record('timeouts' if outcome.get('timed_out') else 'failed')
+            raise outcome['error']
+        self._record('completed')
+
+    def _kill_idle(self, process: subprocess.Popen, outcome: Dict[str, Any]):
+        """Kill a streaming decoder that produced no output within the timeout"""
+        if process.poll() is None:
+            process.kill()
+            outcome['timed_out'] = True
+            outcome['error'] = AudioProcessingError(f"Audio decode stalled for {self.timeout}s and was killed")
+            logger.error(f"Streaming decoder produced no output for {self.timeout}s and was killed")
+
+    def _reacquire_slot(self, stop: threading.Event) -> Optional[float]:
+        """Take a slot back for a paused streaming decode; None if the caller went away first"""
+        while not stop.is_set():
+            if self._slots.acquire(timeout=0.1):
+                with self._lock:
+                    self._stats['active'] += 1
+                    self._stats['peak_active'] = max(self._stats['peak_active'], self._stats['active'])
+                return time.monotonic()
+        return None
+
+    def _admit(self):
+        """Reject the decode outright when every slot and queue place is taken"""
+        with self._lock:
+            if self._stats['active'] + self._stats['queued'] >= self.size + self.queue_size:
+                self._stats['rejected'] += 1
+                raise AudioProcessingError("Audio decoder is at capacity, please retry shortly")
+            self._stats['queued'] += 1
+            self._stats['peak_queued'] = max(self._stats['peak_queued'], self._stats['queued'])
+
+    def _acquire_slot(self, submitted_at: float, deadline: float) -> float:
+        """Wait for a free decoder slot until the deadline and return the start time"""
+        acquired = self._slots.acquire(timeout=max(0.0, deadline - time.monotonic()))
+        started_at = time.monotonic()
+        with self._lock:
+            self._stats['queued'] -= 1
+            if not acquired:
+                self._stats['timeouts'] += 1
+            else:
+                self._stats['active'] += 1
+                self._stats['peak_active'] = max(self._stats['peak_active'], self._stats['active'])
+                self._stats['total_queue_wait'] += started_at - submitted_at
+        if not acquired:
+            raise AudioProcessingError("Audio decode timed out while waiting for a decoder")
+        return started_at
+
+    def _release_slot(self, started_at: float):
+        """Free a decoder slot and account for the time it was held"""
+        with self._lock:
+            self._stats['active'] -= 1
+            self._stats['total_decode_time'] += time.monotonic() - started_at
+        self._slots.release()
+
+    def _spawn(self, cmd: List[str]) -> subprocess.Popen:
+        """Start a decoder process with all three standard streams piped"""
+        try:
+            return subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except FileNotFoundError:
+            self._record('failed')
+            raise AudioProcessingError(f"{cmd[0]} is not installed or not on PATH")
+
+    @staticmethod
+    def _feed(process: subprocess.Popen, input_data: bytes):
+        """Write the whole input to the decoder's stdin, then close it"""
+        try:
+            process.stdin.write(input_data)
+        except (BrokenPipeError, ValueError):
+            # The decoder exited or was killed before reading everything
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    def _execute(self, cmd: List[str], input_data: bytes, submitted_at: float, deadline: float) -> bytes:
+        """Worker body: spawn the decoder and wait for it within the deadline"""
+        started_at = self._acquire_slot(submitted_at, deadline)
+
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._record('timeouts')
+                raise AudioProcessingError("Audio decode timed out while waiting for a decoder")
+
+            process = self._spawn(cmd)
+
+            try:
+                stdout, stderr = process.communicate(input=input_data, timeout=remaining)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                self._record('timeouts')
+                logger.error(f"Decoder exceeded {self.timeout}s timeout and was killed")
+                raise AudioProcessingError(f"Audio decode timed out after {self.timeout}s")
+
+            if process.returncode != 0:
+                self._record('failed')
+                message = stderr.decode('utf-8', errors='replace').strip()
+                logger.error(f"Decoder exited with code {process.returncode}: {message}")
+                raise AudioProcessingError(f"Audio decode failed: {message or process.returncode}")
+
+            self._record('completed')
+            return stdout
+
+        finally:
+            self._release_slot(started_at)
+
+    def _record(self, counter: str):
+        """Increment an outcome counter"""
+        with self._lock:
+            self._stats[counter] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool saturation statistics
+
+        Returns:
+            Dictionary with current load, peaks and outcome counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+
+        finished = stats['completed'] + stats['failed'] + stats['timeouts']
+        total_queue_wait = stats.pop('total_queue_wait')
+        total_decode_time = stats.pop('total_decode_time')
+        stats.update({
+            'size': self.size,
+            'queue_size': self.queue_size,
+            'timeout': self.timeout,
+            'saturation': stats['active'] / self.size,
+            'avg_queue_wait_ms': (total_queue_wait / finished * 1000) if finished else 0.0,
+            'avg_decode_ms': (total_decode_time / finished * 1000) if finished else 0.0
+        })
+        return stats
+
+# Global decoder pool shared by all services
+decoder_pool = DecoderPool(
+    size=Config.DECODER_POOL_SIZE,
+    queue_size=Config.DECODER_QUEUE_SIZE,
+    timeout=Config.DECODER_TIMEOUT,
+    stream_buffer_bytes=Config.DECODER_STREAM_BUFFER_MB * 1024 * 1024
+)
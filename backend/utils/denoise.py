@@ -0,0 +1,237 @@
+"""
+Streaming noise reduction for ToneBridge Backend
+Block-wise spectral gating with overlap-add and a running noise-floor estimate
+"""
+
+import numpy as np
+from typing import Optional, List, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.logger import setup_logger
+
+try:
+    # scipy.fft keeps float32 input in single precision and caches its FFT plans
+    from scipy import fft as _fft
+except ImportError:
+    from numpy import fft as _fft
+
+logger = setup_logger(__name__)
+
+class SpectralGateDenoiser:
+    """
+    Spectral-gating denoiser configuration and shared analysis windows
+
+    Audio is cut into frames of n_fft samples every hop_length samples,
+    weighted by a square-root Hann window on both analysis and synthesis
+    (so overlap-add reconstructs the input exactly when the gain is 1), and
+    gated bin by bin against a noise floor. The floor is the noise_quantile
+    of each bin's magnitude over the non-speech frames of a block, and it is
+    carried across blocks. It drops to a quieter block at once and rises
+    towards a louder one by noise_rise per block, so the estimate follows
+    slowly changing background noise instead of the first few frames only.
+
+    Frames that overlap VAD speech regions never feed the floor: on speech
+    without pauses a low quantile of every frame is still speech, and gating
+    against it would cut speech energy. Until a non-speech frame has been
+    seen there is no floor and audio passes through ungated.
+    """
+
+    def __init__(self, n_fft: int = 512, hop_length: int = 256, block_frames: int = 64,
+                 gate_threshold: float = 2.0, min_gain: float = 0.1,
+                 noise_quantile: float = 0.2, noise_rise: float = 0.05):
+        if n_fft % hop_length != 0:
+            raise ValueError("n_fft must be a multiple of hop_length")
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.block_frames = block_frames
+        self.gate_threshold = gate_threshold
+        self.min_gain = min_gain
+        self.noise_quantile = noise_quantile
+        self.noise_rise = noise_rise
+
+        hann = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)
+        overlap_sum = (hann.reshape(-1, hop_length)).sum(axis=0)
+        # Normalized so squared windows sum to exactly one across overlapping frames
+        self.window = np.sqrt(hann / overlap_sum[0]).astype(np.float32)
+
+    def stream(self) -> 'DenoiseStream':
+        """Start a new stream with its own noise estimate and buffers"""
+        return DenoiseStream(self)
+
+    def process(self, audio_array: np.ndarray,
+                speech_segments: Optional[List[Tuple[int, int]]] = None) -> np.ndarray:
+        """
+        Denoise a whole clip block by block
+
+        Working memory is a fixed set of per-block buffers, whatever the clip
+        length; only the output array grows with the input.
+
+        Args:
+            audio_array: Mono audio samples
+            speech_segments: VAD speech regions (sample ranges) kept out of the
+                noise floor; None treats every frame as a floor candidate
+
+        Returns:
+            Denoised float32 samples, the same length as the input
+        """
+        output = np.empty(len(audio_array), dtype=np.float32)
+        stream = self.stream()
+        chunk = self.block_frames * self.hop_length
+
+        speech = None
+        if speech_segments is not None:
+            speech = np.zeros(len(audio_array), dtype=bool)
+            for start, end in speech_segments:
+                speech[start:end] = True
+
+        written = 0
+        for start in range(0, len(audio_array), chunk):
+            block = stream.write(audio_array[start:start + chunk],
+                                 None if speech is None else speech[start:start + chunk])
+            output[written:written + len(block)] = block
+            written += len(block)
+        block = stream.flush()
+        output[written:written + len(block)] = block
+
+        return output
+
+class DenoiseStream:
+    """
+    Incremental spectral gating over a stream of sample blocks
+
+    write() accepts any number of samples and returns the denoised samples
+    that are complete so far; output trails input by n_fft - hop_length
+    samples until flush() drains the tail. The input buffer, frame matrix and
+    overlap-add accumulator are allocated once per stream.
+    """
+
+    def __init__(self, denoiser: SpectralGateDenoiser):
+        self._denoiser = denoiser
+        n_fft, hop = denoiser.n_fft, denoiser.hop_length
+        self._overlap = n_fft - hop
+        self._ratio = n_fft // hop
+
+        # Primed with zeros so the first samples are covered by as many frames as the rest
+        self._buffer = np.zeros(self._overlap + denoiser.block_frames * hop, dtype=np.float32)
+        # Per-sample VAD speech flags alongside the buffer; the priming zeros are not noise
+        self._speech = np.zeros(len(self._buffer), dtype=bool)
+        self._speech[:self._overlap] = True
+        self._filled = self._overlap
+        self._frames = np.empty((denoiser.block_frames, n_fft), dtype=np.float32)
+        self._accumulator = np.zeros((denoiser.block_frames + self._ratio - 1, hop), dtype=np.float32)
+        self._ola_tail = np.zeros(self._overlap, dtype=np.float32)
+        self._noise: Optional[np.ndarray] = None
+
+        self._pending_delay = self._overlap
+        self._received = 0
+        self._emitted = 0
+
+    def write(self, samples: np.ndarray, speech: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Feed samples into the stream
+
+        Args:
+            samples: Next mono samples
+            speech: Per-sample VAD speech flags for samples; None marks them all as floor candidates
+
+        Returns:
+            Denoised samples completed by this write (possibly empty)
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        self._received += len(samples)
+
+        outputs = []
+        position = 0
+        while position < len(samples):
+            take = min(len(samples) - position, len(self._buffer) - self._filled)
+            self._buffer[self._filled:self._filled + take] = samples[position:position + take]
+            self._speech[self._filled:self._filled + take] = False if speech is None else speech[position:position + take]
+            self._filled += take
+            position += take
+            if self._filled == len(self._buffer):
+                outputs.append(self._process_buffer(update_noise=True))
+
+        return self._emit(outputs)
+
+    def flush(self) -> np.ndarray:
+        """Drain the samples still held back for overlap-add"""
+        n_fft = self._denoiser.n_fft
+        outputs = []
+        # Trailing zeros complete every frame that touches a real sample
+        padding = n_fft
+        while padding > 0:
+            take = min(padding, len(self._buffer) - self._filled)
+            self._buffer[self._filled:self._filled + take] = 0.0
+            self._speech[self._filled:self._filled + take] = True
+            self._filled += take
+            padding -= take
+            if self._filled == len(self._buffer) or padding == 0:
+                # Padding-only frames would drag the floor down; keep the estimate from real audio
+                outputs.append(self._process_buffer(update_noise=self._noise is None))
+
+        output = self._emit(outputs)
+        remaining = self._received - self._emitted + len(output)
+        return output[:max(0, remaining)]
+
+    def _process_buffer(self, update_noise: bool) -> np.ndarray:
+        """Gate every whole frame in the buffer and return the completed samples"""
+        denoiser = self._denoiser
+        n_fft, hop = denoiser.n_fft, denoiser.hop_length
+        if self._filled < n_fft:
+            return np.zeros(0, dtype=np.float32)
+
+        n_frames = (self._filled - n_fft) // hop + 1
+        view = sliding_window_view(self._buffer[:self._filled], n_fft)[::hop][:n_frames]
+        frames = self._frames[:n_frames]
+        np.multiply(view, denoiser.window, out=frames)
+
+        spectrum = _fft.rfft(frames, axis=1)
+        magnitude = np.abs(spectrum)
+
+        if update_noise:
+            in_speech = sliding_window_view(self._speech[:self._filled], n_fft)[::hop][:n_frames].any(axis=1)
+            if not in_speech.all():
+                block_floor = np.quantile(magnitude[~in_speech], denoiser.noise_quantile, axis=0)
+                if self._noise is None:
+                    self._noise = block_floor
+                else:
+                    rising = self._noise + denoiser.noise_rise * (block_floor - self._noise)
+                    self._noise = np.where(block_floor < self._noise, block_floor, rising)
+
+        if self._noise is not None:
+            gain = 1.0 - denoiser.gate_threshold * self._noise / (magnitude + 1e-8)
+            np.maximum(gain, denoiser.min_gain, out=gain)
+            spectrum *= gain
+        gated = _fft.irfft(spectrum, n=n_fft, axis=1)
+        gated *= denoiser.window
+
+        # Overlap-add: segment r of frame i lands in hop slot i + r
+        accumulator = self._accumulator[:n_frames + self._ratio - 1]
+        accumulator.fill(0.0)
+        accumulator[:self._ratio - 1] = self._ola_tail.reshape(-1, hop)
+        for r in range(self._ratio):
+            accumulator[r:r + n_frames] += gated[:, r * hop:(r + 1) * hop]
+
+        completed = accumulator[:n_frames].ravel().copy()
+        self._ola_tail[:] = accumulator[n_frames:].ravel()
+
+        consumed = n_frames * hop
+        remaining = self._filled - consumed
+        self._buffer[:remaining] = self._buffer[consumed:self._filled]
+        self._speech[:remaining] = self._speech[consumed:self._filled]
+        self._filled = remaining
+        return completed
+
+    def _emit(self, outputs: list) -> np.ndarray:
+        """Join completed blocks and drop the priming delay"""
+        if not outputs:
+            return np.zeros(0, dtype=np.float32)
+        output = outputs[0] if len(outputs) == 1 else np.concatenate(outputs)
+        if self._pending_delay:
+            dropped = min(self._pending_delay, len(output))
+            output = output[dropped:]
+            self._pending_delay -= dropped
+        self._emitted += len(output)
+        return output
+
+# Global denoiser instance
+spectral_gate = SpectralGateDenoiser()
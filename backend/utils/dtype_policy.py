@@ -0,0 +1,106 @@
+"""
+Audio array dtype policy for ToneBridge Backend
+Samples stay float32 and C-contiguous from decode to model input; each stage's memory traffic is counted
+"""
+
+import threading
+import numpy as np
+from collections import Counter
+from typing import Optional, Dict, Any
+from utils.logger import setup_logger
+from config import Config
+
+logger = setup_logger(__name__)
+
+# The one sample representation used between pipeline stages
+AUDIO_DTYPE = np.dtype(np.float32)
+
+MB = 1024 * 1024
+
+def _allocated_by_stage(array: np.ndarray, source: Optional[np.ndarray]) -> bool:
+    """Tell whether a stage produced a fresh buffer rather than a view"""
+    if source is not None:
+        return not np.may_share_memory(array, source)
+    # Without a source, a view over foreign memory (request bytes, ffmpeg stdout) is not an allocation
+    root = array
+    while isinstance(root, np.ndarray) and root.base is not None:
+        root = root.base
+    return isinstance(root, np.ndarray)
+
+class ArrayTrafficMonitor:
+    """
+    Enforces the float32 policy and counts allocations and copies per stage
+
+    Each pipeline stage passes its output through checkpoint(). Arrays that
+    already follow the policy are returned untouched; anything else is
+    converted once and counted as a copy, with the offending dtype recorded,
+    so a stage that starts producing float64 or strided output shows up in
+    the metrics instead of silently doubling memory traffic downstream.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def checkpoint(self, stage: str, array: np.ndarray, source: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Bring a stage's output to float32 C-contiguous layout and record its traffic
+
+        Args:
+            stage: Pipeline stage name (decode, preprocess, denoise, resample, model_input, ...)
+            array: Array produced by the stage
+            source: Array the stage consumed, used to tell views from new buffers
+
+        Returns:
+            The array itself if it already conforms, otherwise a conforming copy
+        """
+        result = np.ascontiguousarray(array, dtype=AUDIO_DTYPE)
+        if not self.enabled:
+            return result
+
+        copied = result is not array
+        allocated = _allocated_by_stage(array, source)
+
+        with self._lock:
+            stats = self._stages.setdefault(stage, {
+                'calls': 0, 'allocations': 0, 'allocated_bytes': 0,
+                'copies': 0, 'copied_bytes': 0, 'nonconforming': Counter()
+            })
+            stats['calls'] += 1
+            if allocated:
+                stats['allocations'] += 1
+                stats['allocated_bytes'] += array.nbytes
+            if copied:
+                stats['copies'] += 1
+                stats['copied_bytes'] += result.nbytes
+                reason = str(array.dtype) if array.dtype != AUDIO_DTYPE else 'non_contiguous'
+                stats['nonconforming'][reason] += 1
+
+        if copied:
+            logger.warning(f"Stage '{stage}' produced {array.dtype} "
+                           f"({'contiguous' if array.flags.c_contiguous else 'strided'}); copied to float32")
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-stage allocation and copy counts"""
+        with self._lock:
+            return {
+                stage: {
+                    'calls': stats['calls'],
+                    'allocations': stats['allocations'],
+                    'allocated_mb': round(stats['allocated_bytes'] / MB, 2),
+                    'copies': stats['copies'],
+                    'copied_mb': round(stats['copied_bytes'] / MB, 2),
+                    'nonconforming': dict(stats['nonconforming'])
+                }
+                for stage, stats in self._stages.items()
+            }
+
+    def reset(self):
+        """Clear all counters"""
+        with self._lock:
+            self._stages.clear()
+
+# Global array traffic monitor instance
+array_traffic = ArrayTrafficMonitor(enabled=Config.ARRAY_TRAFFIC_ENABLED)
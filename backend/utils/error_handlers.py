@@ -27,6 +27,16 @@ class ModelError(ToneBridgeError):
     def __init__(self, message: str = "Model processing failed"):
         super().__init__(message, status_code=500, error_code="MODEL_ERROR")
 
+class ModelNotReadyError(ToneBridgeError):
+    """Raised when a request needs a model that is still loading"""
+    def __init__(self, message: str = "Model is still loading"):
+        super().__init__(message, status_code=503, error_code="MODEL_NOT_READY")
+
+class PayloadTooLargeError(ToneBridgeError):
+    """Raised when uploaded audio exceeds the size or duration limits"""
+    def __init__(self, message: str = "Audio payload too large"):
+        super().__init__(message, status_code=413, error_code="PAYLOAD_TOO_LARGE")
+
 class ValidationError(ToneBridgeError):
     """Raised when input validation fails"""
     def __init__(self, message: str = "Validation failed"):
@@ -121,13 +131,7 @@ def validate_audio_file(file) -> bool:
     if file.filename == '':
         raise ValidationError("No file selected")
     
-    # Check file size (16MB limit)
-    file.seek(0, 2)  # Seek to end
-    file_size = file.tell()
-    file.seek(0)  # Reset to beginning
-    
-    if file_size > 16 * 1024 * 1024:  # 16MB
-        raise ValidationError("File size exceeds 16MB limit")
+    # File size is enforced while the upload is read (see utils.audio_intake)
     
     # Check file extension
     allowed_extensions = {'wav', 'mp3', 'm4a', 'flac'}
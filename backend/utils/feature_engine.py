@@ -0,0 +1,203 @@
+"""
+Audio feature engine for ToneBridge Backend
+Frames the signal and computes one STFT, then derives every emotion feature from it
+"""
+
+import threading
+import numpy as np
+import scipy.fft
+import librosa
+from typing import Dict, Any
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Feature statistics consumed by EmotionService._analyze_audio_features
+FEATURE_STAT_KEYS = (
+    'mfcc_mean', 'mfcc_std',
+    'spectral_centroid_mean', 'spectral_centroid_std',
+    'energy_mean', 'energy_std',
+    'zcr_mean'
+)
+
+class FeatureEngine:
+    """
+    Single-pass extractor for the emotion feature statistics
+
+    librosa's mfcc, spectral_centroid, rms and zero_crossing_rate each frame
+    the clip (and the spectral ones each run a full STFT) on their own. This
+    engine frames the padded signal once as a strided view, runs the FFT block
+    by block in float32, and feeds each block's frames and magnitudes to every
+    feature. Only per-frame rows (13 MFCCs, centroid, RMS, ZCR) are kept, and
+    only their summary statistics are returned. Parameters and results match
+    the librosa defaults the service used before (n_fft=2048, hop=512, Hann
+    window, constant padding, 128 Slaney mel bands, orthonormal DCT-II).
+    """
+
+    def __init__(self, n_fft: int = 2048, hop_length: int = 512, n_mels: int = 128,
+                 n_mfcc: int = 13, block_frames: int = 256, top_db: float = 80.0):
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.n_mfcc = n_mfcc
+        self.block_frames = block_frames
+        self.top_db = top_db
+
+        self._window = librosa.filters.get_window('hann', n_fft, fftbins=True).astype(np.float32)
+        self._dct = scipy.fft.dct(np.eye(n_mels, dtype=np.float32), type=2, norm='ortho', axis=0)[:n_mfcc]
+        self._mel_bases: Dict[int, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _mel_basis(self, sample_rate: int) -> np.ndarray:
+        """Get the mel filter bank for a sample rate, building it on first use"""
+        with self._lock:
+            basis = self._mel_bases.get(sample_rate)
+            if basis is None:
+                basis = librosa.filters.mel(sr=sample_rate, n_fft=self.n_fft, n_mels=self.n_mels, dtype=np.float32)
+                self._mel_bases[sample_rate] = basis
+            return basis
+
+    def frame(self, audio_array: np.ndarray) -> np.ndarray:
+        """
+        Frame a signal the way librosa does with center=True
+
+        Args:
+            audio_array: Mono audio samples
+
+        Returns:
+            (n_fft, n_frames) float32 read-only view over the zero-padded signal
+        """
+        audio_array = np.ascontiguousarray(audio_array, dtype=np.float32)
+        pad = self.n_fft // 2
+        padded = np.pad(audio_array, pad, mode='constant')
+        if len(padded) < self.n_fft:
+            padded = np.pad(padded, (0, self.n_fft - len(padded)), mode='constant')
+        return librosa.util.frame(padded, frame_length=self.n_fft, hop_length=self.hop_length)
+
+    def analyze(self, audio_array: np.ndarray, sample_rate: int) -> Dict[str, float]:
+        """
+        Compute the emotion feature statistics of a clip
+
+        Args:
+            audio_array: Mono audio samples
+            sample_rate: Sample rate
+
+        Returns:
+            Statistics keyed by FEATURE_STAT_KEYS
+        """
+        frames = self.frame(audio_array)
+        n_frames = frames.shape[1]
+        n_bins = 1 + self.n_fft // 2
+
+        mel_basis = self._mel_basis(sample_rate)
+        freqs = np.linspace(0, sample_rate / 2, n_bins, dtype=np.float32)
+
+        mel_power = np.empty((self.n_mels, n_frames), dtype=np.float32)
+        centroid = np.empty(n_frames, dtype=np.float32)
+        rms = np.empty(n_frames, dtype=np.float32)
+        zcr = np.empty(n_frames, dtype=np.float32)
+
+        for start in range(0, n_frames, self.block_frames):
+            block = slice(start, min(start + self.block_frames, n_frames))
+            raw = frames[:, block]
+
+            # Time-domain features straight from the unwindowed frames
+            rms[block] = np.sqrt(np.einsum('ij,ij->j', raw, raw) / self.n_fft)
+            signs = np.signbit(np.where(np.abs(raw) <= 1e-10, 0.0, raw))
+            zcr[block] = np.count_nonzero(signs[1:] != signs[:-1], axis=0) / self.n_fft
+
+            # Spectral features from one float32 FFT of the windowed frames
+            mag = np.abs(scipy.fft.rfft(raw * self._window[:, None], axis=0))
+
+            total = mag.sum(axis=0)
+            centroid[block] = np.divide(freqs @ mag, total, out=np.zeros_like(total),
+                                        where=total > np.finfo(np.float32).tiny)
+            np.square(mag, out=mag)
+            mel_power[:, block] = mel_basis @ mag
+
+        # power_to_db with ref=1.0, amin=1e-10 and a top_db clamp against the clip's peak
+        log_mel = 10.0 * np.log10(np.maximum(mel_power, 1e-10, out=mel_power), out=mel_power)
+        np.maximum(log_mel, log_mel.max() - self.top_db, out=log_mel)
+        mfcc = self._dct @ log_mel
+
+        stats = {
+            'mfcc_mean': float(mfcc.mean(axis=1, dtype=np.float64).mean()),
+            'mfcc_std': float(mfcc.std(axis=1, dtype=np.float64).mean()),
+            'spectral_centroid_mean': float(centroid.mean(dtype=np.float64)),
+            'spectral_centroid_std': float(centroid.std(dtype=np.float64)),
+            'energy_mean': float(rms.mean(dtype=np.float64)),
+            'energy_std': float(rms.std(dtype=np.float64)),
+            'zcr_mean': float(zcr.mean(dtype=np.float64))
+        }
+
+        logger.info(f"Feature engine: {n_frames} frames analyzed")
+        return stats
+
+    def pitch(self, audio_array: np.ndarray, sample_rate: int, fmin: float = 60.0,
+              fmax: float = 500.0, voicing_threshold: float = 0.3) -> Dict[str, Any]:
+        """
+        Estimate a per-frame fundamental frequency track
+
+        Each frame's autocorrelation is taken from its power spectrum (one
+        rfft/irfft pair per block, on the same frames as analyze()), the
+        strongest lag within [fmin, fmax] is refined by parabolic
+        interpolation, and frames whose normalized peak falls below the
+        voicing threshold are marked unvoiced. Only the f0 track (one float32
+        per frame) and its summary are kept, instead of piptrack's two
+        (1 + n_fft/2, n_frames) matrices.
+
+        Args:
+            audio_array: Mono audio samples
+            sample_rate: Sample rate
+            fmin: Lowest pitch searched, in Hz
+            fmax: Highest pitch searched, in Hz
+            voicing_threshold: Minimum autocorrelation peak, relative to the
+                frame energy, for a frame to count as voiced
+
+        Returns:
+            Dictionary with 'f0' (float32 Hz per frame, NaN when unvoiced),
+            f0_mean, f0_std, f0_median, f0_min, f0_max and voiced_ratio
+        """
+        frames = self.frame(audio_array)
+        n_frames = frames.shape[1]
+        lag_min = max(2, int(sample_rate / fmax))
+        lag_max = min(self.n_fft // 2 - 2, int(np.ceil(sample_rate / fmin)))
+
+        f0 = np.full(n_frames, np.nan, dtype=np.float32)
+        for start in range(0, n_frames, self.block_frames):
+            block = slice(start, min(start + self.block_frames, n_frames))
+            spectrum = scipy.fft.rfft(frames[:, block] * self._window[:, None], axis=0)
+            power = np.square(spectrum.real) + np.square(spectrum.imag)
+            acf = scipy.fft.irfft(power, n=self.n_fft, axis=0)[:lag_max + 2]
+
+            columns = np.arange(acf.shape[1])
+            lag = np.argmax(acf[lag_min:lag_max + 1], axis=0) + lag_min
+            peak = acf[lag, columns]
+            voiced = (acf[0] > 1e-8) & (peak > voicing_threshold * acf[0])
+
+            left, right = acf[lag - 1, columns], acf[lag + 1, columns]
+            curvature = left - 2 * peak + right
+            shift = np.divide(0.5 * (left - right), curvature, out=np.zeros_like(peak), where=curvature < 0)
+            f0[block] = np.where(voiced, sample_rate / (lag + shift), np.nan)
+
+        voiced_f0 = f0[~np.isnan(f0)]
+        summary = {
+            'f0': f0,
+            'voiced_ratio': float(len(voiced_f0) / n_frames) if n_frames else 0.0
+        }
+        if len(voiced_f0):
+            summary.update({
+                'f0_mean': float(voiced_f0.mean(dtype=np.float64)),
+                'f0_std': float(voiced_f0.std(dtype=np.float64)),
+                'f0_median': float(np.median(voiced_f0)),
+                'f0_min': float(voiced_f0.min()),
+                'f0_max': float(voiced_f0.max())
+            })
+        else:
+            summary.update({'f0_mean': 0.0, 'f0_std': 0.0, 'f0_median': 0.0, 'f0_min': 0.0, 'f0_max': 0.0})
+
+        logger.info(f"Pitch track: {len(voiced_f0)}/{n_frames} voiced frames")
+        return summary
+
+# Global feature engine instance
+feature_engine = FeatureEngine()
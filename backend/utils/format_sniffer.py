@@ -0,0 +1,118 @@
+"""
+Container/codec sniffing for ToneBridge Backend
+Identifies audio payloads from their leading magic bytes instead of trusting client labels
+"""
+
+import threading
+from collections import Counter
+from typing import Optional, Dict, Any
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Number of leading bytes needed to identify every supported container
+SNIFF_BYTES = 64
+
+# Client-supplied names that refer to the same container
+FORMAT_ALIASES = {
+    'm4a': 'mp4',
+    'weba': 'webm',
+    'opus': 'ogg',
+    'oga': 'ogg',
+    'mpeg': 'mp3',
+    'x-wav': 'wav',
+    'wave': 'wav'
+}
+
+def normalize_format(audio_format: Optional[str]) -> Optional[str]:
+    """Map a client-supplied format name onto the sniffer's vocabulary"""
+    if not audio_format:
+        return None
+    audio_format = audio_format.lower().strip()
+    return FORMAT_ALIASES.get(audio_format, audio_format)
+
+def sniff_format(audio_data: bytes) -> Optional[str]:
+    """
+    Identify an audio container from its magic bytes
+
+    Args:
+        audio_data: Audio bytes (only the first SNIFF_BYTES are inspected)
+
+    Returns:
+        One of 'wav', 'ogg', 'webm', 'mp3', 'aac', 'flac', 'mp4', or None if unknown
+    """
+    head = bytes(audio_data[:SNIFF_BYTES])
+    if len(head) < 4:
+        return None
+
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return 'wav'
+    if head[:4] == b'OggS':
+        return 'ogg'
+    if head[:4] == b'\x1a\x45\xdf\xa3':
+        # EBML header; webm and matroska share a demuxer
+        return 'webm'
+    if head[:4] == b'fLaC':
+        return 'flac'
+    if head[4:8] == b'ftyp':
+        return 'mp4'
+    if head[:3] == b'ID3':
+        return 'mp3'
+    if head[0] == 0xFF:
+        # ADTS (AAC) and MPEG audio frames both start with a 12-bit sync word;
+        # ADTS always has layer bits 00, MPEG audio layers I-III never do
+        if (head[1] & 0xF6) == 0xF0:
+            return 'aac'
+        if (head[1] & 0xE0) == 0xE0 and (head[1] & 0x06) != 0:
+            return 'mp3'
+    return None
+
+class FormatSniffer:
+    """Sniffs payloads and counts which format and decoder each request was routed to"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._detected = Counter()
+        self._decisions = Counter()
+        self._mislabeled = 0
+
+    def resolve(self, audio_data: bytes, claimed_format: Optional[str] = None) -> Optional[str]:
+        """
+        Determine the real format of a payload
+
+        Args:
+            audio_data: Audio bytes
+            claimed_format: Format reported by the client, if any
+
+        Returns:
+            The sniffed format, or the normalized claimed format when the
+            magic bytes are not recognized
+        """
+        claimed = normalize_format(claimed_format)
+        detected = sniff_format(audio_data)
+
+        with self._lock:
+            self._detected[detected or 'unknown'] += 1
+            if detected and claimed and detected != claimed:
+                self._mislabeled += 1
+
+        if detected and claimed and detected != claimed:
+            logger.warning(f"Audio labelled '{claimed}' but looks like '{detected}'; using '{detected}'")
+        return detected or claimed
+
+    def record_decision(self, audio_format: Optional[str], decoder: str):
+        """Count the decoder chosen for a format"""
+        with self._lock:
+            self._decisions[f"{audio_format or 'unknown'}:{decoder}"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-format detection and routing counts"""
+        with self._lock:
+            return {
+                'detected': dict(self._detected),
+                'decisions': dict(self._decisions),
+                'mislabeled': self._mislabeled
+            }
+
+# Global sniffer instance
+format_sniffer = FormatSniffer()
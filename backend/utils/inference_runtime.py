@@ -0,0 +1,230 @@
+"""
+Inference runtime tuning for ToneBridge Backend
+Per-worker torch thread budgets, CPU affinity and inference mode
+"""
+
+import os
+import time
+import threading
+import contextlib
+import importlib.util
+import multiprocessing
+from typing import Dict, Any, List, Optional
+from utils.logger import setup_logger
+from config import Config
+
+# torch is imported on first use, so importing the services does not pay for it
+TORCH_AVAILABLE = importlib.util.find_spec('torch') is not None
+
+logger = setup_logger(__name__)
+
+def usable_cpus() -> List[int]:
+    """CPU ids this process may run on (respects cgroup/taskset limits where the OS exposes them)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def plan_threads(cpus: int, workers: int) -> int:
+    """Intra-op threads per worker so that all workers together use each core once"""
+    return max(1, cpus // max(1, workers))
+
+def worker_cores(cores: List[int], worker_index: int, threads: int) -> List[int]:
+    """The slice of cores pinned to one worker; workers beyond the core count wrap around"""
+    start = (worker_index * threads) % len(cores)
+    return [cores[(start + offset) % len(cores)] for offset in range(min(threads, len(cores)))]
+
+def inference_mode():
+    """
+    Context for model forward passes
+
+    torch.inference_mode skips autograd bookkeeping (version counters, grad
+    graphs) entirely, which is cheaper than no_grad. It is thread-local, so
+    it must be entered on the thread that runs the model.
+    """
+    if TORCH_AVAILABLE:
+        import torch
+        return torch.inference_mode()
+    return contextlib.nullcontext()
+
+class InferenceRuntime:
+    """
+    Thread and core budget for the torch models in this process
+
+    By default torch starts one intra-op thread per core in every process,
+    so N server workers on one host run N x cores threads and thrash. The
+    budget splits the cores between SERVER_WORKERS processes: each gets
+    TORCH_NUM_THREADS intra-op threads (cores / workers when 0) and
+    TORCH_INTEROP_THREADS inter-op threads, and with CPU_AFFINITY_ENABLED
+    is pinned to its own slice of cores so workers do not migrate onto each
+    other. OMP_NUM_THREADS/MKL_NUM_THREADS are exported for child processes
+    (the chunk pool) so their BLAS pools follow the same budget.
+
+    configure() is applied once per process; both services call it before
+    loading models, and a prefork server calls it in each worker with its
+    index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._settings: Optional[Dict[str, Any]] = None
+        # Cores available before any pinning, so workers forked from a configured parent see them all
+        self._cores: Optional[List[int]] = None
+
+    def configure(self, worker_index: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Apply the configured thread budget and affinity to this process
+
+        Without a worker_index, settings already applied are kept; a forked
+        worker passes its index to re-apply them for its own slice of cores.
+
+        Args:
+            worker_index: Position of this worker among SERVER_WORKERS (defaults to WORKER_INDEX)
+
+        Returns:
+            The settings in effect
+        """
+        with self._lock:
+            if self._settings is not None and worker_index is None:
+                return self._settings
+
+            if worker_index is None:
+                worker_index = int(os.getenv('WORKER_INDEX', 0))
+            if self._cores is None:
+                self._cores = usable_cpus()
+            cores = self._cores
+            workers = max(1, Config.SERVER_WORKERS)
+            threads = Config.TORCH_NUM_THREADS or plan_threads(len(cores), workers)
+            if threads * workers > len(cores):
+                logger.warning(f"{workers} workers x {threads} threads oversubscribes {len(cores)} cores")
+
+            settings = {
+                'worker_index': worker_index,
+                'workers': workers,
+                'cpus': len(cores),
+                'intra_op_threads': threads,
+                'interop_threads': Config.TORCH_INTEROP_THREADS,
+                'affinity': None
+            }
+
+            for variable in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+                os.environ[variable] = str(threads)
+
+            if Config.CPU_AFFINITY_ENABLED and hasattr(os, 'sched_setaffinity'):
+                pinned = worker_cores(cores, worker_index, threads)
+                try:
+                    os.sched_setaffinity(0, pinned)
+                    settings['affinity'] = pinned
+                except OSError as e:
+                    logger.warning(f"Could not pin worker {worker_index} to cores {pinned}: {str(e)}")
+
+            if TORCH_AVAILABLE:
+                import torch
+                torch.set_num_threads(threads)
+                try:
+                    # Only settable before torch runs any inter-op parallel work in this process
+                    torch.set_num_interop_threads(Config.TORCH_INTEROP_THREADS)
+                except RuntimeError as e:
+                    logger.warning(f"Inter-op threads already fixed at {torch.get_num_interop_threads()}: {str(e)}")
+                    settings['interop_threads'] = torch.get_num_interop_threads()
+
+            logger.info(f"Inference runtime: worker {worker_index}/{workers}, {threads} intra-op and "
+                        f"{settings['interop_threads']} inter-op threads on {len(cores)} CPUs, "
+                        f"affinity {settings['affinity'] or 'unpinned'}")
+            self._settings = settings
+            return settings
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the runtime settings in effect
+
+        Returns:
+            Thread budget and affinity, or just the configured flag before configure()
+        """
+        if self._settings is None:
+            return {'configured': False}
+        stats = {'configured': True, **self._settings}
+        if TORCH_AVAILABLE:
+            import torch
+            stats['torch_threads'] = torch.get_num_threads()
+        return stats
+
+def _split_worker(threads: int, seconds: float, start_event, results) -> None:
+    """One simulated server worker: Whisper-encoder-sized matmuls for a fixed time"""
+    import torch
+    torch.set_num_threads(threads)
+    # A Whisper-base encoder MLP block on one 30 s window: 1500 frames x 512 -> 2048 -> 512
+    activations = torch.randn(1500, 512)
+    up, down = torch.randn(512, 2048), torch.randn(2048, 512)
+    with torch.inference_mode():
+        torch.relu(activations @ up) @ down
+        start_event.wait()
+        deadline = time.perf_counter() + seconds
+        passes = 0
+        while time.perf_counter() < deadline:
+            torch.relu(activations @ up) @ down
+            passes += 1
+    results.put(passes)
+
+def benchmark_thread_splits(seconds: float = 2.0, cpus: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Measure aggregate throughput of each workers x threads split of the cores
+
+    Every split runs its workers as concurrent processes, each with its own
+    intra-op thread count, so contention between workers is part of the
+    measurement. More workers with fewer threads usually wins on throughput
+    because small matmuls scale poorly across threads; fewer workers with
+    more threads wins on single-request latency.
+
+    Args:
+        seconds: Measurement time per split
+        cpus: Cores to divide (defaults to the usable CPUs)
+
+    Returns:
+        One dict per split with 'workers', 'threads', 'passes_per_second'
+        and 'latency_ms' (per pass, within one worker), fastest first
+    """
+    if not TORCH_AVAILABLE:
+        raise RuntimeError("The thread benchmark requires PyTorch")
+
+    cpus = cpus or len(usable_cpus())
+    context = multiprocessing.get_context('spawn')
+    splits = [(workers, cpus // workers) for workers in range(1, cpus + 1) if cpus % workers == 0]
+
+    results = []
+    for workers, threads in splits:
+        start_event, queue = context.Event(), context.Queue()
+        processes = [context.Process(target=_split_worker, args=(threads, seconds, start_event, queue))
+                     for _ in range(workers)]
+        for process in processes:
+            process.start()
+        # Give every worker time to import torch and warm up before the clock starts
+        time.sleep(1.0 + 0.2 * workers)
+        start_event.set()
+        passes = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+        results.append({
+            'workers': workers,
+            'threads': threads,
+            'passes_per_second': sum(passes) / seconds,
+            'latency_ms': seconds * 1000 / max(1, min(passes))
+        })
+    return sorted(results, key=lambda result: result['passes_per_second'], reverse=True)
+
+def suggest_thread_split(seconds: float = 2.0) -> Dict[str, Any]:
+    """
+    Run the split benchmark and log the suggested SERVER_WORKERS / TORCH_NUM_THREADS
+
+    Returns:
+        The fastest split, with the full result list under 'splits'
+    """
+    splits = benchmark_thread_splits(seconds)
+    best = splits[0]
+    for split in splits:
+        logger.info(f"Thread split {split['workers']} workers x {split['threads']} threads: "
+                    f"{split['passes_per_second']:.1f} passes/s, {split['latency_ms']:.1f} ms/pass")
+    logger.info(f"Suggested for this host: SERVER_WORKERS={best['workers']} TORCH_NUM_THREADS={best['threads']}")
+    return {**best, 'splits': splits}
+
+# Global inference runtime instance
+inference_runtime = InferenceRuntime()
@@ -0,0 +1,194 @@
+"""
+Long-form transcription helpers for ToneBridge Backend
+Overlapping, silence-aware windows for recordings longer than Whisper's 30 s context, and transcript stitching
+"""
+
+import re
+import numpy as np
+from typing import List, Dict, Any, Tuple, Optional
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Frame length used to find the quietest cut point
+_CUT_FRAME_MS = 20.0
+
+_WORD_NORMALIZER = re.compile(r"[^\w']+")
+
+class WindowPlanner:
+    """
+    Cuts a signal into overlapping windows at quiet points
+
+    Each window is at most window_seconds long. Its end is placed at the
+    quietest frame within the last search_seconds, so cuts fall between
+    words where possible, and the next window starts overlap_seconds before
+    that cut so a word split anyway appears whole in one of the two. Samples
+    can be pushed in blocks of any size; only the unfinished window is
+    buffered, so the planner works on a stream as well as on a whole array.
+    """
+
+    def __init__(self, sample_rate: int, window_seconds: float = 30.0,
+                 overlap_seconds: float = 2.0, search_seconds: float = 3.0):
+        self.sample_rate = sample_rate
+        self.window_samples = max(1, int(window_seconds * sample_rate))
+        self.overlap_samples = min(int(overlap_seconds * sample_rate), self.window_samples // 2)
+        self.search_samples = min(int(search_seconds * sample_rate), self.window_samples - self.overlap_samples - 1)
+        self.frame_samples = max(1, int(sample_rate * _CUT_FRAME_MS / 1000))
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0
+        # End of the last emitted window; audio before it has been covered
+        self._covered = 0
+
+    def push(self, samples: np.ndarray) -> List[Tuple[int, np.ndarray]]:
+        """
+        Add samples and return the windows that are now complete
+
+        Args:
+            samples: Next mono samples
+
+        Returns:
+            List of (start_sample, window) tuples
+        """
+        self._buffer = np.concatenate((self._buffer, samples)) if len(self._buffer) else samples
+        windows = []
+        while len(self._buffer) >= self.window_samples:
+            cut = self._quietest_cut()
+            windows.append(self._emit(cut))
+        return windows
+
+    def finish(self) -> List[Tuple[int, np.ndarray]]:
+        """Return the final window, unless it would only repeat already covered audio"""
+        if self._buffer_start + len(self._buffer) <= self._covered or not len(self._buffer):
+            return []
+        return [self._emit(len(self._buffer))]
+
+    def _quietest_cut(self) -> int:
+        """Pick the cut inside the search region at the centre of the lowest-energy frame"""
+        region_start = self.window_samples - self.search_samples
+        region = self._buffer[region_start:self.window_samples]
+        frames = len(region) // self.frame_samples
+        if frames < 2:
+            return self.window_samples
+
+        energy = np.square(region[:frames * self.frame_samples], dtype=np.float64)
+        energy = energy.reshape(frames, self.frame_samples).sum(axis=1)
+        # Latest frame among equals, so windows stay as long as possible
+        quietest = frames - 1 - int(np.argmin(energy[::-1]))
+        return region_start + quietest * self.frame_samples + self.frame_samples // 2
+
+    def _emit(self, cut: int) -> Tuple[int, np.ndarray]:
+        """Release buffer[:cut] as a window and keep the overlap for the next one"""
+        start = self._buffer_start
+        window = self._buffer[:cut]
+        self._covered = start + cut
+
+        keep_from = max(0, cut - self.overlap_samples)
+        self._buffer = self._buffer[keep_from:]
+        self._buffer_start += keep_from
+        return start, window
+
+def plan_windows(audio_array: np.ndarray, sample_rate: int, window_seconds: float = 30.0,
+                 overlap_seconds: float = 2.0, search_seconds: float = 3.0) -> List[Tuple[int, np.ndarray]]:
+    """
+    Split a whole clip into overlapping, silence-aware windows
+
+    Args:
+        audio_array: Mono audio samples
+        sample_rate: Sample rate
+        window_seconds: Longest window
+        overlap_seconds: Audio shared by consecutive windows
+        search_seconds: How far back from the longest cut to look for a quiet point
+
+    Returns:
+        List of (start_sample, window) tuples; windows are views into audio_array
+    """
+    planner = WindowPlanner(sample_rate, window_seconds, overlap_seconds, search_seconds)
+    return planner.push(audio_array) + planner.finish()
+
+def _normalize_word(word: str) -> str:
+    """Lowercase a word and drop punctuation for overlap matching"""
+    return _WORD_NORMALIZER.sub('', word.lower())
+
+def _align_overlap(previous: List[str], following: List[str], max_words: int) -> Optional[Tuple[int, int]]:
+    """
+    Find where two overlapping transcripts agree
+
+    The longest run of identical (normalized) words between the tail of
+    previous and the head of following is taken as the shared audio;
+    ties go to the earliest run in previous.
+
+    Returns:
+        Tuple of (words of previous to keep, index in following to continue from),
+        or None when fewer than two words line up
+    """
+    offset = max(0, len(previous) - max_words)
+    tail = [_normalize_word(word) for word in previous[offset:]]
+    head = [_normalize_word(word) for word in following[:max_words]]
+
+    best_length, best_tail_end, best_head_end = 0, 0, 0
+    run = [0] * (len(head) + 1)
+    for i in range(1, len(tail) + 1):
+        previous_run = run
+        run = [0] * (len(head) + 1)
+        for j in range(1, len(head) + 1):
+            if tail[i - 1] and tail[i - 1] == head[j - 1]:
+                run[j] = previous_run[j - 1] + 1
+                if run[j] > best_length:
+                    best_length, best_tail_end, best_head_end = run[j], i, j
+
+    # A single shared word ("the", "and") is too weak to align on
+    if best_length < 2:
+        return None
+    return offset + best_tail_end, best_head_end
+
+def _words_before(words: List[str], start: float, end: float, cut: float) -> int:
+    """Number of words spoken before cut, assuming they are spread evenly over [start, end]"""
+    if end <= start:
+        return len(words)
+    return int(round(len(words) * min(max((cut - start) / (end - start), 0.0), 1.0)))
+
+def stitch_transcripts(windows: List[Dict[str, Any]], max_overlap_words: int = 16) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Join per-window transcripts into one transcript with segment timestamps
+
+    Consecutive windows that overlap in time are aligned on the words they
+    share, and each shared word is kept once (from the earlier window, up to
+    the end of the agreed run, then from the later one). When the windows
+    share fewer than two words, both are cut at the middle of the overlap,
+    placing words by an even speech rate across each window, so the
+    overlap is not transcribed twice. The boundary between their segments
+    is put in the middle of the overlap. Windows
+    that do not overlap (for example around a window skipped as silent) are
+    simply concatenated. The result depends only on the inputs.
+
+    Args:
+        windows: Dicts with 'start' and 'end' (seconds) and 'text', in time order
+        max_overlap_words: Words at each window edge considered for alignment
+
+    Returns:
+        Tuple of (text, segments), segments being dicts with 'start', 'end' and 'text'
+    """
+    pieces: List[Dict[str, Any]] = []
+    for window in windows:
+        words = window['text'].split()
+        start = window['start']
+        if pieces and start < pieces[-1]['window_end']:
+            previous = pieces[-1]
+            boundary = (start + previous['window_end']) / 2
+            aligned = _align_overlap(previous['words'], words, max_overlap_words)
+            if aligned is None:
+                # Nothing to align on: cut both windows at the middle of the overlap
+                aligned = (_words_before(previous['words'], previous['start'], previous['window_end'], boundary),
+                           _words_before(words, start, window['end'], boundary))
+            keep, resume = aligned
+            previous['words'] = previous['words'][:keep]
+            words = words[resume:]
+            previous['end'] = boundary
+            start = boundary
+        pieces.append({'start': start, 'end': window['end'], 'window_end': window['end'], 'words': words})
+
+    segments = [
+        {'start': round(piece['start'], 3), 'end': round(piece['end'], 3), 'text': ' '.join(piece['words'])}
+        for piece in pieces if piece['words']
+    ]
+    return ' '.join(segment['text'] for segment in segments), segments
@@ -0,0 +1,154 @@
+"""
+Memory accounting for ToneBridge Backend
+Measures resident set size around each API request
+"""
+
+import os
+import sys
+import threading
+import tracemalloc
+from typing import Optional, Dict, Any
+from utils.logger import setup_logger
+from config import Config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = setup_logger(__name__)
+
+MB = 1024 * 1024
+
+def current_rss() -> Optional[int]:
+    """Get the current resident set size in bytes, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def peak_rss() -> Optional[int]:
+    """Get the process's peak resident set size in bytes"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def memory_breakdown(pid='self') -> Optional[Dict[str, float]]:
+    """
+    Split a process's RSS into pages only it uses and pages shared with other processes
+
+    In prefork workers, model weights inherited from the parent stay shared
+    until something writes to them; unique_mb is what each extra worker
+    really costs. pss_mb charges each shared page proportionally.
+
+    Args:
+        pid: Process id, or 'self'
+
+    Returns:
+        Dictionary with rss_mb, unique_mb, shared_mb and pss_mb, or None where
+        /proc/<pid>/smaps_rollup is unavailable
+    """
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as rollup:
+            for line in rollup:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+    except (OSError, ValueError):
+        return None
+
+    def total(*names):
+        return round(sum(fields.get(name, 0) for name in names) / MB, 1)
+
+    return {
+        'rss_mb': total('Rss'),
+        'unique_mb': total('Private_Clean', 'Private_Dirty'),
+        'shared_mb': total('Shared_Clean', 'Shared_Dirty'),
+        'pss_mb': total('Pss')
+    }
+
+class MemoryTracker:
+    """
+    Per-endpoint peak RSS accounting
+
+    The kernel only keeps a process-wide RSS high-water mark, so a request's
+    peak is exact when the request raised that mark and is otherwise bounded
+    below by the RSS sampled at its start and end. With trace_allocations,
+    tracemalloc additionally records the peak of Python and NumPy heap
+    allocations made during the request (at some CPU cost, and shared between
+    concurrent requests).
+    """
+
+    def __init__(self, trace_allocations: bool = False):
+        self.trace_allocations = trace_allocations
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def start(self) -> Dict[str, Optional[int]]:
+        """Sample memory at the start of a request; pass the result to finish()"""
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+        return {'rss': current_rss(), 'peak': peak_rss()}
+
+    def finish(self, endpoint: str, started: Dict[str, Optional[int]]) -> Dict[str, Any]:
+        """
+        Record the memory used by a finished request
+
+        Args:
+            endpoint: Endpoint name used to group the statistics
+            started: Sample returned by start()
+
+        Returns:
+            Dictionary with peak_rss_mb, peak_exact, rss_growth_mb and, when
+            tracing, traced_peak_mb for this request
+        """
+        rss_before, rss_after = started.get('rss'), current_rss()
+        peak_before, peak_after = started.get('peak'), peak_rss()
+
+        samples = [value for value in (rss_before, rss_after) if value is not None]
+        peak_exact = peak_before is not None and peak_after is not None and peak_after > peak_before
+        request_peak = peak_after if peak_exact else (max(samples) if samples else None)
+
+        result = {
+            'peak_rss_mb': round(request_peak / MB, 1) if request_peak is not None else None,
+            'peak_exact': peak_exact,
+            'rss_growth_mb': round((rss_after - rss_before) / MB, 1) if len(samples) == 2 else None
+        }
+        if self.trace_allocations:
+            result['traced_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / MB, 1)
+
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'max_peak_rss_mb': 0.0, 'last_peak_rss_mb': None, 'max_traced_peak_mb': None
+            })
+            stats['requests'] += 1
+            if result['peak_rss_mb'] is not None:
+                stats['last_peak_rss_mb'] = result['peak_rss_mb']
+                stats['max_peak_rss_mb'] = max(stats['max_peak_rss_mb'], result['peak_rss_mb'])
+            if 'traced_peak_mb' in result:
+                stats['max_traced_peak_mb'] = max(stats['max_traced_peak_mb'] or 0.0, result['traced_peak_mb'])
+
+        logger.info(f"Memory for {endpoint}: {result}")
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-endpoint memory statistics and current process RSS"""
+        rss, peak = current_rss(), peak_rss()
+        with self._lock:
+            return {
+                'rss_mb': round(rss / MB, 1) if rss is not None else None,
+                'process_peak_rss_mb': round(peak / MB, 1) if peak is not None else None,
+                'pid': os.getpid(),
+                'sharing': memory_breakdown(),
+                'trace_allocations': self.trace_allocations,
+                'endpoints': {name: dict(stats) for name, stats in self._endpoints.items()}
+            }
+
+# Global memory tracker instance
+memory_tracker = MemoryTracker(trace_allocations=Config.MEMORY_TRACE_ALLOCATIONS)
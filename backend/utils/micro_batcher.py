@@ -0,0 +1,184 @@
+"""
+Cross-request micro-batching for ToneBridge Backend
+Collects concurrent inference calls for a few milliseconds and runs them as one batch
+"""
+
+import os
+import time
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Queue-delay samples kept for percentiles
+_DELAY_SAMPLES = 1024
+
+class _Pending:
+    """One submitted item waiting for its batch"""
+
+    __slots__ = ('item', 'future', 'enqueued_at')
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+class MicroBatcher:
+    """
+    Dynamic batching scheduler in front of a batch-capable model call
+
+    Request threads call submit() and block on their own result. A single
+    scheduler thread takes the oldest pending item, waits up to max_wait_ms
+    from that item's arrival for more to join (or until max_batch_size is
+    reached), and hands the whole batch to run_batch in one call. Items that
+    arrive while a batch is running are already past their wait when the
+    scheduler comes back, so under load batches form with no added delay;
+    a lone request waits at most max_wait_ms.
+
+    The scheduler thread starts on first use, and again in a forked worker
+    process, where the parent's thread does not exist.
+    """
+
+    def __init__(self, run_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 8,
+                 max_wait_ms: float = 20.0, name: str = 'batcher'):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {
+            'batches': 0,
+            'items': 0,
+            'failed_batches': 0,
+            'max_queue_delay': 0.0,
+            'total_queue_delay': 0.0,
+            'total_batch_time': 0.0
+        }
+        self._batch_sizes: Counter = Counter()
+        self._delays: List[float] = []
+        self._worker = None
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_worker(self):
+        """Start the scheduler thread for this process if it is not running"""
+        if self._worker_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._worker_pid != os.getpid():
+                # Items queued in a parent process have no waiter here
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+                self._worker_pid = os.getpid()
+
+    def submit(self, item: Any) -> Any:
+        """
+        Run one item as part of the next batch and wait for its result
+
+        Args:
+            item: Model input for a single request
+
+        Returns:
+            The result run_batch produced for this item
+        """
+        self._ensure_worker()
+        pending = _Pending(item)
+        self._queue.put(pending)
+        return pending.future.result()
+
+    def submit_many(self, items: List[Any]) -> List[Any]:
+        """
+        Queue several items at once (e.g. the windows of one long recording) and wait for all of them
+
+        Args:
+            items: Model inputs
+
+        Returns:
+            Results in the order of items
+        """
+        self._ensure_worker()
+        pending = [_Pending(item) for item in items]
+        for entry in pending:
+            self._queue.put(entry)
+        return [entry.future.result() for entry in pending]
+
+    def _collect(self) -> List[_Pending]:
+        """Take the oldest pending item plus whatever joins it within the wait window"""
+        batch = [self._queue.get()]
+        deadline = batch[0].enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        """Scheduler loop: form batches and resolve each waiting request"""
+        while True:
+            batch = self._collect()
+            dispatched_at = time.monotonic()
+            delays = [dispatched_at - pending.enqueued_at for pending in batch]
+
+            try:
+                results = self.run_batch([pending.item for pending in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name} returned {len(results)} results for {len(batch)} inputs")
+            except Exception as e:
+                logger.error(f"{self.name}: batch of {len(batch)} failed: {str(e)}")
+                for pending in batch:
+                    pending.future.set_exception(e)
+                self._record(len(batch), delays, time.monotonic() - dispatched_at, failed=True)
+                continue
+
+            for pending, result in zip(batch, results):
+                pending.future.set_result(result)
+            self._record(len(batch), delays, time.monotonic() - dispatched_at, failed=False)
+
+    def _record(self, size: int, delays: List[float], batch_time: float, failed: bool):
+        """Account for one dispatched batch"""
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['items'] += size
+            self._stats['failed_batches'] += int(failed)
+            self._stats['total_queue_delay'] += sum(delays)
+            self._stats['max_queue_delay'] = max(self._stats['max_queue_delay'], max(delays))
+            self._stats['total_batch_time'] += batch_time
+            self._batch_sizes[size] += 1
+            self._delays.extend(delays)
+            del self._delays[:-_DELAY_SAMPLES]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batch size and queue delay statistics
+
+        Returns:
+            Dictionary with batch counts, the batch size histogram and queue delays
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            sizes = dict(sorted(self._batch_sizes.items()))
+            delays = sorted(self._delays)
+
+        batches, items = stats['batches'], stats['items']
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'pending': self._queue.qsize(),
+            'batches': batches,
+            'items': items,
+            'failed_batches': stats['failed_batches'],
+            'avg_batch_size': items / batches if batches else 0.0,
+            'batch_size_histogram': sizes,
+            'avg_queue_delay_ms': stats['total_queue_delay'] / items * 1000 if items else 0.0,
+            'p95_queue_delay_ms': delays[int(0.95 * (len(delays) - 1))] * 1000 if delays else 0.0,
+            'max_queue_delay_ms': stats['max_queue_delay'] * 1000,
+            'avg_batch_ms': stats['total_batch_time'] / batches * 1000 if batches else 0.0
+        }
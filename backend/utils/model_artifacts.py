@@ -0,0 +1,119 @@
+"""
+Local model artifacts for ToneBridge Backend
+Pins hub models to a local directory as safetensors and loads them offline, memory-mapped
+"""
+
+import os
+import json
+import time
+import shutil
+import importlib
+from typing import Dict, Any, Tuple, Optional
+from utils.logger import setup_logger
+from utils.error_handlers import ModelError
+from config import Config
+
+logger = setup_logger(__name__)
+
+# Written last by prepare_artifact(); a directory without it is an interrupted preparation
+ARTIFACT_MANIFEST = 'tonebridge-artifact.json'
+
+# Model and preprocessor classes for each pipeline task
+TASK_CLASSES = {
+    'automatic-speech-recognition': ('AutoModelForSpeechSeq2Seq', 'AutoProcessor'),
+    'text-classification': ('AutoModelForSequenceClassification', 'AutoTokenizer')
+}
+
+def artifact_path(runtime: str, model_name: str) -> str:
+    """Local directory for a runtime's converted copy of a hub model"""
+    return os.path.join(Config.MODEL_CACHE_DIR, runtime, model_name.replace('/', '--'))
+
+def read_manifest(model_name: str) -> Optional[Dict[str, Any]]:
+    """Manifest of a prepared safetensors artifact, or None if it has not been prepared"""
+    try:
+        with open(os.path.join(artifact_path('safetensors', model_name), ARTIFACT_MANIFEST)) as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return None
+
+def prepare_artifact(model_name: str, task: str) -> Dict[str, Any]:
+    """
+    Download a hub model and save it locally as safetensors
+
+    The model is written to a temporary directory and moved into place
+    with its manifest last, so a server never loads a half-written
+    artifact. The manifest pins the hub revision that was converted.
+
+    Args:
+        model_name: Hugging Face model id
+        task: Pipeline task, a key of TASK_CLASSES
+
+    Returns:
+        The artifact manifest
+    """
+    transformers = importlib.import_module('transformers')
+    model_class, preprocessor_class = (getattr(transformers, name) for name in TASK_CLASSES[task])
+
+    target = artifact_path('safetensors', model_name)
+    staging = f"{target}.partial"
+    shutil.rmtree(staging, ignore_errors=True)
+
+    started = time.perf_counter()
+    model = model_class.from_pretrained(model_name)
+    preprocessor = preprocessor_class.from_pretrained(model_name)
+    model.save_pretrained(staging, safe_serialization=True)
+    preprocessor.save_pretrained(staging)
+
+    files = {name: os.path.getsize(os.path.join(staging, name)) for name in sorted(os.listdir(staging))}
+    manifest = {
+        'model': model_name,
+        'task': task,
+        'revision': getattr(model.config, '_commit_hash', None),
+        'transformers': transformers.__version__,
+        'files': files,
+        'prepared_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }
+    with open(os.path.join(staging, ARTIFACT_MANIFEST), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(staging, target)
+    logger.info(f"Prepared {model_name} ({task}) in {target}: "
+                f"{sum(files.values()) / (1024 * 1024):.1f} MB in {time.perf_counter() - started:.1f}s")
+    return manifest
+
+def check_download_allowed(model_name: str):
+    """Raise ModelError if MODEL_OFFLINE forbids fetching a model that has no local copy"""
+    if Config.MODEL_OFFLINE:
+        raise ModelError(f"{model_name} has not been prepared in {Config.MODEL_CACHE_DIR} "
+                         f"and MODEL_OFFLINE forbids downloading it; run setup_deploy.py")
+
+def pipeline_source(model_name: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Where a pipeline should load a model from
+
+    A prepared artifact is loaded from its directory with no hub access
+    (local_files_only) and from safetensors, which are read through a
+    memory map rather than unpickled; low_cpu_mem_usage builds the model
+    without initializing throwaway weights first. Without an artifact the
+    hub id is returned unchanged, unless MODEL_OFFLINE forbids downloads.
+
+    Args:
+        model_name: Hugging Face model id
+
+    Returns:
+        Tuple of (model id or directory, model_kwargs for pipeline())
+    """
+    manifest = read_manifest(model_name)
+    if manifest is not None:
+        logger.info(f"Loading {model_name} offline from {artifact_path('safetensors', model_name)} "
+                    f"(revision {manifest.get('revision')})")
+        return artifact_path('safetensors', model_name), {
+            'local_files_only': True,
+            'use_safetensors': True,
+            'low_cpu_mem_usage': True
+        }
+    check_download_allowed(model_name)
+    logger.info(f"No local artifact for {model_name}; loading from the Hugging Face hub")
+    return model_name, {}
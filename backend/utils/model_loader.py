@@ -0,0 +1,233 @@
+"""
+Background model loading for ToneBridge Backend
+Loads and warms up models off the startup path and tracks per-model readiness
+"""
+
+import gc
+import time
+import threading
+import numpy as np
+from typing import Callable, Dict, Any, Optional
+from utils.logger import setup_logger
+from config import Config
+
+logger = setup_logger(__name__)
+
+# Load states, in order; 'ready' and 'failed' are final
+MODEL_STATES = ('pending', 'loading', 'loaded', 'warming', 'ready', 'failed')
+
+def synthetic_speech(seconds: float = 2.0, sample_rate: int = 16000) -> np.ndarray:
+    """
+    Voice-like test signal for warmup passes
+
+    A 140 Hz harmonic series under a syllable-rate envelope, plus a little
+    noise: loud and modulated enough to pass VAD and make the decoders run
+    every layer, without shipping a recording.
+    """
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    voice = sum(np.sin(2 * np.pi * 140 * harmonic * t) / harmonic for harmonic in range(1, 6))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+    noise = np.random.default_rng(0).standard_normal(len(t)) * 0.01
+    return (0.2 * voice * envelope + noise).astype(np.float32)
+
+class _ModelEntry:
+    """Load state of one model"""
+
+    def __init__(self, name: str, load: Callable[[], None], warmup: Optional[Callable[[], None]],
+                 share: Optional[Callable[[], None]]):
+        self.name = name
+        self.load = load
+        self.warmup = warmup
+        self.share = share
+        self.state = 'pending'
+        self.error: Optional[str] = None
+        self.load_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+        self.done = threading.Event()
+
+class ModelLoader:
+    """
+    Loads registered models on a background thread
+
+    Services register a load and a warmup callable when they are built,
+    instead of loading in their constructors, so importing the API and
+    binding the server no longer wait on model downloads. start() loads the
+    models one after another (in parallel they would only fight over the
+    same cores), then runs each warmup pass so the first real request does
+    not pay for kernel initialization. With MODEL_LOADING=eager, register()
+    loads synchronously as before.
+
+    A model that fails to load is marked 'failed' and its service keeps its
+    fallback path; the process is ready once every model has finished.
+
+    A prefork server instead calls load_all(warmup=False) and prepare_fork()
+    in the parent, then start_warmup() in each forked worker, so weights are
+    loaded once and kernels and thread pools initialize per worker.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, _ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self._ready_ms: Optional[float] = None
+
+    def register(self, name: str, load: Callable[[], None], warmup: Optional[Callable[[], None]] = None,
+                 share: Optional[Callable[[], None]] = None):
+        """
+        Register a model to load
+
+        Args:
+            name: Model name reported by /ready
+            load: Loads the model (failures are recorded, not raised)
+            warmup: Runs one inference on synthetic input once loaded
+            share: Moves the loaded weights to memory forked workers share
+        """
+        entry = _ModelEntry(name, load, warmup, share)
+        with self._lock:
+            self._models[name] = entry
+        if Config.MODEL_LOADING == 'eager':
+            self._load(entry)
+            self._warm(entry)
+
+    def start(self):
+        """Start loading the registered models in the background (once; no-op if none are pending)"""
+        if any(entry.state == 'pending' for entry in self._models.values()):
+            self._start_thread(self.load_all)
+
+    def start_warmup(self):
+        """Warm up models loaded by load_all(warmup=False), in the background"""
+        self._start_thread(self._warm_all)
+
+    def _start_thread(self, target: Callable[[], None]):
+        """Run target on the loader thread, unless this process already started one"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._started_at = time.perf_counter()
+            self._thread = threading.Thread(target=target, name='model-loader', daemon=True)
+            self._thread.start()
+
+    def load_all(self, warmup: bool = True):
+        """
+        Load every pending model on the calling thread
+
+        Args:
+            warmup: Also run the warmup passes; without them models stay 'loaded'
+        """
+        for entry in list(self._models.values()):
+            if entry.state == 'pending':
+                self._load(entry)
+        if warmup:
+            self._warm_all()
+
+    def _warm_all(self):
+        """Warm up every loaded model, then record the time to ready"""
+        for entry in list(self._models.values()):
+            if entry.state == 'loaded':
+                self._warm(entry)
+        if self._started_at is not None:
+            self._ready_ms = (time.perf_counter() - self._started_at) * 1000
+            logger.info(f"Models ready in {self._ready_ms:.0f}ms: {self.get_status()['models']}")
+
+    def _load(self, entry: _ModelEntry):
+        """Load one model, recording its state"""
+        try:
+            entry.state = 'loading'
+            started = time.perf_counter()
+            entry.load()
+            entry.load_ms = (time.perf_counter() - started) * 1000
+            entry.state = 'loaded'
+        except Exception as e:
+            self._fail(entry, e)
+
+    def _warm(self, entry: _ModelEntry):
+        """Warm up one loaded model and mark it ready"""
+        if entry.state != 'loaded':
+            return
+        try:
+            if entry.warmup is not None and Config.MODEL_WARMUP_ENABLED:
+                entry.state = 'warming'
+                started = time.perf_counter()
+                entry.warmup()
+                entry.warmup_ms = (time.perf_counter() - started) * 1000
+            entry.state = 'ready'
+            entry.done.set()
+            logger.info(f"Model '{entry.name}' ready (load {entry.load_ms:.0f}ms, warmup {entry.warmup_ms or 0:.0f}ms)")
+        except Exception as e:
+            self._fail(entry, e)
+
+    def _fail(self, entry: _ModelEntry, error: Exception):
+        """Mark a model failed; its service keeps serving its fallback"""
+        entry.state = 'failed'
+        entry.error = str(error)
+        entry.done.set()
+        logger.error(f"Model '{entry.name}' failed to load: {str(error)}")
+
+    def prepare_fork(self):
+        """
+        Make the loaded models cheap to share with forked workers
+
+        Each model's share hook moves its weights into shared memory, so the
+        pages are mapped shared rather than copy-on-write. gc.freeze() then
+        moves every object allocated so far into the permanent generation:
+        the cyclic collector in a worker would otherwise write to the header
+        of each of them and copy their pages. Call after load_all() and
+        before forking.
+        """
+        for entry in self._models.values():
+            if entry.state == 'loaded' and entry.share is not None:
+                try:
+                    entry.share()
+                except Exception as e:
+                    logger.warning(f"Could not move '{entry.name}' weights to shared memory: {str(e)}")
+        gc.collect()
+        gc.freeze()
+        logger.info(f"Froze {gc.get_freeze_count()} objects for forked workers")
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a model to finish loading
+
+        Args:
+            name: Registered model name; unknown names return at once
+            timeout: Seconds to wait at most
+
+        Returns:
+            True if the model has finished loading (ready or failed)
+        """
+        entry = self._models.get(name)
+        if entry is None:
+            return True
+        return entry.done.wait(timeout)
+
+    def is_ready(self) -> bool:
+        """Tell whether every registered model has finished loading"""
+        return all(entry.done.is_set() for entry in self._models.values())
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get per-model load state
+
+        Returns:
+            'ready', 'degraded' (a model failed and its fallback is serving),
+            'ready_ms' since start() and per-model state, error and timings
+        """
+        models = {
+            name: {
+                'state': entry.state,
+                'error': entry.error,
+                'load_ms': entry.load_ms,
+                'warmup_ms': entry.warmup_ms
+            }
+            for name, entry in self._models.items()
+        }
+        return {
+            'ready': self.is_ready(),
+            'degraded': any(model['state'] == 'failed' for model in models.values()),
+            'ready_ms': self._ready_ms,
+            'models': models
+        }
+
+# Global model loader instance
+model_loader = ModelLoader()
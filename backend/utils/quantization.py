@@ -0,0 +1,66 @@
+"""
+Model quantization for ToneBridge Backend
+int8 dynamic quantization of Linear layers for CPU inference
+"""
+
+from typing import Any
+from utils.logger import setup_logger
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+logger = setup_logger(__name__)
+
+# Precision modes accepted by TRANSCRIPTION_QUANTIZATION
+QUANTIZATION_MODES = ('fp32', 'int8')
+
+MB = 1024 * 1024
+
+def model_size_mb(model: Any) -> float:
+    """Size of a model's parameters and buffers, including packed int8 weights"""
+    state = model.state_dict()
+    total = 0
+    for value in state.values():
+        if hasattr(value, 'element_size'):
+            total += value.numel() * value.element_size()
+        elif isinstance(value, tuple):
+            # Packed dynamic-quantized Linear params come back as (weight, bias)
+            total += sum(part.numel() * part.element_size() for part in value if hasattr(part, 'element_size'))
+    return total / MB
+
+def quantize_dynamic_int8(model: Any) -> Any:
+    """
+    Apply int8 dynamic quantization to every torch.nn.Linear in a model
+
+    Weights are converted to int8 once, at load time; activations are
+    quantized on the fly per batch, so no calibration data is needed.
+    Attention and MLP projections hold almost all of Whisper's weights and
+    compute, so this shrinks the model roughly 4x in those layers and speeds
+    up CPU inference. Quantized kernels only exist for CPU.
+
+    Args:
+        model: torch.nn.Module in eval mode on the CPU
+
+    Returns:
+        The same model, with its Linear layers swapped for quantized ones in
+        place (no second copy of the fp32 weights is made)
+    """
+    if not TORCH_AVAILABLE:
+        raise RuntimeError("int8 quantization requires PyTorch")
+
+    # Dynamic quantization backends: fbgemm on x86, qnnpack on ARM
+    engines = torch.backends.quantized.supported_engines
+    if 'fbgemm' in engines:
+        torch.backends.quantized.engine = 'fbgemm'
+    elif 'qnnpack' in engines:
+        torch.backends.quantized.engine = 'qnnpack'
+
+    size_before = model_size_mb(model)
+    quantized = torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear},
+                                                      dtype=torch.qint8, inplace=True)
+    logger.info(f"Quantized Linear layers to int8 ({torch.backends.quantized.engine}): "
+                f"{size_before:.1f} MB -> {model_size_mb(quantized):.1f} MB")
+    return quantized
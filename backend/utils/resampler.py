@@ -0,0 +1,253 @@
+"""
+Polyphase resampling for ToneBridge Backend
+Band-limited rate conversion with filter banks cached per (source rate, target rate) pair
+"""
+
+import threading
+import numpy as np
+from math import gcd
+from collections import OrderedDict
+from typing import Dict, Tuple, Any, Union
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.logger import setup_logger
+from utils.error_handlers import AudioProcessingError
+
+try:
+    import soxr
+    SOXR_AVAILABLE = True
+except ImportError:
+    SOXR_AVAILABLE = False
+
+logger = setup_logger(__name__)
+
+# Output rows computed per matrix product; bounds the temporary (rows x taps) copy
+_ROWS_PER_PRODUCT = 4096
+
+# Largest reduced up/down factor designed as a polyphase bank. Every common rate converts to
+# 16 kHz within it (44.1 kHz is 160/441, 11.025 kHz 640/441); a client-declared rate such as
+# 191999 Hz would need a bank of tens of megabytes and seconds of design time.
+MAX_POLYPHASE_FACTOR = 1024
+
+class PolyphaseFilter:
+    """
+    Windowed-sinc low-pass filter split into its polyphase components
+
+    For a conversion by up/down (reduced), the prototype filter runs at the
+    virtual rate source * up. Output sample n sits at t = center + n * down on
+    that grid; it is the dot product of phase t % up of the filter with the
+    input samples ending at t // up. Phases are stored time-reversed so each
+    output is a plain dot product with a contiguous run of input samples.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int, zero_crossings: int = 16,
+                 rolloff: float = 0.9, kaiser_beta: float = 8.0):
+        divisor = gcd(source_rate, target_rate)
+        self.source_rate = source_rate
+        self.target_rate = target_rate
+        self.up = target_rate // divisor
+        self.down = source_rate // divisor
+
+        # Cut off below the lower of the two Nyquist rates, in cycles per virtual sample
+        length = 2 * zero_crossings * max(self.up, self.down) + 1
+        self.center = (length - 1) // 2
+        cutoff = rolloff / (2.0 * max(self.up, self.down))
+        offsets = np.arange(length) - self.center
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * offsets) * np.kaiser(length, kaiser_beta)
+        prototype *= self.up / prototype.sum()
+
+        self.taps = -(-length // self.up)
+        padded = np.zeros(self.taps * self.up)
+        padded[:length] = prototype
+        # phases[p, k] = prototype[p + k * up], reversed along k
+        self.phases = np.ascontiguousarray(padded.reshape(self.taps, self.up).T[:, ::-1], dtype=np.float32)
+
+    def output_length(self, input_length: int) -> int:
+        """Number of output samples for a complete input of the given length"""
+        return -(-input_length * self.up // self.down)
+
+class ResampleStream:
+    """
+    Block-by-block resampling with the exact output of a one-shot conversion
+
+    write() returns every output sample whose input window is complete;
+    flush() zero-pads the end of the signal and returns the rest. Only the
+    last few dozen input samples are kept between writes.
+    """
+
+    def __init__(self, polyphase: PolyphaseFilter):
+        self._filter = polyphase
+        # Buffer starts with the zeros that precede the signal
+        self._buffer = np.zeros(polyphase.taps, dtype=np.float32)
+        self._buffer_start = -polyphase.taps
+        self._received = 0
+        self._next_output = 0
+
+    def write(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Feed input samples
+
+        Args:
+            samples: Next mono samples at the source rate
+
+        Returns:
+            Resampled samples completed by this write (possibly empty)
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        self._buffer = np.concatenate((self._buffer, samples))
+        self._received += len(samples)
+
+        f = self._filter
+        # Output n is complete once input sample (center + n * down) // up has arrived
+        available = max(0, -(-(self._received * f.up - f.center) // f.down))
+        return self._produce(available)
+
+    def flush(self) -> np.ndarray:
+        """Finish the signal and return the remaining output"""
+        f = self._filter
+        self._buffer = np.concatenate((self._buffer, np.zeros(f.center // f.up + 2, dtype=np.float32)))
+        return self._produce(f.output_length(self._received))
+
+    def _produce(self, stop: int) -> np.ndarray:
+        """Compute outputs [next_output, stop) and drop input no longer needed"""
+        f = self._filter
+        start = self._next_output
+        if stop <= start:
+            return np.zeros(0, dtype=np.float32)
+
+        output = np.empty(stop - start, dtype=np.float32)
+        windows = sliding_window_view(self._buffer, f.taps)
+
+        # Outputs congruent modulo up share a filter phase and advance by down input samples
+        for residue in range(min(f.up, stop - start)):
+            first = start + residue
+            count = (stop - 1 - first) // f.up + 1
+            position = f.center + first * f.down
+            phase = f.phases[position % f.up]
+            row = position // f.up - f.taps + 1 - self._buffer_start
+            for offset in range(0, count, _ROWS_PER_PRODUCT):
+                rows = min(_ROWS_PER_PRODUCT, count - offset)
+                begin = row + offset * f.down
+                block = windows[begin:begin + (rows - 1) * f.down + 1:f.down]
+                output[residue + offset * f.up::f.up][:rows] = block @ phase
+
+        self._next_output = stop
+        # Keep input from the first sample the next output will read
+        keep_from = (f.center + stop * f.down) // f.up - f.taps + 1 - self._buffer_start
+        if keep_from > 0:
+            self._buffer = self._buffer[keep_from:].copy()
+            self._buffer_start += keep_from
+        return output
+
+class SoxrStream:
+    """Block-by-block libsoxr conversion with the ResampleStream interface, for uncommon rate pairs"""
+
+    def __init__(self, source_rate: int, target_rate: int):
+        self._stream = soxr.ResampleStream(source_rate, target_rate, 1, dtype='float32', quality='HQ')
+
+    def write(self, samples: np.ndarray) -> np.ndarray:
+        """Feed input samples and return the output soxr has ready"""
+        return self._stream.resample_chunk(np.asarray(samples, dtype=np.float32))
+
+    def flush(self) -> np.ndarray:
+        """Return the rest of the output"""
+        return self._stream.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+class Resampler:
+    """
+    Sample rate conversion with cached polyphase filter banks
+
+    Filter banks are designed once per (source rate, target rate) pair and
+    shared by every call and stream. Whole buffers go through libsoxr when it
+    is installed (it ships with librosa and is the fastest option there);
+    otherwise, and for streams, the NumPy polyphase kernel is used.
+
+    Source rates are declared by clients, so the bank cache is an LRU of
+    max_filters entries, and pairs whose reduced factor exceeds
+    MAX_POLYPHASE_FACTOR are never designed: their streams go through
+    libsoxr instead.
+    """
+
+    def __init__(self, zero_crossings: int = 16, rolloff: float = 0.9,
+                 kaiser_beta: float = 8.0, use_soxr: bool = True, max_filters: int = 8):
+        self.zero_crossings = zero_crossings
+        self.rolloff = rolloff
+        self.kaiser_beta = kaiser_beta
+        self.use_soxr = use_soxr and SOXR_AVAILABLE
+        self.max_filters = max(1, max_filters)
+        self._filters: 'OrderedDict[Tuple[int, int], PolyphaseFilter]' = OrderedDict()
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def polyphase_factor(source_rate: int, target_rate: int) -> int:
+        """Larger of the reduced up/down factors, which sets a bank's size and design time"""
+        divisor = gcd(int(source_rate), int(target_rate))
+        return max(int(source_rate), int(target_rate)) // divisor
+
+    def get_filter(self, source_rate: int, target_rate: int) -> PolyphaseFilter:
+        """Get the filter bank for a rate pair, designing it on first use"""
+        key = (int(source_rate), int(target_rate))
+        if self.polyphase_factor(*key) > MAX_POLYPHASE_FACTOR:
+            raise AudioProcessingError(f"No polyphase filter for {key[0]}->{key[1]} Hz; "
+                                       f"the rate ratio is too fine (install soxr to convert it)")
+        with self._lock:
+            polyphase = self._filters.get(key)
+            if polyphase is not None:
+                self._filters.move_to_end(key)
+                return polyphase
+            polyphase = PolyphaseFilter(*key, zero_crossings=self.zero_crossings,
+                                        rolloff=self.rolloff, kaiser_beta=self.kaiser_beta)
+            self._filters[key] = polyphase
+            while len(self._filters) > self.max_filters:
+                self._filters.popitem(last=False)
+                self._evictions += 1
+            logger.info(f"Designed polyphase filter {key[0]}->{key[1]} Hz: "
+                        f"{polyphase.up}/{polyphase.down}, {polyphase.taps} taps per phase")
+            return polyphase
+
+    def resample(self, audio_array: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+        """
+        Resample a whole buffer
+
+        Args:
+            audio_array: Samples, mono or shaped (channels, samples)
+            source_rate: Rate of the input
+            target_rate: Desired rate
+
+        Returns:
+            float32 samples at the target rate
+        """
+        if source_rate == target_rate:
+            return audio_array
+        if audio_array.ndim > 1:
+            return np.stack([self.resample(channel, source_rate, target_rate) for channel in audio_array])
+
+        if self.use_soxr:
+            return soxr.resample(np.asarray(audio_array, dtype=np.float32), source_rate, target_rate, quality='HQ')
+
+        stream = self.stream(source_rate, target_rate)
+        head = stream.write(audio_array)
+        tail = stream.flush()
+        return np.concatenate((head, tail)) if len(tail) else head
+
+    def stream(self, source_rate: int, target_rate: int) -> Union[ResampleStream, SoxrStream]:
+        """Start a block-by-block conversion using the cached filter bank (libsoxr for uncommon pairs)"""
+        if SOXR_AVAILABLE and self.polyphase_factor(source_rate, target_rate) > MAX_POLYPHASE_FACTOR:
+            return SoxrStream(int(source_rate), int(target_rate))
+        return ResampleStream(self.get_filter(source_rate, target_rate))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the cached filter banks and the whole-buffer backend"""
+        with self._lock:
+            return {
+                'backend': 'soxr' if self.use_soxr else 'polyphase',
+                'max_filters': self.max_filters,
+                'evictions': self._evictions,
+                'filters': {
+                    f"{source}->{target}": {'up': f.up, 'down': f.down, 'taps_per_phase': f.taps}
+                    for (source, target), f in self._filters.items()
+                }
+            }
+
+# Global resampler instance
+resampler = Resampler()
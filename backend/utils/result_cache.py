@@ -0,0 +1,110 @@
+"""
+Result caching for ToneBridge Backend
+Bounded in-memory LRU cache with expiry for repeated transcription requests
+"""
+
+import copy
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from utils.logger import setup_logger
+from config import Config
+
+logger = setup_logger(__name__)
+
+class ResultCache:
+    """
+    LRU cache of results keyed by content hash, with a time-to-live
+
+    Clients resend identical clips (retries after a network error), and
+    each resend would otherwise repeat a full model pass. Entries hold only
+    the key (a hash of the audio and the settings that affect the result)
+    and the result dictionary; no audio is kept, nothing is written to disk,
+    and entries expire after ttl_seconds, in line with NO_DATA_STORAGE.
+    Results are copied in and out so callers cannot modify cached entries.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300.0):
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a result
+
+        Args:
+            key: Content hash
+
+        Returns:
+            A copy of the cached result, or None on a miss or an expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """
+        Store a result, evicting expired entries and then the least recently used
+
+        Args:
+            key: Content hash
+            result: Result to cache
+        """
+        if self.max_entries == 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                expired = [cached for cached, (expires_at, _) in self._entries.items() if expires_at <= now]
+                for cached in expired:
+                    del self._entries[cached]
+                self._stats['expirations'] += len(expired)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with size limits, entry count, hits, misses, hit_ratio,
+            evictions (LRU) and expirations (TTL)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        return {
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'entries': entries,
+            **stats,
+            'hit_ratio': stats['hits'] / lookups if lookups else 0.0
+        }
+
+# Global transcription result cache instance
+transcription_cache = ResultCache(
+    max_entries=Config.TRANSCRIPTION_CACHE_SIZE if Config.TRANSCRIPTION_CACHE_ENABLED else 0,
+    ttl_seconds=Config.TRANSCRIPTION_CACHE_TTL
+)
@@ -0,0 +1,128 @@
+"""
+Voice activity detection for ToneBridge Backend
+Frame energy / zero-crossing VAD, vectorized over the whole signal
+"""
+
+import numpy as np
+from typing import List, Tuple
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def frame_energy_and_zcr(audio_array: np.ndarray, frame_length: int, hop_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute per-frame mean energy and zero-crossing rate
+
+    Frames are strided windows over running sums, so the cost is O(n) with no
+    (frames x frame_length) matrix materialized.
+
+    Args:
+        audio_array: Mono audio samples
+        frame_length: Samples per frame
+        hop_length: Samples between frame starts
+
+    Returns:
+        Tuple of (energy, zcr) arrays, one value per frame
+    """
+    if len(audio_array) < frame_length:
+        return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.float64)
+
+    starts = np.arange(0, len(audio_array) - frame_length + 1, hop_length)
+
+    # Running sums in float64 so long clips do not lose precision
+    squared = np.concatenate(([0.0], np.cumsum(np.square(audio_array, dtype=np.float64))))
+    energy = (squared[starts + frame_length] - squared[starts]) / frame_length
+
+    signs = np.signbit(audio_array)
+    crossings = np.concatenate(([0], np.cumsum(signs[1:] != signs[:-1])))
+    zcr = (crossings[starts + frame_length - 1] - crossings[starts]) / (frame_length - 1)
+
+    return energy, zcr
+
+def detect_speech_segments(audio_array: np.ndarray, sample_rate: int,
+                           frame_ms: float = 30.0, hop_ms: float = 10.0,
+                           absolute_floor_db: float = -50.0, margin_db: float = 10.0,
+                           min_speech_ms: float = 120.0, min_silence_ms: float = 300.0,
+                           pad_ms: float = 150.0) -> List[Tuple[int, int]]:
+    """
+    Find speech regions in a clip
+
+    A frame is speech when its energy clears an adaptive threshold (noise floor
+    plus margin, never below an absolute floor), or when it is just under the
+    threshold but has a high zero-crossing rate (unvoiced consonants such as
+    's' and 'f'). Short gaps are bridged, blips are dropped, and each region is
+    padded so word edges are not clipped.
+
+    Args:
+        audio_array: Mono audio samples in [-1, 1], before peak normalization
+        sample_rate: Sample rate
+        frame_ms: Frame length in milliseconds
+        hop_ms: Hop length in milliseconds
+        absolute_floor_db: Frames quieter than this (dBFS) are never speech
+        margin_db: Required level above the estimated noise floor
+        min_speech_ms: Shorter speech runs are discarded
+        min_silence_ms: Shorter silences between speech runs are bridged
+        pad_ms: Context kept on each side of a speech region
+
+    Returns:
+        List of (start_sample, end_sample) tuples, empty for a silent clip
+    """
+    frame_length = max(2, int(sample_rate * frame_ms / 1000))
+    hop_length = max(1, int(sample_rate * hop_ms / 1000))
+
+    energy, zcr = frame_energy_and_zcr(audio_array, frame_length, hop_length)
+    if len(energy) == 0:
+        return []
+
+    energy_db = 10.0 * np.log10(energy + 1e-12)
+    peak_db = energy_db.max()
+    if peak_db < absolute_floor_db:
+        logger.info(f"VAD: clip is silent (peak {peak_db:.1f} dBFS)")
+        return []
+
+    # Noise floor from the quietest frames; cap the threshold so clips that are
+    # speech throughout do not lose their quieter syllables
+    noise_floor_db = np.percentile(energy_db, 10)
+    threshold_db = max(absolute_floor_db, min(noise_floor_db + margin_db, peak_db - 20.0))
+
+    speech = (energy_db > threshold_db) | ((energy_db > threshold_db - 6.0) & (zcr > 0.25))
+
+    segments = _frames_to_segments(speech, hop_length, frame_length,
+                                   min_speech=int(min_speech_ms / hop_ms),
+                                   min_silence=int(min_silence_ms / hop_ms))
+
+    pad = int(sample_rate * pad_ms / 1000)
+    padded = []
+    for start, end in segments:
+        start, end = max(0, start - pad), min(len(audio_array), end + pad)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((start, end))
+
+    logger.info(f"VAD: {len(padded)} speech segments, threshold {threshold_db:.1f} dBFS")
+    return padded
+
+def _frames_to_segments(speech: np.ndarray, hop_length: int, frame_length: int,
+                        min_speech: int, min_silence: int) -> List[Tuple[int, int]]:
+    """Turn a per-frame speech mask into sample ranges, bridging gaps and dropping blips"""
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+
+    runs = []
+    for start, end in zip(run_starts, run_ends):
+        if runs and start - runs[-1][1] < min_silence:
+            runs[-1][1] = end
+        else:
+            runs.append([start, end])
+
+    return [(int(start * hop_length), int((end - 1) * hop_length + frame_length))
+            for start, end in runs if end - start >= min_speech]
+
+def concatenate_segments(audio_array: np.ndarray, segments: List[Tuple[int, int]]) -> np.ndarray:
+    """Join the speech regions of a clip (samples on the last axis) into one contiguous array"""
+    if len(segments) == 1:
+        start, end = segments[0]
+        return audio_array[..., start:end]
+    return np.concatenate([audio_array[..., start:end] for start, end in segments], axis=-1)
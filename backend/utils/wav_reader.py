@@ -0,0 +1,89 @@
+"""
+Minimal RIFF/WAVE header parser for ToneBridge Backend
+Locates the PCM payload so it can be viewed in place with np.frombuffer
+"""
+
+import struct
+import numpy as np
+from typing import Optional, Dict, Any
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# (format tag, bits per sample) -> little-endian NumPy dtype
+_SAMPLE_DTYPES = {
+    (WAVE_FORMAT_PCM, 8): np.dtype('u1'),
+    (WAVE_FORMAT_PCM, 16): np.dtype('<i2'),
+    (WAVE_FORMAT_PCM, 32): np.dtype('<i4'),
+    (WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype('<f4'),
+    (WAVE_FORMAT_IEEE_FLOAT, 64): np.dtype('<f8')
+}
+
+def parse_wav_header(audio_data: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Parse the fmt and data chunks of a WAV file
+
+    Args:
+        audio_data: Complete or leading bytes of a WAV file
+
+    Returns:
+        Dictionary with format_tag, channels, sample_rate, bits_per_sample,
+        block_align, data_offset, data_size (bytes actually present) and
+        declared_data_size (from the header, None if unset), or None if the
+        bytes are not a WAV file this parser understands
+    """
+    if len(audio_data) < 12 or audio_data[:4] != b'RIFF' or audio_data[8:12] != b'WAVE':
+        return None
+
+    info = None
+    offset = 12
+    while offset + 8 <= len(audio_data):
+        chunk_id = audio_data[offset:offset + 4]
+        chunk_size = struct.unpack_from('<I', audio_data, offset + 4)[0]
+        body = offset + 8
+
+        if chunk_id == b'fmt ':
+            if chunk_size < 16 or body + 16 > len(audio_data):
+                return None
+            format_tag, channels, sample_rate, _, block_align, bits = struct.unpack_from('<HHIIHH', audio_data, body)
+            if format_tag == WAVE_FORMAT_EXTENSIBLE:
+                # The real format tag is the first two bytes of the SubFormat GUID
+                if chunk_size < 40 or body + 26 > len(audio_data):
+                    return None
+                format_tag = struct.unpack_from('<H', audio_data, body + 24)[0]
+            info = {
+                'format_tag': format_tag,
+                'channels': channels,
+                'sample_rate': sample_rate,
+                'bits_per_sample': bits,
+                'block_align': block_align
+            }
+
+        elif chunk_id == b'data':
+            if info is None:
+                return None
+            # Streaming writers leave the size as 0 or 0xFFFFFFFF; take what is there
+            available = len(audio_data) - body
+            info['declared_data_size'] = chunk_size if 0 < chunk_size < 0xFFFFFFFF else None
+            if chunk_size == 0 or chunk_size > available:
+                chunk_size = available
+            info['data_offset'] = body
+            info['data_size'] = chunk_size
+            return info
+
+        # Chunks are word aligned
+        offset = body + chunk_size + (chunk_size & 1)
+
+    return None
+
+def wav_sample_dtype(info: Dict[str, Any]) -> Optional[np.dtype]:
+    """Get the NumPy dtype for a parsed header, or None if unsupported (e.g. 24-bit)"""
+    return _SAMPLE_DTYPES.get((info['format_tag'], info['bits_per_sample']))
+
+
+def wav_duration(info: Dict[str, Any]) -> Optional[float]:
+    """Get the duration in seconds declared by a parsed header, or None if unknown"""
+    if not info.get('declared_data_size') or not info['block_align'] or not info['sample_rate']:
+        return None
+    return (info['declared_data_size'] // info['block_align']) / info['sample_rate']